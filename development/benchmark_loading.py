@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+This script measures how long loading savegames takes with the PrefetchDbReader, that
+answers the lookups of the loading code from prefetched tables, compared to a plain
+DbReader, that runs a query for every lookup. The time spent in the database is
+reported for every table.
+The savegames are loaded in headless mode, every load runs in its own process.
+
+Usage: development/benchmark_loading.py [savegames..]
+Savegames are specified by name, like for --load-map. Run from the uh root dir.
+"""
+
+import os.path
+import sys
+import re
+import time
+import subprocess
+
+if not os.path.exists('content/game.sqlite'):
+	print 'please run from uh root dir'
+	sys.exit(1)
+
+sys.path.append(".")
+
+# init_environment parses sys.argv, so keep our args away from it
+args = sys.argv[1:]
+del sys.argv[1:]
+
+import gettext
+gettext.install('', unicode=True)
+
+from run_uh import init_environment, get_option_parser
+init_environment()
+
+READERS = ('plain', 'prefetch')
+RESULT_PREFIX = 'LOADING STATS:'
+
+def measure(reader, savegame):
+	"""Loads savegame in headless mode and prints the time spent on each table.
+	Runs in the child process."""
+	import horizons.main
+	import horizons.session
+	from horizons.headlesssession import HeadlessSession
+	from horizons.util import DbReader, PrefetchDbReader
+
+	table_regexp = re.compile(r'\sFROM\s+([\w.`"]+)', re.I)
+	stats = {} # table : [queries, seconds]
+	base = DbReader if reader == 'plain' else PrefetchDbReader
+	class TimingDbReader(base):
+		def __call__(self, command, *args):
+			start = time.time()
+			result = super(TimingDbReader, self).__call__(command, *args)
+			match = table_regexp.search(command)
+			table_stats = stats.setdefault(match.group(1).strip('`"') if match else '-', [0, 0.0])
+			table_stats[0] += 1
+			table_stats[1] += time.time() - start
+			return result
+	horizons.session.PrefetchDbReader = TimingDbReader
+
+	load_time = []
+	original_load = HeadlessSession.load
+	def load(self, *args, **kwargs):
+		start = time.time()
+		original_load(self, *args, **kwargs)
+		load_time.append(time.time() - start)
+	HeadlessSession.load = load
+
+	options = get_option_parser().parse_args(['--headless', '0', '--load-map', savegame])[0]
+	horizons.main.start(options)
+	print RESULT_PREFIX, repr((load_time[0], stats))
+
+def benchmark(savegame):
+	results = {}
+	for reader in READERS:
+		output = subprocess.Popen([sys.executable, __file__, '--measure', reader, savegame], \
+		                          stdout=subprocess.PIPE).communicate()[0]
+		for line in output.splitlines():
+			if line.startswith(RESULT_PREFIX):
+				results[reader] = eval(line[len(RESULT_PREFIX):])
+		if reader not in results:
+			print savegame, 'failed to load with', reader, 'reader'
+			return
+
+	print savegame
+	print '  %-26s %8s %10s %8s %10s' % ('table', 'queries', 'plain', 'queries', 'prefetch')
+	tables = set(results['plain'][1]) | set(results['prefetch'][1])
+	by_time = sorted(tables, key=lambda t: -results['plain'][1].get(t, (0, 0.0))[1])
+	for table in by_time:
+		plain = results['plain'][1].get(table, (0, 0.0))
+		prefetch = results['prefetch'][1].get(table, (0, 0.0))
+		print '  %-26s %8d %9.3fs %8d %9.3fs' % (table, plain[0], plain[1], prefetch[0], prefetch[1])
+	print '  %-26s %8d %9.3fs %8d %9.3fs' % ('all tables', \
+	      sum(s[0] for s in results['plain'][1].itervalues()), sum(s[1] for s in results['plain'][1].itervalues()), \
+	      sum(s[0] for s in results['prefetch'][1].itervalues()), sum(s[1] for s in results['prefetch'][1].itervalues()))
+	print '  total loading time: plain %.3fs, prefetch %.3fs' % (results['plain'][0], results['prefetch'][0])
+
+if __name__ == '__main__':
+	if args[:1] == ['--measure']:
+		measure(args[1], args[2])
+	else:
+		for savegame in args:
+			benchmark(savegame)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+This script compares the pathfinding engine with the previous implementation
+(LegacyFindPath) on the maps that are shipped with the game.
+Ship paths are searched on the water of each map, land paths on its islands.
+
+Usage: development/benchmark_pathfinding.py [number of paths per map] [map files..]
+Run from the uh root dir.
+"""
+
+import os.path
+import sys
+import glob
+import time
+import random
+import sqlite3
+
+if not os.path.exists('content/game.sqlite'):
+	print 'please run from uh root dir'
+	sys.exit(1)
+
+sys.path.append(".")
+
+# init_environment parses sys.argv, so keep our args away from it
+args = sys.argv[1:]
+del sys.argv[1:]
+
+import gettext
+gettext.install('', unicode=True)
+
+from run_uh import init_environment
+init_environment()
+
+import horizons.main
+from horizons.util import Point, Rect
+from horizons.world.pathfinding.pathfinding import FindPath, LegacyFindPath
+
+def get_map_nodes(map_file):
+	"""Returns (water nodes, land nodes, map rect) of a map, like World and Island would
+	calculate them"""
+	game_db = sqlite3.connect('content/game.sqlite')
+	constructible = set( ground for (ground,) in \
+	  game_db.execute("SELECT ground FROM ground_class WHERE class = 'constructible'") )
+
+	map_db = sqlite3.connect(map_file)
+	land = {}
+	ground = set()
+	for (x, y, island_file) in map_db.execute("SELECT x, y, file FROM island"):
+		island_db = sqlite3.connect(island_file)
+		for (rel_x, rel_y, ground_id) in island_db.execute("SELECT x, y, ground_id FROM ground"):
+			coord = (x + rel_x, y + rel_y)
+			ground.add(coord)
+			if ground_id in constructible:
+				land[coord] = 1.0
+
+	min_x = min(c[0] for c in ground) - 10
+	min_y = min(c[1] for c in ground) - 10
+	max_x = max(c[0] for c in ground) + 10
+	max_y = max(c[1] for c in ground) + 10
+	water = dict( ((x, y), 1.0) for x in xrange(min_x, max_x) for y in xrange(min_y, max_y) \
+	              if (x, y) not in ground )
+	return water, land, Rect.init_from_borders(min_x, min_y, max_x, max_y)
+
+def run(engine, tasks, nodes, rect, diagonal):
+	"""Searches all paths in tasks with engine
+	@return: (seconds, list of paths)"""
+	paths = []
+	start = time.time()
+	for source, destination in tasks:
+		paths.append( engine()(Point(*source), Point(*destination), nodes, {}, diagonal, True, rect) )
+	return time.time() - start, paths
+
+def benchmark(map_file, num_paths):
+	water, land, rect = get_map_nodes(map_file)
+	print map_file
+	for name, nodes, diagonal in (('ship', water, True), ('land', land, True), ('road', land, False)):
+		if not nodes:
+			continue
+		rand = random.Random(map_file)
+		coords = sorted(nodes)
+		tasks = [ (rand.choice(coords), rand.choice(coords)) for i in xrange(num_paths) ]
+
+		legacy_time, legacy_paths = run(LegacyFindPath, tasks, nodes, rect, diagonal)
+		heap_time, heap_paths = run(FindPath, tasks, nodes, rect, diagonal)
+
+		identical = sum(1 for legacy, new in zip(legacy_paths, heap_paths) if legacy == new)
+		same_length = sum(1 for legacy, new in zip(legacy_paths, heap_paths) if \
+		                  (legacy is None and new is None) or \
+		                  (legacy is not None and new is not None and len(legacy) == len(new)))
+		print '  %s paths (%s nodes): legacy %.3fs, heap %.3fs (%.1fx), %s/%s identical, %s/%s same length' % \
+		      (name, len(nodes), legacy_time, heap_time, legacy_time / max(heap_time, 1e-9), \
+		       identical, num_paths, same_length, num_paths)
+
+if __name__ == '__main__':
+	num_paths = int(args[0]) if args else 20
+	map_files = args[1:] or sorted(glob.glob('content/maps/*.sqlite'))
+	for map_file in map_files:
+		benchmark(map_file, num_paths)
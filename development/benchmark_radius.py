@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+This script compares the radius functions of Circle and Rect, which use the offset
+tables of horizons.util.shapes.radiusoffsets, to the previous implementations, that
+calculated the distance of every coordinate on every call.
+
+Usage: development/benchmark_radius.py [number of repetitions]
+Run from the uh root dir.
+"""
+
+import os.path
+import sys
+import time
+
+if not os.path.exists('content/game.sqlite'):
+	print 'please run from uh root dir'
+	sys.exit(1)
+
+sys.path.append(".")
+
+# init_environment parses sys.argv, so keep our args away from it
+args = sys.argv[1:]
+del sys.argv[1:]
+
+import gettext
+gettext.install('', unicode=True)
+
+from run_uh import init_environment
+init_environment()
+
+import horizons.main
+from horizons.util import Point, Rect, Circle
+
+def legacy_circle_tuple_iter(center, radius):
+	for x in xrange(center.x-radius, center.x+radius+1):
+		for y in xrange(center.y-radius, center.y+radius+1):
+			if center.distance_to_tuple((x, y)) <= radius:
+				yield (x, y)
+
+def legacy_rect_radius_coordinates(rect, radius, include_self):
+	borders = {}
+	borders[rect.top - radius] = ( rect.left, rect.right )
+	borders[rect.bottom + radius] = ( rect.left, rect.right )
+	for y in xrange( rect.top, rect.bottom+1 ):
+		borders[y] = ( rect.left - radius, rect.right + radius)
+	x = radius
+	radius_squared = radius ** 2
+	for y in xrange( 1, radius ):
+		test_val = radius_squared - y ** 2
+		while (x ** 2) > test_val:
+			x -= 1
+		borders[rect.top - y] = (rect.left - x, rect.right + x)
+		borders[rect.bottom + y] = (rect.left - x, rect.right + x)
+	if not include_self:
+		self_coords = frozenset(rect.get_coordinates())
+		for y, x_range in borders.iteritems():
+			if y >= rect.top and y <= rect.bottom:
+				for x in xrange(x_range[0], x_range[1]+1):
+					t = (x, y)
+					if t not in self_coords:
+						yield t
+			else:
+				for x in xrange(x_range[0], x_range[1]+1):
+					yield (x, y)
+	else:
+		for y, x_range in borders.iteritems():
+			for x in xrange(x_range[0], x_range[1]+1):
+				yield (x, y)
+
+def measure(function, tasks):
+	"""@return: (seconds, list of results)"""
+	results = []
+	start = time.time()
+	for args in tasks:
+		results.append(list(function(*args)))
+	return time.time() - start, results
+
+def compare(name, legacy, new, tasks, ordered):
+	legacy_time, legacy_results = measure(legacy, tasks)
+	new_time, new_results = measure(new, tasks)
+	if ordered:
+		equal = legacy_results == new_results
+	else:
+		equal = [ sorted(coords) for coords in legacy_results ] == \
+		        [ sorted(coords) for coords in new_results ]
+	print '%s: legacy %.3fs, tables %.3fs (%.1fx), results equal: %s' % \
+	      (name, legacy_time, new_time, legacy_time / max(new_time, 1e-9), equal)
+
+if __name__ == '__main__':
+	repetitions = int(args[0]) if args else 200
+	points = [ Point(x * 7 - 50, x * 13 % 90 - 20) for x in xrange(repetitions) ]
+	# typical radii of buildings, ships and collectors
+	for radius in (3, 8, 12, 26):
+		tasks = [ (point, radius) for point in points ]
+		compare('Circle radius %s' % radius, legacy_circle_tuple_iter, \
+		        lambda center, radius: Circle(center, radius).tuple_iter(), tasks, True)
+		for size in (1, 2, 3):
+			for include_self in (True, False):
+				tasks = [ (Rect.init_from_topleft_and_size(point.x, point.y, size-1, size-1), radius, \
+				           include_self) for point in points ]
+				# the legacy function returned the lines of the rect in an arbitrary order
+				compare('Rect %sx%s radius %s include_self %s' % (size, size, radius, include_self), \
+				        legacy_rect_radius_coordinates, \
+				        lambda rect, radius, include_self: rect.get_radius_coordinates(radius, include_self), \
+				        tasks, False)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+"""
+This script compares the size and encoding speed of multiplayer packets in
+horizons.network.wireformat to pickling them, like packets were sent before.
+
+Usage: development/benchmark_wireformat.py [number of repetitions]
+Run from the uh root dir.
+"""
+
+import os.path
+import sys
+import time
+import cPickle
+
+if not os.path.exists('content/game.sqlite'):
+	print 'please run from uh root dir'
+	sys.exit(1)
+
+sys.path.append(".")
+
+# init_environment parses sys.argv, so keep our args away from it
+args = sys.argv[1:]
+del sys.argv[1:]
+
+import gettext
+gettext.install('', unicode=True)
+
+from run_uh import init_environment
+init_environment()
+
+import horizons.main
+import horizons.world # the commands can't be imported before the world
+from horizons.manager import MPPacket, CommandPacket, CheckupHashPacket
+from horizons.command.building import Build
+from horizons.command.unit import Act
+from horizons.command.uioptions import SetTaxSetting
+from horizons.network.packets import PICKLE_PROTOCOL
+
+class DummyObject(object):
+	"""Stands in for the world objects, of which the commands only save the worldid"""
+	def __init__(self, worldid):
+		self.worldid = worldid
+
+def get_packets():
+	"""Returns list of (description, packet) of typical packets"""
+	island = DummyObject(1000001)
+	settlement = DummyObject(1000002)
+	return [
+		('empty command packet', CommandPacket(12345, 1000003, [])),
+		('move a ship', CommandPacket(12345, 1000003, [Act(DummyObject(1000123), 40.5, 70)])),
+		('build 10 trails', CommandPacket(12345, 1000003, [ Build(15, 20 + i, 30, island, \
+		                              settlement=settlement, tearset=set()) for i in xrange(10) ])),
+		('change taxes', CommandPacket(12345, 1000003, [SetTaxSetting(settlement, 1.5)])),
+		('checkup hash', CheckupHashPacket(12345, 1000003, 3735928559)),
+		('checkup hash drill-down', CheckupHashPacket(12345, 1000003, \
+		                              (2343561863, 4012954423, 1893710134, 2836107241))),
+	]
+
+def measure(function, repetitions):
+	"""@return: seconds per call"""
+	start = time.time()
+	for i in xrange(repetitions):
+		function()
+	return (time.time() - start) / repetitions
+
+def benchmark(repetitions):
+	print '%-25s %12s %12s %12s %12s %12s %12s' % ('packet', 'pickle size', 'wire size', \
+	      'pickle enc', 'wire enc', 'pickle dec', 'wire dec')
+	for description, packet in get_packets():
+		# packets used to be pickled as a whole
+		pickled = cPickle.dumps(packet, PICKLE_PROTOCOL)
+		encoded = packet.serialize()
+		assert type(MPPacket.unserialize(encoded)) is type(packet)
+		pickle_enc = measure(lambda : cPickle.dumps(packet, PICKLE_PROTOCOL), repetitions)
+		wire_enc = measure(packet.serialize, repetitions)
+		pickle_dec = measure(lambda : cPickle.loads(pickled), repetitions)
+		wire_dec = measure(lambda : MPPacket.unserialize(encoded), repetitions)
+		print '%-25s %11dB %11dB %10.1fus %10.1fus %10.1fus %10.1fus' % (description, len(pickled), \
+		      len(encoded), pickle_enc * 1e6, wire_enc * 1e6, pickle_dec * 1e6, wire_dec * 1e6)
+
+if __name__ == '__main__':
+	benchmark(int(args[0]) if args else 10000)
@@ -158,6 +158,11 @@ class GROUND:
 	DEEP_WATER_SOUTHWEST1 = 107
 	DEEP_WATER_NORTHWEST1 = 108
 
+	# bits of the ground classes (table ground_class) in the class_mask of a tile
+	CONSTRUCTIBLE = 1
+	COASTLINE = 2
+	CLASS_BITS = { 'constructible' : CONSTRUCTIBLE, 'coastline' : COASTLINE }
+
 class GAME_SPEED:
 	TICKS_PER_SECOND = 16
 	TICK_RATES = [16, 32, 48, 64]
@@ -221,6 +226,7 @@ class WILD_ANIMAL:
 class COLLECTORS:
 	DEFAULT_WORK_DURATION = 16 # how many ticks collectors pretend to work at target
 	DEFAULT_WAIT_TICKS = 32 # how long collectors wait before again looking for a job
+	MAX_WAIT_FOR_CHANGES_TICKS = 512 # how long collectors, that wait for changes in range, wait at most
 
 class STORAGE:
 	DEFAULT_STORAGE_SIZE = 30 # Our usual inventorys are 30 tons big
@@ -249,6 +255,7 @@ class PATHS:
 	LOG_DIR = os.path.join(_user_dir, "log")
 	USER_CONFIG_FILE = os.path.join(_user_dir, "settings.xml")
 	SCREENSHOT_DIR = os.path.join(_user_dir, "screenshots")
+	CACHE_DIR = os.path.join(_user_dir, "cache")
 
 	# paths relative to uh dir
 	ACTION_SETS_DIRECTORY = os.path.join("content", "gfx")
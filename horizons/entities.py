@@ -24,7 +24,9 @@ import logging
 class Entities(object):
 	"""Class that stores all the special classes for buildings, grounds etc.
 	Stores class objects, not instances.
-	Loads everything from the db."""
+	Loads everything from the db. The data of all entities of a kind is fetched with a few
+	queries, one per table. Buildings and units create their fife objects and animations
+	only when the first instance is created (see their _loadObject)."""
 	loaded = False
 
 	log = logging.getLogger('entities')
@@ -39,6 +41,25 @@ class Entities(object):
 		cls.load_units(db)
 		cls.loaded = True
 
+	@classmethod
+	def _get_rows_by_id(cls, db, sql):
+		"""Runs a query for the data of all entities at once, instead of one query per entity.
+		@param sql: query that selects the entity id as first column
+		@return: dict { entity id : list of tuples of the other columns of its rows }"""
+		rows_by_id = {}
+		for row in db.execute(sql):
+			if row[0] in rows_by_id:
+				rows_by_id[row[0]].append(row[1:])
+			else:
+				rows_by_id[row[0]] = [row[1:]]
+		return rows_by_id
+
+	@classmethod
+	def _get_sounds(cls, db):
+		"""@return: dict { object id : list of (sound file,) }"""
+		return cls._get_rows_by_id(db, "SELECT object_sounds.object, file FROM sounds \
+		  INNER JOIN object_sounds ON sounds.rowid = object_sounds.sound")
+
 	@classmethod
 	def load_grounds(cls, db):
 		cls.log.debug("Entities: loading grounds")
@@ -46,10 +67,23 @@ class Entities(object):
 			cls.log.debug("Entities: grounds already loaded")
 			return
 		from world.ground import GroundClass
-		cls.grounds = {}
-		for (ground_id,) in db("SELECT id FROM data.ground"):
-			assert ground_id not in cls.grounds
-			cls.grounds[ground_id] = GroundClass(db, ground_id)
+		grounds = {}
+		velocities = cls._get_rows_by_id(db, "SELECT ground, unit, time_move_straight, \
+		  time_move_diagonal FROM data.unit_velocity")
+		classes = cls._get_rows_by_id(db, "SELECT ground, class FROM data.ground_class")
+		animations = cls._get_rows_by_id(db, "SELECT id, \
+		  (SELECT file FROM data.animation WHERE animation_id = animation_45 LIMIT 1), \
+		  (SELECT file FROM data.animation WHERE animation_id = animation_135 LIMIT 1), \
+		  (SELECT file FROM data.animation WHERE animation_id = animation_225 LIMIT 1), \
+		  (SELECT file FROM data.animation WHERE animation_id = animation_315 LIMIT 1) \
+		  FROM data.ground")
+		for ground_id in animations:
+			assert ground_id not in grounds
+			grounds[ground_id] = GroundClass(db, ground_id, {
+			  'velocities' : velocities.get(ground_id, []),
+			  'classes' : classes.get(ground_id, []),
+			  'animations' : animations[ground_id][0] })
+		cls.grounds = grounds
 
 	@classmethod
 	def load_buildings(cls, db):
@@ -57,11 +91,28 @@ class Entities(object):
 		if hasattr(cls, 'buildings'):
 			cls.log.debug("Entities: buildings already loaded")
 			return
-		cls.buildings = {}
 		from world.building import BuildingClass
-		for (building_id,) in db("SELECT id FROM data.building"):
-			assert building_id not in cls.buildings
-			cls.buildings[building_id] = BuildingClass(db, building_id)
+		buildings = {}
+		properties = cls._get_rows_by_id(db, "SELECT building, name, value FROM data.building_property")
+		costs = cls._get_rows_by_id(db, "SELECT building, resource, amount FROM balance.building_costs")
+		running_costs = cls._get_rows_by_id(db, "SELECT building, cost_active, cost_inactive \
+		  FROM balance.building_running_costs")
+		deposits = cls._get_rows_by_id(db, "SELECT mine, deposit FROM mine")
+		action_sets = cls._get_rows_by_id(db, "SELECT object_id, action_set_id FROM data.action_set")
+		sounds = cls._get_sounds(db)
+		for row in db.execute("SELECT id, class_package, class_type, size_x, size_y, name, radius, health, \
+		               inhabitants_start, inhabitants_max FROM data.building"):
+			building_id = row[0]
+			assert building_id not in buildings
+			buildings[building_id] = BuildingClass(db, building_id, {
+			  'building' : row[1:],
+			  'properties' : properties.get(building_id, []),
+			  'costs' : costs.get(building_id, []),
+			  'running_costs' : running_costs.get(building_id, []),
+			  'deposits' : deposits.get(building_id, []),
+			  'action_sets' : action_sets.get(building_id, []),
+			  'sounds' : sounds.get(building_id, []) })
+		cls.buildings = buildings
 
 	@classmethod
 	def load_units(cls, db):
@@ -69,8 +120,17 @@ class Entities(object):
 		if hasattr(cls, 'units'):
 			cls.log.debug("Entities: units already loaded")
 			return
-		cls.units = {}
+		units = {}
 		from world.units import UnitClass
-		for (unit_id,) in db("SELECT id FROM data.unit"):
-			assert unit_id not in cls.units
-			cls.units[unit_id] = UnitClass(db, unit_id)
+		properties = cls._get_rows_by_id(db, "SELECT unit, name, value FROM data.unit_property")
+		action_sets = cls._get_rows_by_id(db, "SELECT object_id, action_set_id FROM data.action_set")
+		sounds = cls._get_sounds(db)
+		for row in db.execute("SELECT id, class_package, class_type, radius FROM data.unit"):
+			unit_id = row[0]
+			assert unit_id not in units
+			units[unit_id] = UnitClass(db, unit_id, {
+			  'unit' : row[1:],
+			  'properties' : properties.get(unit_id, []),
+			  'action_sets' : action_sets.get(unit_id, []),
+			  'sounds' : sounds.get(unit_id, []) })
+		cls.units = units
@@ -20,6 +20,7 @@
 # ###################################################
 
 import time
+import heapq
 
 from horizons.util import ManualConstructionSingleton
 
@@ -27,12 +28,20 @@ class ExtScheduler(object):
 	"""The ExtScheduler is used for time based events that are not part of the simulation(gui, menu, scrolling).
 	To start a timed callback, call add_new_object() to make the TimingThread Class create a CallbackObject for you.
 	@param pump: pump list the scheduler registers itself with.
+
+	The schedule is a heap of entries [time, counter, CallbackObject, active]. Removed calls are
+	just deactivated and dropped when they reach the top of the heap. The active entries are
+	additionally indexed by the id of their class instance, so that removing calls is cheap.
 	"""
 	__metaclass__ = ManualConstructionSingleton
 
 	def __init__(self, pump):
 		super(ExtScheduler, self).__init__()
 		self.schedule = []
+		# { id(class_instance): [entry, ..] }
+		self.calls_by_instance = {}
+		# keeps calls with the same time in the order they were added
+		self.counter = 0
 		self.pump = pump
 		self.pump.append(self.tick)
 
@@ -40,15 +49,19 @@ class ExtScheduler(object):
 		"""Threads main loop
 		@param tick_id: int id of the tick.
 		"""
-		# loop through schedule until an object doesn't match the time criteria
-		for tup in self.schedule:
-			if tup[0] <= time.time():
-				obj = self.schedule.pop(0)[1]
-				obj.callback()
-				if obj.loops > 0 or obj.loops is -1:
-					self.add_object(obj) # re-add object
-			else:
-				break
+		now = time.time()
+		# calls that are added during this tick are executed in the next one at the earliest
+		last_counter = self.counter
+		schedule = self.schedule
+		while schedule and schedule[0][0] <= now and schedule[0][1] < last_counter:
+			entry = heapq.heappop(schedule)
+			if not entry[3]:
+				continue # removed
+			self._remove_entry(entry)
+			obj = entry[2]
+			obj.callback()
+			if obj.loops > 0 or obj.loops is -1:
+				self.add_object(obj) # re-add object
 
 	def add_object(self, obj):
 		"""Adds a new CallbackObject instance to the callbacks list
@@ -56,8 +69,19 @@ class ExtScheduler(object):
 		"""
 		if obj.loops > 0:
 			obj.loops -= 1
-		self.schedule.append(((time.time() + obj.run_in), obj))
-		self.schedule.sort()
+		entry = [time.time() + obj.run_in, self.counter, obj, True]
+		self.counter += 1
+		heapq.heappush(self.schedule, entry)
+		self.calls_by_instance.setdefault(id(obj.class_instance), []).append(entry)
+
+	def _remove_entry(self, entry):
+		"""Deactivates an entry and removes it from the index"""
+		entry[3] = False
+		key = id(entry[2].class_instance)
+		entries = self.calls_by_instance[key]
+		entries.remove(entry)
+		if not entries:
+			del self.calls_by_instance[key]
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -70,21 +94,21 @@ class ExtScheduler(object):
 
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		for tup in self.schedule:
-			if tup[1].class_instance is class_instance:
-				self.schedule.remove(tup)
+		for entry in self.calls_by_instance.pop(id(class_instance), []):
+			entry[3] = False
 
 	def rem_call(self, instance, callback):
 		"""Removes all callbacks of 'instance' that are 'callback'
 		@param instance: the instance that would execute the call
 		@param callback: the function to remove
 		"""
-		for tup in self.schedule:
-			if tup[1].class_instance is instance and tup[1].callback == callback:
-				self.schedule.remove(tup)
+		for entry in self.calls_by_instance.get(id(instance), [])[:]:
+			if entry[2].callback == callback:
+				self._remove_entry(entry)
 
 	def __del__(self):
 		self.schedule = []
+		self.calls_by_instance = {}
 		self.pump.remove(self.tick)
 		self.pump = None
 
@@ -31,6 +31,7 @@ from horizons.gui.tabs import TabWidget, BuildTab
 from horizons.gui.widgets.messagewidget import MessageWidget
 from horizons.gui.widgets.minimap import Minimap
 from horizons.gui.widgets.logbook import LogBook
+from horizons.gui.widgets.tickprofileroverlay import TickProfilerOverlay
 from horizons.gui.utility import LazyWidgetsDict
 from horizons.constants import RES
 from horizons.command.uioptions import RenameObject
@@ -73,6 +74,7 @@ class IngameGui(LivingObject):
 		cityinfo.position = (screenwidth/2 - cityinfo.size[0]/2 - 10, 5)
 
 		self.logbook = LogBook(session)
+		self.tick_profiler = TickProfilerOverlay(session)
 
 		# self.widgets['minimap'] is the guichan gui around the actual minimap,
 		# which is saved in self.minimap
@@ -147,6 +149,8 @@ class IngameGui(LivingObject):
 		for w in self.widgets.itervalues():
 			if w.parent is None:
 				w.hide()
+		self.tick_profiler.end()
+		self.tick_profiler = None
 		self.message_widget = None
 		self.tabwidgets = None
 		self.minimap = None
@@ -76,6 +76,8 @@ class IngameKeyListener(fife.IKeyListener, LivingObject):
 			self.session.ingame_gui.toggle_ingame_pause()
 		elif keystr == 'l':
 			self.session.ingame_gui.logbook.toggle_visibility()
+		elif keystr == 't' and horizons.main.debug:
+			self.session.ingame_gui.tick_profiler.toggle_visibility()
 		elif keystr == 'd':
 			pass
 			#import pdb; pdb.set_trace()
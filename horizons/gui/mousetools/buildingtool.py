@@ -28,6 +28,7 @@ import horizons.main
 
 from horizons.util import ActionSetLoader, Point, decorators, Callback, WorldObject
 from horizons.command.building import Build, Tear
+from horizons.world.building.buildable import BuildPositionCache
 from horizons.gui.mousetools.navigationtool import NavigationTool
 from horizons.gui.mousetools.selectiontool import SelectionTool
 from horizons.command.sounds import PlaySound
@@ -64,6 +65,7 @@ class BuildingTool(NavigationTool):
 		self._modified_objects = set() # fife instances modified for transparency
 		self._buildable_tiles = set() # tiles marked as buildable
 		self._build_logic = None
+		self._build_cache = BuildPositionCache(self.session, self._class) # see preview_build
 		if self.ship is None:
 			self._build_logic = SettlementBuildingToolLogic()
 		else:
@@ -96,6 +98,7 @@ class BuildingTool(NavigationTool):
 		self._buildable_tiles = None
 		self._modified_objects = None
 		self.buildings = None
+		self._build_cache.clear()
 		if self.gui is not None:
 			self.session.view.remove_change_listener(self.draw_gui)
 			self.gui.hide()
@@ -154,19 +157,36 @@ class BuildingTool(NavigationTool):
 
 	@decorators.make_constants()
 	def preview_build(self, point1, point2, force=False):
-		"""Display buildings as preview if build requirements are met"""
+		"""Display buildings as preview if build requirements are met.
+		The fife instances of builds that are still part of the preview are reused, only their
+		coloring is updated if their buildability changed."""
 		#self.session.view.renderer['InstanceRenderer'].removeAllColored()
 		self.log.debug("BuildingTool: preview build at %s, %s", point1, point2)
 		new_buildings = self._class.check_build_line(self.session, point1, point2,
-		                                             rotation = self.rotation, ship=self.ship)
+		                                             rotation = self.rotation, ship=self.ship,
+		                                             cache=self._build_cache)
 		# optimisation: If only one building is in the preview and the position hasn't changed
 		# => don't preview. Otherwise the preview is redrawn on every mouse move
 		if not force and len(new_buildings) == len(self.buildings) == 1 and \
 		   new_buildings[0] == self.buildings[0]:
 			return # we don't want to redo the preview
 
-		# remove old fife instances and coloring
-		self._remove_building_instances()
+		# workaround for buildings like settler, that don't use the current level of
+		# the player, but always start at a certain lvl
+		level = self.session.world.player.settler_level if \
+		      not hasattr(self._class, "default_level_on_build") else \
+		      self._class.default_level_on_build
+
+		# remember old fife instances, the ones of unchanged builds are reused
+		old_instances = {} # preview key : (fife instance, whether it's colored as buildable)
+		for building in self.buildings:
+			if building in self.buildings_fife_instances:
+				old_instances[self._get_preview_key(building, level)] = \
+				  (self.buildings_fife_instances[building], building.buildable)
+		if hasattr(self._class, "deselect_building"):
+			deselected_tiles = self._class.deselect_building(self.session)
+			# redraw buildables (removal of selection might have tampered with it)
+			self.highlight_buildable(deselected_tiles)
 
 		# get new ones
 		self.buildings = new_buildings
@@ -178,23 +198,8 @@ class BuildingTool(NavigationTool):
 		neededResources, usableResources = {}, {}
 		# check if the buildings are buildable and color them appropriatly
 		for building in self.buildings:
-			# make surrounding transparent
-			self._make_surrounding_transparent(building.position)
-
-			# get gfx for the building
-			# workaround for buildings like settler, that don't use the current level of
-			# the player, but always start at a certain lvl
-			level = self.session.world.player.settler_level if \
-			      not hasattr(self._class, "default_level_on_build") else \
-			      self._class.default_level_on_build
-
 			if self._class.id == BUILDINGS.TREE_CLASS and not building.buildable:
 				continue # Tree/ironmine that is not buildable, don't preview
-			else:
-				self.buildings_fife_instances[building] = \
-				    self._class.getInstance(self.session, building.position.origin.x, \
-				                            building.position.origin.y, rotation=building.rotation,
-				                            action=building.action, level=level)
 
 			if self._class.id == BUILDINGS.BRANCH_OFFICE_CLASS:
 				settlement = self.session.world.get_settlement(building.position.center())
@@ -224,8 +229,6 @@ class BuildingTool(NavigationTool):
 
 					if available_res < neededResources[resource]:
 						# can't build, not enough res
-						self.renderer.addColored(self.buildings_fife_instances[building], \
-						                         *self.not_buildable_color)
 						building.buildable = False
 						self.buildings_missing_resources[building] = resource
 						break
@@ -234,12 +237,23 @@ class BuildingTool(NavigationTool):
 						usableResources[resource] = usableResources.get(resource, 0) + \
 						               self._class.costs[resource]
 
+			# get gfx for the building, reuse it if the build is still previewed
+			old_instance = old_instances.pop(self._get_preview_key(building, level), None)
+			if old_instance is not None:
+				fife_instance, colored_buildable = old_instance
+			else:
+				fife_instance = self._class.getInstance(self.session, building.position.origin.x, \
+				                                        building.position.origin.y, rotation=building.rotation,
+				                                        action=building.action, level=level)
+				colored_buildable = None
+			self.buildings_fife_instances[building] = fife_instance
+
 			if building.buildable:
-				# Tile might still have not buildable color -> remove it
-				self.renderer.removeColored(self.buildings_fife_instances[building])
-				self.renderer.addOutlined(self.buildings_fife_instances[building], \
-				                          self.buildable_color[0], self.buildable_color[1],\
-				                          self.buildable_color[2], 1)
+				if colored_buildable is not True:
+					# Tile might still have not buildable color -> remove it
+					self.renderer.removeColored(fife_instance)
+					self.renderer.addOutlined(fife_instance, self.buildable_color[0], \
+					                          self.buildable_color[1], self.buildable_color[2], 1)
 				# draw radius in a moment, and not always immediately, since it's expensive
 				if hasattr(self._class, "select_building"):
 					callback = Callback(self._class.select_building, self.session, \
@@ -248,28 +262,51 @@ class BuildingTool(NavigationTool):
 					delay = 0.10 # Wait delay seconds
 					ExtScheduler().add_new_object(callback, self, delay)
 
-			else: # not buildable
-				self.renderer.addColored(self.buildings_fife_instances[building], \
-				                         *self.not_buildable_color)
+			elif colored_buildable is not False: # not buildable
+				self.renderer.removeOutlined(fife_instance)
+				self.renderer.addColored(fife_instance, *self.not_buildable_color)
+
+		# remove the fife instances of builds, that aren't previewed any more
+		for fife_instance, colored_buildable in old_instances.itervalues():
+			self._delete_fife_instance(fife_instance)
+
+		# make surrounding transparent
+		self._make_surrounding_transparent([ building.position for building in self.buildings ])
+
 		self.session.ingame_gui.resourceinfo_set( \
 		   self.ship if self.ship is not None else settlement, neededResources, usableResources, \
 		   res_from_ship = bool(self.ship))
 		self._add_listeners(self.ship if self.ship is not None else settlement)
 
+	def _get_preview_key(self, building, level):
+		"""Returns a key, that is equal for builds whose fife instances look the same"""
+		return (building.position.origin.to_tuple(), building.rotation, building.action, level)
+
 	@decorators.make_constants()
-	def _make_surrounding_transparent(self, building_position):
-		"""Makes the surrounding of building_position transparent"""
+	def _make_surrounding_transparent(self, building_positions):
+		"""Makes the surrounding of building_positions transparent and restores the
+		transparency of objects, that aren't near the buildings any more"""
 		world_contains = self.session.world.map_dimensions.contains_without_border
 		get_tile = self.session.world.get_tile
-		for coord in building_position.get_radius_coordinates(self.nearby_objects_radius, include_self=True):
+		coords = set()
+		for building_position in building_positions:
+			coords.update(building_position.get_radius_coordinates(self.nearby_objects_radius, \
+			                                                        include_self=True))
+		transparent_objects = set()
+		for coord in coords:
 			p = Point(*coord)
 			if not world_contains(p):
 				continue
 			tile = get_tile(p)
 			if tile.object is not None and tile.object.buildable_upon:
-				tile.object.fife_instance.get2dGfxVisual().setTransparency( \
-				  self.nearby_objects_transparency )
-				self._modified_objects.add(tile.object)
+				transparent_objects.add(tile.object)
+
+		for obj in self._modified_objects - transparent_objects:
+			if obj.fife_instance is not None:
+				obj.fife_instance.get2dGfxVisual().setTransparency(0)
+		for obj in transparent_objects - self._modified_objects:
+			obj.fife_instance.get2dGfxVisual().setTransparency(self.nearby_objects_transparency)
+		self._modified_objects = transparent_objects
 
 	def on_escape(self):
 		self.session.ingame_gui.resourceinfo_set(None)
@@ -451,10 +488,16 @@ class BuildingTool(NavigationTool):
 				obj.fife_instance.get2dGfxVisual().setTransparency(0)
 		self._modified_objects.clear()
 		for fife_instance in self.buildings_fife_instances.itervalues():
-			layer = fife_instance.getLocationRef().getLayer()
-			# layer might not exist, happens for some reason after a build
-			if layer is not None:
-				layer.deleteInstance(fife_instance)
+			self._delete_fife_instance(fife_instance)
+		self.buildings_fife_instances.clear()
+
+	def _delete_fife_instance(self, fife_instance):
+		self.renderer.removeColored(fife_instance)
+		self.renderer.removeOutlined(fife_instance)
+		layer = fife_instance.getLocationRef().getLayer()
+		# layer might not exist, happens for some reason after a build
+		if layer is not None:
+			layer.deleteInstance(fife_instance)
 
 	def _remove_coloring(self):
 		"""Removes coloring from tiles, that indicate that the tile is buildable"""
@@ -26,11 +26,17 @@ from horizons.util import Point, Rect
 from horizons.scheduler import Scheduler
 from horizons.util.python.decorators import bind_all
 
-import math
-from math import sin, cos
+import bisect
 
 class Minimap(object):
-	"""A basic minimap"""
+	"""A basic minimap
+
+	Every pixel of the minimap displays the world coord in the center of the area it covers.
+	The colors of the pixels are kept in a raster (a list indexed by x * height + y), together
+	with an index of the pixels by the world coord they display. A full redraw colors the raster
+	island by island, an update of a single coord only touches the pixels that display it.
+	The renderer nodes of the pixels are looked up once per rotation, since the minimap can only
+	be rotated by 90 degrees."""
 	water_id, island_id, cam_border = range(0, 3)
 	colors = { 0: (190, 175, 152),
 	           1: (137, 117, 87),
@@ -59,9 +65,19 @@ class Minimap(object):
 		self.world = None
 		self.location_center = self.location.center()
 
+		# see _setup_raster
+		self._coords_x = None
+		self._coords_y = None
+		self._pixels_by_coord = None
+		self._pixel_colors = None
+		self._pixel_nodes = None
+
 	def end(self):
 		self.world = None
 		self.renderernodes = None
+		self._pixels_by_coord = None
+		self._pixel_colors = None
+		self._pixel_nodes = None
 		self.session = None
 		self.renderer = None
 
@@ -79,6 +95,7 @@ class Minimap(object):
 		if not self.session.view.has_change_listener(self.update_cam):
 			self.session.view.add_change_listener(self.update_cam)
 
+		self._setup_raster()
 		self._recalculate()
 
 		Scheduler().rem_all_classinst_calls(self)
@@ -121,12 +138,14 @@ class Minimap(object):
 		@param tup: (x, y)"""
 		if self.world is None or not self.world.inited:
 			return # don't draw while loading
-		minimap_point = self._get_rotated_coords(self._world_coord_to_minimap_coord(tup))
-		world_to_minimap = self._get_world_to_minimap_ratio()
-		rect = Rect.init_from_topleft_and_size(minimap_point[0], minimap_point[1], \
-		                                       int(round(1/world_to_minimap[0])), \
-		                                       int(round(1/world_to_minimap[1])))
-		self._recalculate(rect)
+		pixels = self._pixels_by_coord.get(tup)
+		if pixels is None:
+			return # coord isn't displayed on the minimap
+		color = self._get_color(self.world.get_island(Point(*tup)), tup)
+		renderer_addPoint = self.renderer.addPoint
+		for pixel in pixels:
+			self._pixel_colors[pixel] = color
+			renderer_addPoint("minimap", self._pixel_nodes[pixel], *color)
 
 	def use_overlay_icon(self, icon):
 		"""Configures icon so that clicks get mapped here.
@@ -149,78 +168,63 @@ class Minimap(object):
 		map_coord = self._minimap_coord_to_world_coord(abs_mouse_position)
 		self.session.view.center(*map_coord)
 
-	def _recalculate(self, where = None):
-		"""Calculate which pixel of the minimap should display what and draw it
-		@param where: Rect of minimap coords. Defaults to self.location"""
-		if where is None:
-			where = self.location
-
+	def _setup_raster(self):
+		"""Calculates which world coord each pixel displays and the renderer node of each pixel
+		for the current rotation"""
 		# calculate which area of the real map is mapped to which pixel on the minimap
 		pixel_per_coord_x, pixel_per_coord_y = self._get_world_to_minimap_ratio()
-
-		# calculate values here so we don't have to do it in the loop
-		pixel_per_coord_x_half_as_int = int(pixel_per_coord_x/2)
-		pixel_per_coord_y_half_as_int = int(pixel_per_coord_y/2)
-
-		real_map_point = Point(0, 0)
-		location_left = self.location.left
-		location_top = self.location.top
-		world_min_x = self.world.min_x
-		world_min_y = self.world.min_y
-		get_island = self.world.get_island
-		water_col, island_col = \
-		         [ self.colors[i] for i in [self.water_id, self.island_id] ]
-		color = None
+		# use center of the area that the pixel covers
+		self._coords_x = [ int(x*pixel_per_coord_x) + self.world.min_x + int(pixel_per_coord_x/2) \
+		                   for x in xrange(self.location.width) ]
+		self._coords_y = [ int(y*pixel_per_coord_y) + self.world.min_y + int(pixel_per_coord_y/2) \
+		                   for y in xrange(self.location.height) ]
+
+		height = self.location.height
+		self._pixels_by_coord = {}
+		self._pixel_nodes = []
+		for x, coord_x in enumerate(self._coords_x):
+			for y, coord_y in enumerate(self._coords_y):
+				self._pixels_by_coord.setdefault((coord_x, coord_y), []).append(x * height + y)
+				minimap_point = (self.location.left + x, self.location.top + y)
+				self._pixel_nodes.append(self.renderernodes[self._get_rotated_coords(minimap_point)])
+
+	def _recalculate(self):
+		"""Calculate which pixel of the minimap should display what and draw the whole minimap"""
+		height = self.location.height
+		self._pixel_colors = [ self.colors[self.water_id] ] * (self.location.width * height)
+
+		# only look at the coords of the islands, everything else is water
+		coords_x = self._coords_x
+		coords_y = self._coords_y
+		for island in self.world.islands:
+			ground_map = island.ground_map
+			first_y = bisect.bisect_left(coords_y, island.rect.top)
+			last_y = bisect.bisect_right(coords_y, island.rect.bottom)
+			for x in xrange(bisect.bisect_left(coords_x, island.rect.left), \
+			                bisect.bisect_right(coords_x, island.rect.right)):
+				coord_x = coords_x[x]
+				for y in xrange(first_y, last_y):
+					coord = (coord_x, coords_y[y])
+					if coord in ground_map:
+						self._pixel_colors[x * height + y] = self._get_color(island, coord)
+
+		self.renderer.removeAll("minimap")
 		renderer_addPoint = self.renderer.addPoint
-
-		# loop through map coordinates, assuming (0, 0) is the origin of the minimap
-		# this faciliates calculating the real world coords
-		for x in xrange(where.left-self.location.left, where.left+where.width-self.location.left):
-			# Optimisation: remember last island
-			last_island = None
-			island = None
-			for y in xrange(where.top-self.location.top, where.top+where.height-self.location.top):
-
-				"""
-				This code should be here, but since python can't do inlining, we have to inline
-				ourselves for performance reasons
-				covered_area = Rect.init_from_topleft_and_size(
-				  int(x * pixel_per_coord_x)+world_min_x, \
-				  int(y * pixel_per_coord_y)+world_min_y), \
-				  int(pixel_per_coord_x), int(pixel_per_coord_y))
-				real_map_point = covered_area.center()
-				"""
-				# use center of the rect that the pixel covers
-				real_map_point.x = int(x*pixel_per_coord_x)+world_min_x + \
-				                            pixel_per_coord_x_half_as_int
-				real_map_point.y = int(y*pixel_per_coord_y)+world_min_y + \
-				                            pixel_per_coord_y_half_as_int
-				real_map_point_tuple = (real_map_point.x, real_map_point.y)
-				# we changed the minimap coords, so change back here
-				minimap_point = ( location_left + x, location_top + y)
-
-
-				# check what's at the covered_area
-				if last_island is not None and real_map_point_tuple in last_island.ground_map:
-					island = last_island
-				else:
-					island = get_island(real_map_point)
-				if island is not None:
-					last_island = island
-					# this pixel is an island
-					settlement = island.get_settlement(real_map_point)
-					if settlement is None:
-						# island without settlement
-						color = island_col
-					else:
-						# pixel belongs to a player
-						color = settlement.owner.color.to_tuple()
-				else:
-					color = water_col
-
-				# _get_rotated_coords has been inlined here
-				renderer_addPoint("minimap", self.renderernodes[self._rotate(minimap_point, self._rotations)], *color)
-
+		for node, color in zip(self._pixel_nodes, self._pixel_colors):
+			renderer_addPoint("minimap", node, *color)
+
+	def _get_color(self, island, coord):
+		"""Returns the color of a world coord
+		@param island: the island at coord or None
+		@param coord: (x, y)"""
+		if island is None:
+			return self.colors[self.water_id]
+		settlement = island.ground_map[coord].settlement
+		if settlement is None:
+			# island without settlement
+			return self.colors[self.island_id]
+		# coord belongs to a player
+		return settlement.owner.color.to_tuple()
 
 	def _timed_update(self):
 		"""Regular updates for domains we can't or don't want to keep track of."""
@@ -258,18 +262,19 @@ class Minimap(object):
 
 	## CALC UTILITY
 
+	# rotations as number of quarter turns for each value of self.rotation
 	_rotations = { 0 : 0,
-	               1 : 3 * math.pi / 2,
-	               2 : math.pi,
-	               3 : math.pi / 2
+	               1 : 3,
+	               2 : 2,
+	               3 : 1
 	               }
 	def _get_rotated_coords (self, tup):
 		return self._rotate(tup, self._rotations)
 
 	_from_rotations = { 0 : 0,
-	                    1 : math.pi / 2,
-	                    2 : math.pi,
-	                    3 : 3 * math.pi / 2
+	                    1 : 1,
+	                    2 : 2,
+	                    3 : 3
 	                    }
 	def _get_from_rotated_coords (self, tup):
 		return self._rotate (tup, self._from_rotations)
@@ -278,18 +283,17 @@ class Minimap(object):
 		if not horizons.main.fife.get_uh_setting("MinimapRotation"):
 			return tup
 		else:
-			rotation = rotations[ self.rotation ]
+			quarter_turns = rotations[ self.rotation ]
 
-			x = tup[0]
-			y = tup[1]
-			x -= self.location_center.x
-			y -= self.location_center.y
+			x = tup[0] - self.location_center.x
+			y = tup[1] - self.location_center.y
 
-			new_x = x * cos(rotation) - y * sin(rotation)
-			new_y = x * sin(rotation) + y * cos(rotation)
+			# rotate by multiples of 90 degrees
+			for i in xrange(quarter_turns):
+				x, y = -y, x
 
-			new_x += self.location_center.x
-			new_y += self.location_center.y
+			new_x = x + self.location_center.x
+			new_y = y + self.location_center.y
 			#some points may get out of range
 			new_x = max (self.location.left, new_x)
 			new_x = min (self.location.right, new_x)
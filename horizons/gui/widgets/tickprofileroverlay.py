@@ -0,0 +1,90 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os.path
+import time
+
+from fife.extensions import pychan
+
+from horizons.scheduler import Scheduler
+from horizons.extscheduler import ExtScheduler
+from horizons.constants import PATHS
+
+
+class TickProfilerOverlay(object):
+	"""Displays the most expensive scheduler calls and the slowest ticks while the game runs.
+	Profiling of the scheduler is enabled while the overlay is visible. When it is hidden,
+	the measurements are written to a json file in the log directory.
+	"""
+	# number of calls to display
+	NUM_CALLS = 10
+	# seconds between updates of the display
+	UPDATE_INTERVAL = 1
+
+	def __init__(self, session):
+		self._session = session
+		self._gui = None
+
+	def show(self):
+		if self._gui is None:
+			self._gui = pychan.widgets.Label(position=(5, 60))
+		Scheduler().start_profiling()
+		self._update()
+		self._gui.show()
+		ExtScheduler().add_new_object(self._update, self, self.UPDATE_INTERVAL, -1)
+
+	def hide(self):
+		ExtScheduler().rem_all_classinst_calls(self)
+		self._gui.hide()
+		profiler = Scheduler().stop_profiling()
+		if profiler is not None:
+			filename = os.path.join(PATHS.LOG_DIR, "tick-profile-%s.json" % \
+			                        time.strftime("%y-%m-%d_%H-%M-%S"))
+			profiler.write(filename)
+
+	def is_visible(self):
+		return self._gui is not None and self._gui.isVisible()
+
+	def toggle_visibility(self):
+		if self.is_visible():
+			self.hide()
+		else:
+			self.show()
+
+	def end(self):
+		if self.is_visible():
+			self.hide()
+		self._session = None
+
+	def _update(self):
+		profiler = Scheduler().profiler
+		if profiler is None:
+			return
+		lines = [ u"%d ticks, %.1f ms/tick" % \
+		          (profiler.num_ticks, 1000 * profiler.total_time / max(profiler.num_ticks, 1)) ]
+		for stats in profiler.get_stats()[:self.NUM_CALLS]:
+			lines.append( u"%7.1f ms %6d calls %s.%s" % (1000 * stats['seconds'], stats['calls'], \
+			                                             stats['class'], stats['function']) )
+		lines.append( u"slowest ticks: " + u", ".join( u"%d (%.1f ms)" % (tick_id, 1000 * seconds) \
+		              for (seconds, tick_id, calls) in profiler.get_slowest_ticks() ) )
+		self._gui.text = u"\n".join(lines)
+		self._gui.adaptLayout()
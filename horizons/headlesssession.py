@@ -0,0 +1,124 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import time
+
+import horizons.main
+
+from horizons.spsession import SPSession
+from horizons.view import View
+from horizons.constants import LAYERS, VIEW
+
+from fife import fife
+
+
+class NullObject(object):
+	"""Accepts every attribute access and call and does nothing.
+	Stands in for the gui, camera and renderers, which don't exist in headless mode."""
+	def __init__(self, *args, **kwargs):
+		pass
+
+	def __call__(self, *args, **kwargs):
+		return self
+
+	def __getattr__(self, name):
+		return self
+
+	def __getitem__(self, key):
+		return self
+
+	def __iter__(self):
+		return iter(())
+
+	def __len__(self):
+		return 0
+
+
+class HeadlessView(View):
+	"""View that sets up the map and its layers for the instances of the world,
+	but doesn't render anything."""
+	def __init__(self, session, center = (0, 0)):
+		# skip View.__init__, it sets up camera and renderers
+		super(View, self).__init__()
+		self.session = session
+		self.model = horizons.main.fife.engine.getModel()
+		self.map = self.model.createMap("map")
+
+		cellgrid = self.model.getCellGrid('square')
+		cellgrid.thisown = 0
+
+		self.layers = []
+		for i in xrange(0, LAYERS.NUM):
+			self.layers.append(self.map.createLayer(str(i), cellgrid))
+			self.layers[i].setPathingStrategy(fife.CELL_EDGES_ONLY)
+
+		self.cam = NullObject()
+		self.renderer = NullObject()
+
+	def end(self):
+		self.model.deleteMaps()
+		super(View, self).end()
+
+	def get_zoom(self):
+		return VIEW.ZOOM
+
+
+class HeadlessSession(SPSession):
+	"""Singleplayer session without graphical output, that is advanced by calling run().
+	Useful for soak tests, ai tuning and benchmarks on machines without a display.
+
+	The timer is not pumped by the engine, so the game runs only during run(), as fast as
+	possible. ExtScheduler calls aren't executed, they only do gui related things.
+	"""
+	def __init__(self, db):
+		super(HeadlessSession, self).__init__(NullObject(), db)
+
+	def create_view(self):
+		return HeadlessView(self, (15, 15))
+
+	def create_ingame_gui(self):
+		return NullObject()
+
+	def create_keylistener(self):
+		return NullObject()
+
+	def create_cursor(self):
+		return NullObject()
+
+	def start(self):
+		"""Nothing to do here, the game only runs in run()"""
+		pass
+
+	def speed_set(self, ticks):
+		"""Game speed has no meaning in a headless session"""
+		pass
+
+	def autosave(self):
+		pass
+
+	def run(self, num_ticks):
+		"""Simulates num_ticks ticks as fast as possible.
+		@param num_ticks: int number of ticks to simulate
+		@return: tuple (number of simulated ticks, seconds it took)"""
+		start = time.time()
+		ticks = self.timer.run_ticks(num_ticks)
+		return ticks, time.time() - start
@@ -111,10 +111,17 @@ def start(command_line_arguments):
 		fife.settings.set(UH_MODULE, "ClientID", client_id)
 		fife.settings.saveSettings()
 
+	if command_line_arguments.headless_ticks is not None:
+		_setup_headless_engine()
+
 	ExtScheduler.create_instance(fife.pump)
 	fife.init()
-	_modules.gui = Gui()
 	SavegameManager.init()
+
+	if command_line_arguments.headless_ticks is not None:
+		return _run_headless(command_line_arguments)
+
+	_modules.gui = Gui()
 	try:
 		NetworkInterface.create_instance()
 		NetworkInterface().add_to_extscheduler()
@@ -259,26 +266,8 @@ def _start_map(map_name, is_scenario = False):
 	"""Start a map specified by user
 	@return: bool, whether loading succeded"""
 	maps = SavegameManager.get_scenarios() if is_scenario else SavegameManager.get_maps()
-	map_file = None
-	for i in xrange(0, len(maps[1])):
-		# exact match
-		if maps[1][i] == map_name:
-			map_file = maps[0][i]
-			break
-		# check for partial match
-		if maps[1][i].startswith(map_name):
-			if map_file is not None:
-				# multiple matches, collect all for output
-				map_file += u'\n' + maps[0][i]
-			else:
-				map_file = maps[0][i]
+	map_file = _find_matching_map(map_name, maps, _("Error: Cannot find map \"%s\".") % map_name)
 	if map_file is None:
-		print _("Error: Cannot find map \"%s\".") % map_name
-		return False
-	if len(map_file.splitlines()) > 1:
-		print _("Error: Found multiple matches: ")
-		for match in map_file.splitlines():
-			print os.path.basename(match)
 		return False
 	load_game(map_file, is_scenario)
 	return True
@@ -292,29 +281,42 @@ def _load_map(savegamename):
 	"""Load a map specified by user
 	@return: bool, whether loading succeded"""
 	saves = SavegameManager.get_saves()
+	map_file = _find_matching_map(savegamename, saves, \
+	                              _("Error: Cannot find savegame \"%s\".") % savegamename)
+	if map_file is None:
+		return False
+	load_game(map_file)
+	return True
+
+def _find_matching_map(name, maps, not_found_message):
+	"""Finds the file of a map or savegame by its name. Unique partial matches are accepted too.
+	Prints an error if there is no unique match.
+	@param name: name the user specified
+	@param maps: tuple (files, names) as returned by SavegameManager
+	@param not_found_message: error to print if there is no match at all
+	@return: filename or None"""
 	map_file = None
-	for i in xrange(0, len(saves[1])):
+	for i in xrange(0, len(maps[1])):
 		# exact match
-		if saves[1][i] == savegamename:
-			map_file = saves[0][i]
+		if maps[1][i] == name:
+			map_file = maps[0][i]
 			break
 		# check for partial match
-		if saves[1][i].startswith(savegamename):
+		if maps[1][i].startswith(name):
 			if map_file is not None:
 				# multiple matches, collect all for output
-				map_file += u'\n' + saves[0][i]
+				map_file += u'\n' + maps[0][i]
 			else:
-				map_file = saves[0][i]
+				map_file = maps[0][i]
 	if map_file is None:
-		print _("Error: Cannot find savegame \"%s\".") % savegamename
-		return False
+		print not_found_message
+		return None
 	if len(map_file.splitlines()) > 1:
 		print _("Error: Found multiple matches: ")
 		for match in map_file.splitlines():
 			print os.path.basename(match)
-		return False
-	load_game(map_file)
-	return True
+		return None
+	return map_file
 
 def _load_last_quicksave():
 	"""Load last quicksave
@@ -329,6 +331,58 @@ def _load_last_quicksave():
 	load_game(save)
 	return True
 
+def _setup_headless_engine():
+	"""Configures the engine to work without display and sound for headless mode"""
+	from fife.extensions.fife_settings import FIFE_MODULE
+	# SDL provides a dummy video driver, that doesn't need a display
+	os.environ['SDL_VIDEODRIVER'] = 'dummy'
+	fife.engine_settings.setRenderBackend('SDL')
+	# only changed for this run, settings aren't saved
+	fife.settings.set(FIFE_MODULE, "PlaySounds", False)
+
+def _run_headless(command_line_arguments):
+	"""Simulates a map or savegame without graphical output and prints the ticks per second.
+	@param command_line_arguments: options object, see start()
+	@return: bool, whether loading succeded"""
+	from horizons.headlesssession import HeadlessSession, NullObject
+
+	is_scenario = False
+	if command_line_arguments.start_map is not None:
+		map_file = _find_matching_map(command_line_arguments.start_map, SavegameManager.get_maps(), \
+		                              _("Error: Cannot find map \"%s\".") % command_line_arguments.start_map)
+	elif command_line_arguments.start_scenario is not None:
+		is_scenario = True
+		map_file = _find_matching_map(command_line_arguments.start_scenario, SavegameManager.get_scenarios(), \
+		                              _("Error: Cannot find map \"%s\".") % command_line_arguments.start_scenario)
+	elif command_line_arguments.load_map is not None:
+		map_file = _find_matching_map(command_line_arguments.load_map, SavegameManager.get_saves(), \
+		                              _("Error: Cannot find savegame \"%s\".") % command_line_arguments.load_map)
+	else:
+		map_file = SavegameManager.get_maps()[0][0]
+	if map_file is None:
+		return False
+
+	# there is no gui, but some code reports errors via horizons.main._modules.gui
+	_modules.gui = NullObject()
+	_modules.session = HeadlessSession(db)
+	players = [ { 'id' : 1, 'name' : "Player", 'color' : Color[1], 'local' : True } ]
+	_modules.session.load(map_file, players, is_scenario=is_scenario)
+
+	if command_line_arguments.headless_profile is not None:
+		from horizons.scheduler import Scheduler
+		Scheduler().start_profiling()
+	ticks, seconds = _modules.session.run(command_line_arguments.headless_ticks)
+	if command_line_arguments.headless_profile is not None:
+		Scheduler().stop_profiling().write(command_line_arguments.headless_profile)
+		print _("Profile written to %s.") % command_line_arguments.headless_profile
+	print _("Simulated %(ticks)d ticks of %(map)s in %(seconds).2f seconds (%(tps).1f ticks/second).") % \
+	      {'ticks' : ticks, 'map' : map_file, 'seconds' : seconds, 'tps' : ticks / max(seconds, 1e-9)}
+
+	_modules.session.end()
+	_modules.session = None
+	ExtScheduler.destroy_instance()
+	return True
+
 def _create_db():
 	"""Returns a dbreader instance, that is connected to the main game data dbfiles.
 	NOTE: This data is read_only, so there are no concurrency issues"""
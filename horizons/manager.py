@@ -19,16 +19,19 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+import time
 import operator
 import logging
 
 import horizons.main
 
 from horizons.timer import Timer
-from horizons.util import WorldObject
+from horizons.util import WorldObject, WorldDigest
 from horizons.util.living import LivingObject
 from horizons.command.building import Build
+from horizons.entities import Entities
 from horizons.network import CommandError
+from horizons.network import wireformat
 
 class SPManager(LivingObject):
 	"""The manager class takes care of command issuing to the timermanager, sends tick-packets
@@ -83,7 +86,12 @@ class SPManager(LivingObject):
 class MPManager(LivingObject):
 	"""Handler for commands.
 	Initiates sending commands over the network for multiplayer games and their correct
-	execution time and is also responsible for handling lags"""
+	execution time and is also responsible for handling lags.
+
+	Every HASH_EVAL_DISTANCE ticks, the players exchange the checksum of their game state
+	(see WorldDigest) to detect desyncs. Usually only the checksum is sent, after a desync
+	has been detected, the checksums of the subsystems are sent (drill-down mode), so the
+	hash diff shows which parts of the game state are affected."""
 	log =  logging.getLogger("mpmanager")
 	EXECUTIONDELAY = 4
 	HASHDELAY = 8
@@ -99,6 +107,8 @@ class MPManager(LivingObject):
 		self.checkuphashmanager = MPCheckupHashManager(self)
 		self.gamecommands = [] # commands from the local user
 		self.localcommands = [] # (only local) commands from the local user
+		self.hash_drill_down = False # whether to send the checksums of the subsystems
+		self._coords_in_construction = None # cache for get_coords_in_construction
 
 		self.session.timer.add_test(self.can_tick)
 		self.session.timer.add_call(self.tick)
@@ -108,8 +118,19 @@ class MPManager(LivingObject):
 
 		self._last_local_commands_send_tick = -1 # last tick, where local commands got sent
 
+		# lag metrics, see get_lag_metrics
+		self.stall_ticks = 0
+		self.stall_ticks_by_player = {}
+		self._last_stalled_tick = -1
+		self._stalled_players = set() # players that have been blamed for _last_stalled_tick
+
 	def end(self):
-		pass
+		stall_ticks, players = self.get_lag_metrics()
+		self.log.info("MPManager: %s ticks had to wait for packets", stall_ticks)
+		for player_id, (delay, player_stall_ticks) in sorted(players.iteritems()):
+			self.log.info("MPManager: player %s: last packet delay %.3f s, %s ticks waited for it", \
+			              player_id, delay, player_stall_ticks)
+		super(MPManager, self).end()
 
 	def can_tick(self, tick):
 		"""Checks if we can execute this tick via return value"""
@@ -120,7 +141,8 @@ class MPManager(LivingObject):
 		except CommandError:
 			return Timer.TEST_SKIP
 
-		for packet in packets:
+		for data in packets:
+			packet = MPPacket.unserialize(data)
 			if isinstance(packet, CommandPacket):
 				self.log.debug("Got command packet from " + str(packet.player_id) + " for tick " + str(packet.tick))
 				self.commandsmanager.add_packet(packet)
@@ -128,7 +150,7 @@ class MPManager(LivingObject):
 				self.log.debug("Got checkhash packet from " + str(packet.player_id) + " for tick " + str(packet.tick))
 				self.checkuphashmanager.add_packet(packet)
 			else:
-				self.log.warn("invalid packet: "+str(packet))
+				self.log.warn("invalid packet: "+repr(data))
 
 		# send out new commands
 		# check if we already sent commands for this tick (only 1 packet per tick is allowed,
@@ -138,9 +160,10 @@ class MPManager(LivingObject):
 			commandpacket = CommandPacket(self.calculate_execution_tick(tick), \
 					self.session.world.player.worldid, self.gamecommands)
 			self.gamecommands = []
+			self._coords_in_construction = None
 			self.commandsmanager.add_packet(commandpacket)
 			self.log.debug("sending command for tick %d" % (commandpacket.tick))
-			self.networkinterface.send_to_all_clients(commandpacket)
+			self.networkinterface.send_to_all_clients(commandpacket.serialize())
 
 			self.localcommandsmanager.add_packet(CommandPacket(self.calculate_execution_tick(tick), \
 					self.session.world.player.worldid, self.localcommands))
@@ -148,13 +171,14 @@ class MPManager(LivingObject):
 
 			# check if we have to evaluate a hash value
 			if self.calculate_hash_tick(tick) % self.HASH_EVAL_DISTANCE == 0:
-				hash_value = self.session.world.get_checkup_hash()
+				digest = WorldDigest()
+				hash_value = digest.get_values() if self.hash_drill_down else digest.get_value()
 				#self.log.debug("MPManager: Checkup hash for tick %s is %s", tick, hash_value)
 				checkuphashpacket = CheckupHashPacket(self.calculate_hash_tick(tick), \
 			                              self.session.world.player.worldid, hash_value)
 				self.checkuphashmanager.add_packet(checkuphashpacket)
 				self.log.debug("sending checkuphash for tick %d" % (checkuphashpacket.tick))
-				self.networkinterface.send_to_all_clients(checkuphashpacket)
+				self.networkinterface.send_to_all_clients(checkuphashpacket.serialize())
 
 		# decide if tick can be calculated
 		# in the first few ticks, no data is available
@@ -163,6 +187,7 @@ class MPManager(LivingObject):
 			return Timer.TEST_PASS
 		else:
 			self.log.debug("MPManager: check tick %s ready: no", tick)
+			self._register_stall(tick, self.commandsmanager)
 			return Timer.TEST_SKIP
 
 	def tick(self, tick):
@@ -170,6 +195,7 @@ class MPManager(LivingObject):
 		This code may only be reached if we are allowed to tick now (@see can_tick)"""
 		# calculate command packets for this tick
 		command_packets = self.commandsmanager.get_packets_for_tick(tick)
+		self._coords_in_construction = None
 		command_packets.extend(self.localcommandsmanager.get_packets_for_tick(tick))
 		# sort by player, so that the packets get executed in the same order in every client
 		# (packets are already in a special order within the packets, so no further sorting is necessary)
@@ -184,18 +210,52 @@ class MPManager(LivingObject):
 		if self.checkuphashmanager.is_tick_ready(tick) or tick < self.HASHDELAY:
 			return Timer.TEST_PASS
 		else:
+			self._register_stall(tick, self.checkuphashmanager)
 			return Timer.TEST_SKIP
 
+	def _register_stall(self, tick, packetmanager):
+		"""Counts tick as stalled and blames the players whose packets for it are missing in
+		packetmanager. The timer tests the tick until it can be executed, and both the commands
+		and the checkup hashes can stall it, but the tick and every player are counted only once."""
+		if tick != self._last_stalled_tick:
+			self._last_stalled_tick = tick
+			self._stalled_players.clear()
+			self.stall_ticks += 1
+		for player_id in packetmanager.get_missing_players(tick):
+			if player_id not in self._stalled_players:
+				self._stalled_players.add(player_id)
+				self.stall_ticks_by_player[player_id] = self.stall_ticks_by_player.get(player_id, 0) + 1
+
+	def get_lag_metrics(self):
+		"""Returns how much the game is slowed down by the network
+		@return: tuple (number of ticks that had to wait for packets,
+		         { player id : (seconds the last command packet arrived after the first one for
+		                        its tick, number of ticks that had to wait for the player) })"""
+		# the world might already be gone at the end of the game, so only the ids of the players
+		# that have been seen are used
+		player_ids = set(self.commandsmanager.arrival_delays).union(self.stall_ticks_by_player)
+		players = {}
+		for player_id in player_ids:
+			players[player_id] = (self.commandsmanager.arrival_delays.get(player_id, 0.0), \
+			                      self.stall_ticks_by_player.get(player_id, 0))
+		return self.stall_ticks, players
+
 	def hash_value_check(self, tick):
 		if tick % self.HASH_EVAL_DISTANCE == 0:
 			if self.checkuphashmanager.are_checkup_hash_values_equal(tick, self.hash_value_diff) == False:
 				self.log.error("MPManager: Hash values generated in tick %s are not equal" % str(tick - self.HASHDELAY))
+				# all players notice the desync, so they all switch to sending the subsystem values
+				self.hash_drill_down = True
 			else:
 				#self.log.debug("MPManager: Hash values are equal")
 				pass
 
 	def hash_value_diff(self, player1, hash1, player2, hash2):
 		self.log.error("MPManager: Hash diff:\n%s hash1: %s\n%s hash2: %s" % (player1, hash1, player2, hash2))
+		if isinstance(hash1, tuple) and isinstance(hash2, tuple):
+			subsystems = [ subsystem for subsystem, value1, value2 in \
+			               zip(WorldDigest.SUBSYSTEMS, hash1, hash2) if value1 != value2 ]
+			self.log.error("MPManager: Out of sync: %s" % ', '.join(subsystems))
 		self.log.error("------------------")
 
 
@@ -214,6 +274,7 @@ class MPManager(LivingObject):
 			self.localcommands.append(command)
 		else:
 			self.gamecommands.append(command)
+			self._coords_in_construction = None
 
 	def get_player_count(self):
 		return len(self.session.world.players)
@@ -228,6 +289,19 @@ class MPManager(LivingObject):
 			commandlist.append(cmd)
 		return filter(lambda x: type(x)==Build, commandlist)
 
+	def get_coords_in_construction(self):
+		"""Returns the coords, that are covered by the builds in construction.
+		The set is cached until the local commands change, so don't modify it.
+		@return: set of (x, y) tuples"""
+		if self._coords_in_construction is None:
+			coords = set()
+			for build in self.get_builds_in_construction():
+				(sizex, sizey) = Entities.buildings[build.building_class].size
+				coords.update( (x, y) for x in xrange(build.x, build.x+sizex) \
+				                      for y in xrange(build.y, build.y+sizey) )
+			self._coords_in_construction = coords
+		return self._coords_in_construction
+
 	def load(self, db):
 		"""Execute outstanding commands, loaded from db.
 		Currently not supported for MP"""
@@ -237,28 +311,52 @@ class MPManager(LivingObject):
 ################################################
 
 class MPPacketmanager(object):
+	"""Stores packets by the tick they are meant for, so that checking whether all players
+	have sent their packet for a tick and getting the packets only depends on the number of players.
+	Additionally, it measures the delay of the players' packets: For every tick, the time is
+	stored when the first packet for it arrived (usually the local one), the arrival_delays
+	are the seconds it took until the packets of the other players arrived."""
 	def __init__(self, mpmanager):
 		self.mpmanager = mpmanager
-		self.command_packet_list = []
+		self.packets_by_tick = {} # { tick : [packets] }
+		self.players_by_tick = {} # { tick : set(ids of players that sent a packet for the tick) }
+		self.first_arrival_time = {} # { tick : time.time() when the first packet arrived }
+		self.arrival_delays = {} # { player id : seconds of delay of the last packet }
 
 	def is_tick_ready(self, tick):
 		"""Check if packets from all players have arrived (necessary for tick to begin)"""
-		#print 'packets for tick: ',  list(str(x) for x in self.get_packets_for_tick(tick, remove_returned_commands=False))
-		return len(self.get_packets_for_tick(tick, remove_returned_commands=False)) == self.mpmanager.get_player_count()
+		return len(self.players_by_tick.get(tick, ())) == self.mpmanager.get_player_count()
+
+	def get_missing_players(self, tick):
+		"""Returns ids of the players, whose packets for tick haven't arrived yet"""
+		arrived = self.players_by_tick.get(tick, ())
+		return [ player.worldid for player in self.mpmanager.session.world.players \
+		         if player.worldid not in arrived ]
 
 	def get_packets_for_tick(self, tick, remove_returned_commands=True):
 		"""Returns packets that are to be executed at a certain tick"""
-		command_packets = filter(lambda x: x.tick==tick, self.command_packet_list)
 		if remove_returned_commands:
-			self.command_packet_list = filter(lambda x: x.tick!=tick, self.command_packet_list)
-		return command_packets
+			self.players_by_tick.pop(tick, None)
+			self.first_arrival_time.pop(tick, None)
+			return self.packets_by_tick.pop(tick, [])
+		return self.packets_by_tick.get(tick, [])[:]
 
 	def get_packets_from_player(self, player_id):
-		return filter(lambda x: x.player_id==player_id, self.command_packet_list)
+		return [ packet for packets in self.packets_by_tick.itervalues() \
+		         for packet in packets if packet.player_id == player_id ]
 
 	def add_packet(self, command_packet):
 		"""Receive a packet"""
-		self.command_packet_list.append(command_packet)
+		tick = command_packet.tick
+		if tick in self.packets_by_tick:
+			self.packets_by_tick[tick].append(command_packet)
+			self.players_by_tick[tick].add(command_packet.player_id)
+			self.arrival_delays[command_packet.player_id] = time.time() - self.first_arrival_time[tick]
+		else:
+			self.packets_by_tick[tick] = [command_packet]
+			self.players_by_tick[tick] = set([command_packet.player_id])
+			self.first_arrival_time[tick] = time.time()
+			self.arrival_delays[command_packet.player_id] = 0.0
 
 class MPCommandsManager(MPPacketmanager):
 	pass
@@ -274,7 +372,7 @@ class MPCheckupHashManager(MPPacketmanager):
 	def are_checkup_hash_values_equal(self, tick, cb_diff = None):
 		pkges = self.get_packets_for_tick(tick)
 		for pkg in pkges[1:]:
-			if pkges[0].checkup_hash != pkg.checkup_hash:
+			if self._get_checksum(pkges[0].checkup_hash) != self._get_checksum(pkg.checkup_hash):
 				if cb_diff is not None:
 					localplayerid = self.mpmanager.session.world.player.worldid
 					cb_diff("local" if pkges[0].player_id==localplayerid else "pl#%02d" % (pkges[0].player_id), \
@@ -284,11 +382,24 @@ class MPCheckupHashManager(MPPacketmanager):
 				return False
 		return True
 
+	def _get_checksum(self, checkup_hash):
+		"""Returns the checksum of the whole game state for a checkup hash, which
+		contains the checksums of the subsystems in drill-down mode"""
+		if isinstance(checkup_hash, tuple):
+			return WorldDigest.combine(checkup_hash)
+		return checkup_hash
+
 # Packages transmitted over the network
 #######################################
 
 class MPPacket(object):
-	"""Packet to be sent from every player to every player"""
+	"""Packet to be sent from every player to every player.
+	Packets are sent in the format of horizons.network.wireformat: the header, the packet type,
+	tick and player id as varints and the data of the packet type."""
+	log = logging.getLogger("mpmanager")
+	# packet type ids
+	EMPTY_COMMAND_PACKET, COMMAND_PACKET, CHECKUP_HASH_PACKET = range(3)
+
 	def __init__(self, tick, player_id):
 		self.tick = tick
 		self.player_id = player_id
@@ -296,6 +407,45 @@ class MPPacket(object):
 	def __str__(self):
 		return "packet " + str(self.__class__)  + " from player " + str(WorldObject.get_object_by_id(self.player_id)) + " for tick " + str(self.tick)
 
+	def serialize(self):
+		"""Returns the packet encoded for sending"""
+		encoder = wireformat.Encoder()
+		encoder.write_uint(self._get_packet_type())
+		encoder.write_uint(self.tick)
+		encoder.write_uint(self.player_id)
+		self._serialize_data(encoder)
+		return encoder.getvalue()
+
+	@classmethod
+	def unserialize(cls, data):
+		"""Decodes a packet that has been encoded with serialize()
+		@param data: str
+		@return: MPPacket or None if data isn't a valid packet"""
+		if not data.startswith(wireformat.HEADER):
+			return None
+		try:
+			decoder = wireformat.Decoder(data)
+			packet_type = decoder.read_uint()
+			tick = decoder.read_uint()
+			player_id = decoder.read_uint()
+			if packet_type == cls.EMPTY_COMMAND_PACKET:
+				return CommandPacket(tick, player_id, [])
+			elif packet_type == cls.COMMAND_PACKET:
+				return CommandPacket(tick, player_id, decoder.read_value())
+			elif packet_type == cls.CHECKUP_HASH_PACKET:
+				return CheckupHashPacket(tick, player_id, decoder.read_value())
+		except wireformat.WireFormatError, e:
+			cls.log.warn("MPPacket: can't decode packet: %s", e)
+		return None
+
+	def _get_packet_type(self):
+		raise NotImplementedError
+
+	def _serialize_data(self, encoder):
+		"""Encodes the data of the packet type
+		@param encoder: wireformat.Encoder"""
+		pass
+
 class CommandPacket(MPPacket):
 	"""Packet to be sent from every player to every player every tick.
 	Contains list of packets to be executed as well as the designated execution time.
@@ -304,7 +454,21 @@ class CommandPacket(MPPacket):
 		super(CommandPacket, self).__init__(tick, player_id)
 		self.commandlist = commandlist
 
+	def _get_packet_type(self):
+		# most packets don't contain any commands, they are sent without data
+		return self.COMMAND_PACKET if self.commandlist else self.EMPTY_COMMAND_PACKET
+
+	def _serialize_data(self, encoder):
+		if self.commandlist:
+			encoder.write_value(self.commandlist)
+
 class CheckupHashPacket(MPPacket):
 	def __init__(self, tick, player_id, checkup_hash):
 		super(CheckupHashPacket, self).__init__(tick, player_id)
 		self.checkup_hash = checkup_hash
+
+	def _get_packet_type(self):
+		return self.CHECKUP_HASH_PACKET
+
+	def _serialize_data(self, encoder):
+		encoder.write_value(self.checkup_hash)
@@ -19,10 +19,9 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-import random
-
 from horizons.session import Session
 from horizons.manager import MPManager
+from horizons.util import WorldDigest, DigestRandom
 
 class MPSession(Session):
 	def __init__(self, gui, db, network_interface, rng_seed):
@@ -32,13 +31,15 @@ class MPSession(Session):
 		"""
 		self.__network_interface = network_interface
 		self.__rng_seed = rng_seed
+		# the digest has to record every change of the game state, starting with the creation of the world
+		WorldDigest.create_instance()
 		super(MPSession, self).__init__(gui, db)
 
 	def create_manager(self):
 		return MPManager(self, self.__network_interface)
 
 	def create_rng(self):
-		return random.Random(self.__rng_seed)
+		return DigestRandom(WorldDigest(), self.__rng_seed)
 
 	def speed_set(self, ticks):
 		self.gui.show_popup(_("Not possible"), _("You cannot change the speed of a multiplayer game"))
@@ -46,6 +47,7 @@ class MPSession(Session):
 	def end(self):
 		self.__network_interface.disconnect()
 		super(MPSession, self).end()
+		WorldDigest.destroy_instance()
 
 	def autosave(self):
 		self.gui.show_popup(_("Not possible"), _("Save/load for multiplayer games is not possible yet"))
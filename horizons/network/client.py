@@ -375,7 +375,8 @@ class Client(object):
 		if event is None:
 			return None
 		elif event.type == enet.EVENT_TYPE_RECEIVE:
-			packet = packets.unserialize(event.packet.data)
+			# peers may only send game data, which is never unpickled
+			packet = packets.unserialize(event.packet.data, self.mode is not ClientMode.Peer2Peer)
 			if packet is None:
 				self.log.error("Unknown packet from %s!" % (event.peer.address))
 				self.disconnect()
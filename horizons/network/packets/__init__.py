@@ -22,6 +22,7 @@
 import cPickle
 
 from horizons.network import find_enet_module
+from horizons.network import wireformat
 enet = find_enet_module()
 
 
@@ -68,7 +69,12 @@ packetlist.append(cmd_fatalerror)
 
 #-------------------------------------------------------------------------------
 
-def unserialize(data):
+def unserialize(data, allow_pickle = True):
+  # game data between peers isn't pickled, see p2p.data
+  if wireformat.is_wireformat(data):
+    return horizons.network.packets.p2p.data(data)
+  if not allow_pickle:
+    return None
   try:
     packet = cPickle.loads(data)
   except Exception:
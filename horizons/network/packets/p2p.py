@@ -20,10 +20,17 @@
 # ###################################################
 
 from horizons.network.packets import *
+from horizons.network import wireformat
 
 class data(packet):
 	def __init__(self, data):
 		self.data = data
 
+	def serialize(self):
+		# data that is already encoded in the wireformat is sent as it is
+		if isinstance(self.data, str) and wireformat.is_wireformat(self.data):
+			return self.data
+		return packet.serialize(self)
+
 packetlist.append(data)
 
@@ -0,0 +1,256 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""Compact binary encoding for the data that is exchanged between the players of a
+multiplayer game (see the MPPackets in horizons/manager.py).
+
+Unlike pickle, only plain values (None, bool, int, float, str, unicode, tuple, list, set,
+dict) and commands can be encoded. Commands are identified by their index in the
+registry of all classes in horizons/command, their attributes are plain values.
+Integers are stored as varints, so small ids and ticks take one or two bytes, and
+repeated strings are replaced by references.
+
+All data starts with MAGIC and FORMAT_VERSION. Increase the version when the encoding
+or the packet layout changes.
+"""
+
+import struct
+
+MAGIC = '\xb5' # can't be the first byte of a pickle
+FORMAT_VERSION = 1
+HEADER = MAGIC + chr(FORMAT_VERSION)
+
+class WireFormatError(Exception):
+	"""Raised for data that can't be encoded or decoded"""
+
+# type tags of encoded values
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _STR_REF, _UNICODE, _TUPLE, _LIST, _SET, _DICT, _COMMAND = \
+  [ chr(i) for i in xrange(13) ]
+
+_command_types = None # list of command classes, index is the id used in the encoding
+_command_ids = None # { command class : id }
+
+def get_command_types():
+	"""Returns all command classes, sorted so that every client assigns the same ids to them"""
+	global _command_types, _command_ids
+	if _command_types is None:
+		from horizons.command import Command
+		import horizons.command.building, horizons.command.misc, horizons.command.objectupgrades, \
+		       horizons.command.production, horizons.command.sounds, horizons.command.uioptions, \
+		       horizons.command.unit
+		classes = set()
+		todo = [Command]
+		while todo:
+			for subclass in todo.pop().__subclasses__():
+				if subclass not in classes:
+					classes.add(subclass)
+					todo.append(subclass)
+		_command_types = sorted(classes, key=lambda cls: (cls.__module__, cls.__name__))
+		_command_ids = dict( (cls, i) for i, cls in enumerate(_command_types) )
+	return _command_types
+
+def is_wireformat(data):
+	"""Returns whether data has been encoded in this format (of any version)"""
+	return data[:1] == MAGIC
+
+class Encoder(object):
+	"""Encodes values to a str.
+	Strings that occur more than once, such as the attribute names of commands, are only
+	written once, later occurrences refer to the first one by index."""
+	def __init__(self, header=HEADER):
+		self.out = [header]
+		self.strings = {} # { str : index }
+
+	def getvalue(self):
+		return ''.join(self.out)
+
+	def write_uint(self, value):
+		"""Appends value as varint (7 bits per byte, lowest first)
+		@param value: int >= 0"""
+		append = self.out.append
+		if value < 0x80: # most numbers fit in one byte
+			append(chr(value))
+			return
+		while value > 0x7f:
+			append(chr((value & 0x7f) | 0x80))
+			value >>= 7
+		append(chr(value))
+
+	def write_str(self, value):
+		"""Appends a str, or a reference if it has been written before"""
+		index = self.strings.get(value)
+		if index is not None:
+			self.out.append(_STR_REF)
+			self.write_uint(index)
+		else:
+			self.strings[value] = len(self.strings)
+			self.out.append(_STR)
+			self.write_uint(len(value))
+			self.out.append(value)
+
+	def write_value(self, value):
+		"""Appends the encoding of value"""
+		out = self.out
+		value_type = type(value)
+		if value is None:
+			out.append(_NONE)
+		elif value_type is bool:
+			out.append(_TRUE if value else _FALSE)
+		elif value_type is int or value_type is long:
+			out.append(_INT)
+			# zigzag encoding, so that small negative numbers stay small
+			self.write_uint((value << 1) if value >= 0 else ((-value << 1) - 1))
+		elif value_type is float:
+			out.append(_FLOAT)
+			out.append(struct.pack('<d', value))
+		elif value_type is str:
+			self.write_str(value)
+		elif value_type is unicode:
+			out.append(_UNICODE)
+			value = value.encode('utf-8')
+			self.write_uint(len(value))
+			out.append(value)
+		elif value_type is tuple or value_type is list or value_type is set:
+			out.append(_TUPLE if value_type is tuple else _LIST if value_type is list else _SET)
+			self.write_uint(len(value))
+			for item in value:
+				self.write_value(item)
+		elif value_type is dict:
+			out.append(_DICT)
+			self.write_uint(len(value))
+			for key, item in value.iteritems():
+				self.write_value(key)
+				self.write_value(item)
+		else:
+			if _command_ids is None:
+				get_command_types()
+			if value_type not in _command_ids:
+				raise WireFormatError("Can't encode %s" % value_type)
+			out.append(_COMMAND)
+			self.write_uint(_command_ids[value_type])
+			attributes = sorted(value.__dict__.iteritems())
+			self.write_uint(len(attributes))
+			for name, item in attributes:
+				self.write_str(name)
+				self.write_value(item)
+
+
+class Decoder(object):
+	"""Decodes values that have been encoded by an Encoder
+	@param data: str
+	@param pos: position in data where the encoded values start"""
+	def __init__(self, data, pos=len(HEADER)):
+		self.data = data
+		self.pos = pos
+		self.strings = [] # strings in the order they were read
+
+	def read_uint(self):
+		"""Reads a varint
+		@raise WireFormatError: if the data is truncated"""
+		try:
+			return self._read_uint()
+		except IndexError:
+			raise WireFormatError("Truncated data")
+
+	def read_value(self):
+		"""Reads an encoded value
+		@raise WireFormatError: if the data is truncated or invalid"""
+		try:
+			return self._read_value()
+		except IndexError:
+			raise WireFormatError("Truncated data")
+		except (TypeError, ValueError), e:
+			# e.g. unhashable dict keys or invalid utf-8
+			raise WireFormatError("Invalid data: %s" % e)
+
+	def _read_uint(self):
+		data = self.data
+		pos = self.pos
+		value = ord(data[pos])
+		if value < 0x80: # most numbers fit in one byte
+			self.pos = pos + 1
+			return value
+		value = 0
+		shift = 0
+		while True:
+			byte = ord(data[pos])
+			pos += 1
+			value |= (byte & 0x7f) << shift
+			if byte < 0x80:
+				self.pos = pos
+				return value
+			shift += 7
+
+	def read_bytes(self, length):
+		value = self.data[self.pos:self.pos+length]
+		if len(value) != length:
+			raise WireFormatError("Truncated data")
+		self.pos += length
+		return value
+
+	def _read_value(self):
+		data = self.data
+		tag = data[self.pos]
+		self.pos += 1
+		if tag == _INT:
+			value = ord(data[self.pos])
+			if value < 0x80:
+				self.pos += 1
+			else:
+				value = self._read_uint()
+			return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+		elif tag == _STR_REF:
+			return self.strings[self._read_uint()]
+		elif tag == _STR:
+			value = self.read_bytes(self._read_uint())
+			self.strings.append(value)
+			return value
+		elif tag == _NONE:
+			return None
+		elif tag == _FALSE or tag == _TRUE:
+			return tag == _TRUE
+		elif tag == _FLOAT:
+			return struct.unpack('<d', self.read_bytes(8))[0]
+		elif tag == _UNICODE:
+			return self.read_bytes(self._read_uint()).decode('utf-8')
+		elif tag == _TUPLE or tag == _LIST or tag == _SET:
+			items = [ self._read_value() for i in xrange(self._read_uint()) ]
+			return tuple(items) if tag == _TUPLE else items if tag == _LIST else set(items)
+		elif tag == _DICT:
+			value = {}
+			for i in xrange(self._read_uint()):
+				key = self._read_value()
+				value[key] = self._read_value()
+			return value
+		elif tag == _COMMAND:
+			type_id = self._read_uint()
+			command_types = get_command_types()
+			if type_id >= len(command_types):
+				raise WireFormatError("Unknown command type %s" % type_id)
+			command = command_types[type_id].__new__(command_types[type_id])
+			for i in xrange(self._read_uint()):
+				name = self._read_value()
+				if type(name) is not str:
+					raise WireFormatError("Invalid attribute name %r" % name)
+				command.__dict__[name] = self._read_value()
+			return command
+		raise WireFormatError("Unknown type tag %r" % tag)
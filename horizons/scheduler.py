@@ -20,15 +20,24 @@
 # ###################################################
 
 import logging
-import copy
 
 from horizons.util import LivingObject, ManualConstructionSingleton, decorators
 from horizons.constants import GAME
+from horizons.schedulerprofiler import SchedulerProfiler
 
 class Scheduler(LivingObject):
 	""""Class providing timed callbacks.
 	To start a timed callback, call add_new_object() to make the TimingThread Class create a CallbackObject for you.
 	@param timer: Timer instance the schedular registers itself with.
+
+	Scheduled calls are kept in buckets per tick. Each call in a bucket is an entry
+	[CallbackObject, tick, active]. Removed calls are just deactivated and skipped when their
+	tick is reached, so that they don't have to be searched in the buckets.
+	The active entries are additionally indexed by the id of their class instance, which makes
+	looking up and removing the calls of an instance cheap.
+
+	Calls can be measured with a SchedulerProfiler (see start_profiling). While profiling is
+	disabled, this costs only a check per call.
 	"""
 	__metaclass__ = ManualConstructionSingleton
 
@@ -41,14 +50,19 @@ class Scheduler(LivingObject):
 		super(Scheduler, self).__init__()
 		self.schedule = {}
 		self.additional_cur_tick_schedule = [] # jobs to be executed at the same tick they were added
+		# { id(class_instance): { CallbackObject: [entry, ..] } }
+		self.calls_by_instance = {}
 		self.cur_tick = 0
+		self.profiler = None
 		self.timer = timer
 		self.timer.add_call(self.tick)
 
 	def end(self):
 		self.log.debug("Scheduler end; len: %s", len(self.schedule))
 		self.schedule = None
+		self.calls_by_instance = None
 		self.timer.remove_call(self.tick)
+		self.profiler = None
 		self.timer = None
 		super(Scheduler, self).end()
 
@@ -56,26 +70,62 @@ class Scheduler(LivingObject):
 		"""Threads main loop
 		@param tick_id: int id of the tick.
 		"""
+		profiler = self.profiler
+		if profiler is not None:
+			profiler.start_tick(tick_id)
 		self.cur_tick = tick_id
 		if self.cur_tick in self.schedule:
-			self.log.debug("Scheduler: tick is %s, callbacks: %s", self.cur_tick, self.schedule[self.cur_tick])
-			for callback in copy.copy(self.schedule[self.cur_tick]):
-				# NOTE: why copy the schedule? can it be changed in any way? maybe by remove_all_classinst..?
+			# calls removed while this tick is executed are still executed, but they can be
+			# found by get_classinst_calls until all calls of this tick are done.
+			entries = [ entry for entry in self.schedule[self.cur_tick] if entry[2] ]
+			# removing an entry drops its callback, so get them before any is executed
+			callbacks = [ entry[0] for entry in entries ]
+			self.log.debug("Scheduler: tick is %s, callbacks: %s", self.cur_tick, callbacks)
+			for callback in callbacks:
 				self.log.debug("Scheduler(t:%s) calling %s", tick_id, callback)
-				callback.callback()
+				if profiler is None:
+					callback.callback()
+				else:
+					profiler.execute(callback)
 				assert callback.loops >= -1
 				if callback.loops != 0:
 					self.add_object(callback, readd=True)
 			del self.schedule[self.cur_tick]
+			for entry in entries:
+				if entry[2]:
+					self._remove_entry(entry)
 
 			# run jobs added in the loop above
 			for callback in self.additional_cur_tick_schedule:
 				assert callback.loops == 0 # can't loop with no delay
-				callback.callback()
+				if profiler is None:
+					callback.callback()
+				else:
+					profiler.execute(callback)
 			self.additional_cur_tick_schedule = []
 
+		if profiler is not None:
+			profiler.end_tick()
 		assert (len(self.schedule) == 0) or self.schedule.keys()[0] > self.cur_tick
 
+	def start_profiling(self, profiler=None):
+		"""Starts measuring the executed calls.
+		@param profiler: SchedulerProfiler to record to, a new one is created if it is None
+		@return: the SchedulerProfiler that is used"""
+		if self.profiler is None:
+			self.profiler = profiler if profiler is not None else SchedulerProfiler()
+		return self.profiler
+
+	def stop_profiling(self):
+		"""Stops measuring the executed calls.
+		@return: the SchedulerProfiler that was used, or None if profiling wasn't enabled"""
+		profiler = self.profiler
+		self.profiler = None
+		return profiler
+
+	def is_profiling(self):
+		return self.profiler is not None
+
 	def add_object(self, callback_obj, readd=False):
 		"""Adds a new CallbackObject instance to the callbacks list for the first time
 		@param callback_obj: CallbackObject type object, containing all neccessary  information
@@ -88,9 +138,28 @@ class Scheduler(LivingObject):
 		else: # default: run in future tick
 			interval = callback_obj.loop_interval if readd else callback_obj.run_in
 			tick_key = self.cur_tick + interval
+			entry = [callback_obj, tick_key, True]
 			if not tick_key in self.schedule:
 				self.schedule[tick_key] = []
-			self.schedule[tick_key].append(callback_obj)
+			self.schedule[tick_key].append(entry)
+			self.calls_by_instance.setdefault(id(callback_obj.class_instance), {}). \
+			  setdefault(callback_obj, []).append(entry)
+
+	def _remove_entry(self, entry):
+		"""Deactivates an entry and removes it from the index.
+		The entry stays in the schedule until its tick, so the reference to the callback
+		(and therefore to its class instance) is dropped here."""
+		entry[2] = False
+		callback_obj = entry[0]
+		entry[0] = None
+		key = id(callback_obj.class_instance)
+		calls = self.calls_by_instance[key]
+		entries = calls[callback_obj]
+		entries.remove(entry)
+		if not entries:
+			del calls[callback_obj]
+			if not calls:
+				del self.calls_by_instance[key]
 
 	def add_new_object(self, callback, class_instance, run_in=1, loops=1, loop_interval=None):
 		"""Creates a new CallbackObject instance and calls the self.add_object() function.
@@ -107,22 +176,21 @@ class Scheduler(LivingObject):
 		@param callback_obj: CallbackObject to remove
 		@return: int, number of removed calls
 		"""
-		removed_objs = 0
-		if self.schedule is not None:
-			for key in self.schedule:
-				for i in xrange(0, self.schedule[key].count(callback_obj)):
-					self.schedule[key].remove(callback_obj)
-					removed_objs += 1
-		return removed_objs
-
+		if self.schedule is None:
+			return 0
+		calls = self.calls_by_instance.get(id(callback_obj.class_instance), {})
+		entries = calls.get(callback_obj, [])[:]
+		for entry in entries:
+			self._remove_entry(entry)
+		return len(entries)
 
-	#TODO: Check if this is still necessary for weak referenced objects
 	def rem_all_classinst_calls(self, class_instance):
 		"""Removes all callbacks from the scheduler that belong to the class instance class_inst."""
-		for key in self.schedule:
-			for callback_obj in self.schedule[key]:
-				if callback_obj.class_instance is class_instance:
-					self.schedule[key].remove(callback_obj)
+		calls = self.calls_by_instance.pop(id(class_instance), {})
+		for entries in calls.itervalues():
+			for entry in entries:
+				entry[2] = False
+				entry[0] = None
 
 	def rem_call(self, instance, callback):
 		"""Removes all callbacks of 'instance' that are 'callback'
@@ -132,11 +200,9 @@ class Scheduler(LivingObject):
 		"""
 		assert callable(callback)
 		removed_calls = 0
-		for key in self.schedule:
-			for callback_obj in self.schedule[key]:
-				if callback_obj.class_instance is instance and callback_obj.callback == callback:
-					self.schedule[key].remove(callback_obj)
-					removed_calls += 1
+		calls = self.calls_by_instance.get(id(instance), {})
+		for callback_obj in [ obj for obj in calls if obj.callback == callback ]:
+			removed_calls += self.rem_object(callback_obj)
 		return removed_calls
 
 	def get_classinst_calls(self, instance, callback = None):
@@ -148,13 +214,10 @@ class Scheduler(LivingObject):
 		@return: dict, entries: { CallbackObject: remaining_ticks_to_executing }
 		"""
 		calls = {}
-		for key in self.schedule:
-			for callback_obj in self.schedule[key]:
-				if callback_obj.class_instance is instance:
-					if callback is None:
-						calls[callback_obj] = key - self.cur_tick
-					elif callback_obj.callback == callback:
-						calls[callback_obj] = key - self.cur_tick
+		for callback_obj, entries in self.calls_by_instance.get(id(instance), {}).iteritems():
+			if callback is None or callback_obj.callback == callback:
+				# use the latest entry, if the call has been readded in the current tick
+				calls[callback_obj] = entries[-1][1] - self.cur_tick
 		return calls
 
 	def get_remaining_ticks(self, instance, callback):
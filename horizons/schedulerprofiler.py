@@ -0,0 +1,170 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import gc
+import csv
+import json
+import time
+import heapq
+import collections
+
+class SchedulerProfiler(object):
+	"""Collects statistics about the calls the Scheduler executes.
+	Enable it with Scheduler().start_profiling(), it isn't involved at all otherwise.
+
+	Calls are aggregated by class and name of the called function, e.g.
+	('Collector', 'search_job'). For each of those, the number of calls, the time spent
+	and the net number of allocated objects are recorded. The latter is the difference of the
+	gc allocation counter, so it only includes objects tracked by the garbage collector and
+	is not exact when a collection happens during a call.
+	Additionally, the duration of the ticks is recorded.
+	"""
+	# number of ticks to remember for get_slowest_ticks()
+	NUM_SLOWEST_TICKS = 10
+	# number of ticks to remember for get_recent_ticks()
+	NUM_RECENT_TICKS = 100
+
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		"""Discards all measurements"""
+		# { (class name, function name): [calls, seconds, allocations] }
+		self.calls = {}
+		self.num_ticks = 0
+		self.total_time = 0.0
+		self._slowest_ticks = [] # heap of (seconds, tick_id, calls)
+		self._recent_ticks = collections.deque(maxlen=self.NUM_RECENT_TICKS)
+		self._tick_id = None
+		self._tick_start = None
+		self._tick_calls = 0
+
+	def start_tick(self, tick_id):
+		self._tick_id = tick_id
+		self._tick_calls = 0
+		self._tick_start = time.time()
+
+	def end_tick(self):
+		seconds = time.time() - self._tick_start
+		self.num_ticks += 1
+		self.total_time += seconds
+		tick = (seconds, self._tick_id, self._tick_calls)
+		self._recent_ticks.append(tick)
+		if len(self._slowest_ticks) < self.NUM_SLOWEST_TICKS:
+			heapq.heappush(self._slowest_ticks, tick)
+		elif seconds > self._slowest_ticks[0][0]:
+			heapq.heapreplace(self._slowest_ticks, tick)
+
+	def execute(self, callback_obj):
+		"""Executes the call of a CallbackObject and measures it"""
+		allocations = gc.get_count()[0]
+		start = time.time()
+		callback_obj.callback()
+		seconds = time.time() - start
+		allocations = gc.get_count()[0] - allocations
+
+		self._tick_calls += 1
+		key = self.get_call_name(callback_obj)
+		try:
+			stats = self.calls[key]
+		except KeyError:
+			stats = self.calls[key] = [0, 0.0, 0]
+		stats[0] += 1
+		stats[1] += seconds
+		stats[2] += allocations
+
+	@classmethod
+	def get_call_name(cls, callback_obj):
+		"""Returns the name of a call for the statistics.
+		For methods, the class that defines the method is used, so that e.g. all collectors
+		are summed up, else the class of the instance the call belongs to.
+		@param callback_obj: CallbackObject
+		@return: tuple (class name, function name)"""
+		callback = callback_obj.callback
+		# unwrap horizons.util.Callback and functools.partial
+		while not hasattr(callback, '__name__'):
+			if hasattr(callback, 'callback'):
+				callback = callback.callback
+			elif hasattr(callback, 'func'):
+				callback = callback.func
+			else:
+				callback = callback.__class__
+		name = callback.__name__
+		instance = getattr(callback, 'im_self', None)
+		if instance is not None:
+			for klass in type(instance).__mro__:
+				if name in klass.__dict__:
+					return (klass.__name__, name)
+		return (callback_obj.class_instance.__class__.__name__, name)
+
+	def get_stats(self):
+		"""Returns the statistics of the calls, most expensive first.
+		@return: list of dicts with keys class, function, calls, seconds, allocations"""
+		stats = [ {'class' : key[0], 'function' : key[1], 'calls' : value[0], \
+		           'seconds' : value[1], 'allocations' : value[2]} \
+		          for key, value in self.calls.iteritems() ]
+		stats.sort(key=lambda x: (-x['seconds'], x['class'], x['function']))
+		return stats
+
+	def get_slowest_ticks(self):
+		"""@return: list of tuples (seconds, tick id, number of calls), slowest first"""
+		return sorted(self._slowest_ticks, reverse=True)
+
+	def get_recent_ticks(self):
+		"""@return: list of tuples (seconds, tick id, number of calls), oldest first"""
+		return list(self._recent_ticks)
+
+	def write_csv(self, filename):
+		"""Writes the statistics of the calls to a csv file"""
+		fields = ('class', 'function', 'calls', 'seconds', 'allocations')
+		f = open(filename, 'wb')
+		try:
+			writer = csv.writer(f)
+			writer.writerow(fields)
+			for stats in self.get_stats():
+				writer.writerow([ stats[field] for field in fields ])
+		finally:
+			f.close()
+
+	def write_json(self, filename):
+		"""Writes all statistics to a json file"""
+		ticks = lambda l: [ {'tick' : tick_id, 'seconds' : seconds, 'calls' : calls} \
+		                    for (seconds, tick_id, calls) in l ]
+		data = {
+		  'ticks' : self.num_ticks,
+		  'seconds' : self.total_time,
+		  'calls' : self.get_stats(),
+		  'slowest_ticks' : ticks(self.get_slowest_ticks()),
+		  'recent_ticks' : ticks(self.get_recent_ticks())
+		  }
+		f = open(filename, 'w')
+		try:
+			json.dump(data, f, indent=1)
+		finally:
+			f.close()
+
+	def write(self, filename):
+		"""Writes the statistics to filename, as csv if it ends with .csv, else as json"""
+		if filename.lower().endswith('.csv'):
+			self.write_csv(filename)
+		else:
+			self.write_json(filename)
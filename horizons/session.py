@@ -35,7 +35,7 @@ from horizons.extscheduler import ExtScheduler
 from horizons.view import View
 from horizons.world import World
 from horizons.entities import Entities
-from horizons.util import WorldObject, LivingObject, livingProperty, DbReader
+from horizons.util import WorldObject, LivingObject, livingProperty, PrefetchDbReader, decorators
 from horizons.savegamemanager import SavegameManager
 from horizons.scenario import ScenarioEventHandler
 from horizons.constants import GAME_SPEED
@@ -88,14 +88,14 @@ class Session(LivingObject):
 		self.timer = Timer()
 		Scheduler.create_instance(self.timer)
 		self.manager = self.create_manager()
-		self.view = View(self, (15, 15))
+		self.view = self.create_view()
 		Entities.load(self.db)
 		self.scenario_eventhandler = ScenarioEventHandler(self) # dummy handler with no events
 
 		#GUI
 		self.gui.session = self
-		self.ingame_gui = IngameGui(self, self.gui)
-		self.keylistener = IngameKeyListener(self)
+		self.ingame_gui = self.create_ingame_gui()
+		self.keylistener = self.create_keylistener()
 		self.display_speed()
 
 		self.selected_instances = set()
@@ -113,10 +113,29 @@ class Session(LivingObject):
 		"""Returns a RNG (random number generator). Must support the python random.Random interface"""
 		raise NotImplementedError
 
+	def create_view(self):
+		"""Returns the view that displays the map (see horizons.view)"""
+		return View(self, (15, 15))
+
+	def create_ingame_gui(self):
+		"""Returns the ingame gui (see horizons.gui.ingamegui)"""
+		return IngameGui(self, self.gui)
+
+	def create_keylistener(self):
+		"""Returns the listener for ingame hotkeys"""
+		return IngameKeyListener(self)
+
+	def create_cursor(self):
+		"""Returns the default mouse tool, that is active when nothing else is going on"""
+		return SelectionTool(self)
+
 	def end(self):
 		self.log.debug("Ending session")
 		self.is_alive = False
 
+		for name, hits, misses, size in decorators.get_cache_stats():
+			self.log.debug("Cache %s: %s hits, %s misses, %s results", name, hits, misses, size)
+
 		self.gui.session = None
 
 		Scheduler().rem_all_classinst_calls(self)
@@ -170,7 +189,7 @@ class Session(LivingObject):
 			                        self.scenario_eventhandler.get_map_file())
 
 		self.log.debug("Session: Loading from %s", savegame)
-		savegame_db = DbReader(savegame) # Initialize new dbreader
+		savegame_db = PrefetchDbReader(savegame) # Initialize new dbreader
 		try:
 			# load how often the game has been saved (used to know the difference between
 			# a loaded and a new game)
@@ -203,7 +222,7 @@ class Session(LivingObject):
 				self.selection_groups[group].add(WorldObject.get_object_by_id(instance_id[0]))
 
 		# cursor has to be inited last, else player interacts with a not inited world with it.
-		self.cursor = SelectionTool(self)
+		self.cursor = self.create_cursor()
 		self.cursor.apply_select() # Set cursor correctly, menus might need to be opened.
 
 		assert hasattr(self.world, "player"), 'Error: there is no human player'
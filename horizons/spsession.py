@@ -23,6 +23,7 @@ import random
 import os
 import time
 import shutil
+import threading
 import traceback
 
 import horizons.main
@@ -32,10 +33,15 @@ from horizons.manager import SPManager
 from horizons.extscheduler import ExtScheduler
 from horizons.constants import PATHS, GAME_SPEED
 from horizons.savegamemanager import SavegameManager
-from horizons.util.dbreader import DbReader
+from horizons.util.dbwriter import DbWriter, DbSnapshot
 
 
 class SPSession(Session):
+	def __init__(self, *args, **kwargs):
+		super(SPSession, self).__init__(*args, **kwargs)
+		# thread that writes the last autosave to disk
+		self._autosave_thread = None
+
 	def create_manager(self):
 		return SPManager(self)
 
@@ -77,13 +83,58 @@ class SPSession(Session):
 			self.log.debug("Initing autosave every %s minutes", interval)
 			ExtScheduler().add_new_object(self.autosave, self, interval * 60, -1)
 
+	def end(self):
+		# let the last autosave finish before the game is torn down or the process exits
+		if self._autosave_thread is not None:
+			self._autosave_thread.join()
+			self._autosave_thread = None
+			SavegameManager.delete_dispensable_savegames(autosaves = True)
+		super(SPSession, self).end()
+
 	def autosave(self):
-		"""Called automatically in an interval"""
+		"""Called automatically in an interval.
+		Only a snapshot of the game is taken here, it is written to disk in another thread,
+		so the game doesn't freeze while autosaving."""
 		self.log.debug("Session: autosaving")
-		# call saving through horizons.main and not directly through session, so that save errors are handled
-		success = self.save(SavegameManager.create_autosave_filename())
-		if success:
-			SavegameManager.delete_dispensable_savegames(autosaves = True)
+		if self._autosave_thread is not None and self._autosave_thread.is_alive():
+			self.log.debug("Session: last autosave is still being written, skipping autosave")
+			return
+		self.savecounter += 1
+		snapshot = DbSnapshot()
+		try:
+			self._save_to_db(snapshot)
+		except:
+			print "Save Exception"
+			traceback.print_exc()
+			return
+		self._autosave_thread = threading.Thread(target=self._write_autosave, \
+		                                         args=(snapshot, SavegameManager.create_autosave_filename()))
+		self._autosave_thread.start()
+		ExtScheduler().add_new_object(self._check_autosave_thread, self)
+
+	def _write_autosave(self, snapshot, savegame):
+		"""Writes an autosave snapshot to disk, called in the autosave thread.
+		@param snapshot: DbSnapshot of the game
+		@param savegame: string with the full path of the savegame file"""
+		try:
+			snapshot.write_to_file(PATHS.SAVEGAME_TEMPLATE, savegame)
+		except:
+			print "Save Exception"
+			traceback.print_exc()
+			return
+		self.log.debug("Session: autosave written to %s", savegame)
+
+	def _check_autosave_thread(self):
+		"""Called on the main thread until the autosave thread has finished. Old autosaves are
+		deleted here and not in the thread, since quicksave() deletes savegames too."""
+		if self._autosave_thread is None:
+			return
+		if self._autosave_thread.is_alive():
+			ExtScheduler().add_new_object(self._check_autosave_thread, self)
+			return
+		self._autosave_thread.join()
+		self._autosave_thread = None
+		SavegameManager.delete_dispensable_savegames(autosaves = True)
 
 	def quicksave(self):
 		"""Called when user presses the quicksave hotkey"""
@@ -125,7 +176,7 @@ class SPSession(Session):
 			shutil.copyfile(PATHS.SAVEGAME_TEMPLATE, savegame)
 			self.savecounter += 1
 
-			db = DbReader(savegame)
+			db = DbWriter(savegame)
 		except IOError: # usually invalid filename
 			self.gui.show_popup(_("Invalid filename"), _("You entered an invalid filename."))
 			return self.save() # retry with new savegamename entered by the user
@@ -133,19 +184,7 @@ class SPSession(Session):
 
 		try:
 			db("BEGIN")
-			self.world.save(db)
-			#self.manager.save(db)
-			self.view.save(db)
-			self.ingame_gui.save(db)
-			self.scenario_eventhandler.save(db)
-
-			for instance in self.selected_instances:
-				db("INSERT INTO selected(`group`, id) VALUES(NULL, ?)", instance.worldid)
-			for group in xrange(len(self.selection_groups)):
-				for instance in self.selection_groups[group]:
-					db("INSERT INTO selected(`group`, id) VALUES(?, ?)", group, instance.worldid)
-
-			SavegameManager.write_metadata(db, self.savecounter)
+			self._save_to_db(db)
 			# make sure everything get's written now
 			db("COMMIT")
 			db.close()
@@ -156,3 +195,20 @@ class SPSession(Session):
 			db.close() # close db before delete
 			os.unlink(savegame) # remove invalid savegamefile
 			return False
+
+	def _save_to_db(self, db):
+		"""Saves the game data and the savegame metadata to db
+		@param db: DbReader or DbSnapshot"""
+		self.world.save(db)
+		#self.manager.save(db)
+		self.view.save(db)
+		self.ingame_gui.save(db)
+		self.scenario_eventhandler.save(db)
+
+		for instance in self.selected_instances:
+			db("INSERT INTO selected(`group`, id) VALUES(NULL, ?)", instance.worldid)
+		for group in xrange(len(self.selection_groups)):
+			for instance in self.selection_groups[group]:
+				db("INSERT INTO selected(`group`, id) VALUES(?, ?)", group, instance.worldid)
+
+		SavegameManager.write_metadata(db, self.savecounter)
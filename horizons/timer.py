@@ -110,3 +110,19 @@ class Timer(LivingObject):
 				return
 			self.tick_next_time = (self.tick_next_time or time.time()) + 1.0 / self.ticks_per_second
 			self.tick_next_id += 1
+
+	def run_ticks(self, num_ticks):
+		"""Executes num_ticks ticks right away, regardless of wall clock time and game speed.
+		This is used to fast-forward the simulation when nothing pumps check_tick.
+		@param num_ticks: int number of ticks to execute
+		@return: int number of executed ticks. This is less than num_ticks, if a test function
+		         didn't allow the next tick to be executed (e.g. missing multiplayer commands)."""
+		for i in xrange(num_ticks):
+			for f in self.tick_func_test:
+				if f(self.tick_next_id) in (self.TEST_SKIP, self.TEST_RETRY_RESET_NEXT_TICK_TIME, \
+				                            self.TEST_RETRY_KEEP_NEXT_TICK_TIME):
+					return i
+			for f in self.tick_func_call:
+				f(self.tick_next_id)
+			self.tick_next_id += 1
+		return num_ticks
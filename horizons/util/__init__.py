@@ -30,6 +30,9 @@ from loaders.tilesetloader import TileSetLoader
 from pychanchildfinder import PychanChildFinder
 from named_object import NamedObject
 from dbreader import DbReader
+from dbwriter import DbWriter, DbSnapshot
+from prefetchdbreader import PrefetchDbReader
+from worlddigest import WorldDigest, DigestRandom
 from sqliteanimationloader import SQLiteAnimationLoader
 
 from shapes.point import Point, ConstPoint
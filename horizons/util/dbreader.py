@@ -21,44 +21,120 @@
 
 import sqlite3
 import re
+import time
 
 from horizons.util.python import decorators
 
+_regexps = {} # pattern : match function of the compiled pattern
+
+def _regexp(expr, item):
+	"""Implementation of the sqlite REGEXP operator. The patterns are compiled only once."""
+	try:
+		match = _regexps[expr]
+	except KeyError:
+		match = _regexps[expr] = re.compile(expr).match
+	return match(item) is not None
+
 class DbReader(object):
 	"""Class that handles connections to sqlite databases
+	Use __call__ for queries, whose result is needed as SqlResult. Where only the rows are
+	needed, fetchall (list of tuples) and execute (cursor, for iterating over big results)
+	avoid wrapping the rows.
+	Queries can be measured, see start_profiling. While profiling is disabled, this
+	costs nothing.
 	@param file: str containing the database file."""
+
+	# number of compiled statements, that sqlite keeps per connection (default: 100).
+	# the game uses a few hundred different queries, most of them repeatedly.
+	STATEMENT_CACHE_SIZE = 500
+
 	def __init__(self, dbfile):
-		self.connection = sqlite3.connect(dbfile)
+		self.connection = sqlite3.connect(dbfile, cached_statements=self.STATEMENT_CACHE_SIZE)
 		self.connection.isolation_level = None
 		self.connection.text_factory = str
-		def regexp(expr, item):
-			r = re.compile(expr)
-			return r.match(item) is not None
-		self.connection.create_function("regexp", 2, regexp)
+		self.connection.create_function("regexp", 2, _regexp)
 		self.cur = self.connection.cursor()
+		self.query_stats = None # command : [calls, seconds] while profiling
 
 	@decorators.make_constants()
 	def __call__(self, command, *args):
 		"""Executes a sql command.
-		@param command: str containing the raw sql command, with ? as placeholders for values (eg. SELECT ? FROM ?). command must not end with ';', it's added automatically here.
+		@param command: str containing the raw sql command, with ? as placeholders for values (eg. SELECT ? FROM ?). command must not end with ';'.
 		@param args: tuple containing the values to add into the command.
+		@return: SqlResult
 		"""
 		assert not command.endswith(";")
-		command = '%s;' % command
-		self.cur.execute(command, args)
-		return SqlResult(self.cur.fetchall(), None if self.cur.rowcount == -1 else self.cur.rowcount, self.cur.lastrowid)
+		if self.query_stats is not None:
+			start = time.time()
+		cur = self.cur
+		cur.execute(command, args)
+		result = SqlResult(cur.fetchall(), None if cur.rowcount == -1 else cur.rowcount, cur.lastrowid)
+		if self.query_stats is not None:
+			self._add_query_time(command, time.time() - start)
+		return result
+
+	def fetchall(self, command, *args):
+		"""Executes a sql command and returns the rows.
+		@params: same as in __call__
+		@return: list of tuples"""
+		if self.query_stats is not None:
+			start = time.time()
+			rows = self.cur.execute(command, args).fetchall()
+			self._add_query_time(command, time.time() - start)
+			return rows
+		return self.cur.execute(command, args).fetchall()
+
+	def execute(self, command, *args):
+		"""Executes a sql command and returns a new cursor, that yields the rows on iteration.
+		Other queries can be executed while iterating over the cursor.
+		@params: same as in __call__
+		@return: sqlite3 cursor"""
+		if self.query_stats is not None:
+			self._add_query_time(command, 0.0) # rows are fetched later, only count the call
+		return self.connection.execute(command, args)
+
+	def executemany(self, command, rows):
+		"""Executes a sql command once for every row of values.
+		@param command: same as in __call__
+		@param rows: iterable of tuples containing the values to add into the command"""
+		self.cur.executemany(command, rows)
 
 	@decorators.cachedmethod
 	def cached_query(self, command, *args):
 		"""Executes a sql command and saves its result in a dict.
-		@params, return: same as in __call__"""
-		return self(command, *args)
+		@params: same as in __call__
+		@return: list of tuples, must not be modified"""
+		return self.fetchall(command, *args)
 
 	def execute_script(self, script):
 		"""Executes a multiline script.
 		@param script: multiline str containing an sql script."""
 		return self.cur.executescript(script)
 
+	def start_profiling(self):
+		"""Starts measuring the number of calls and execution time of every query"""
+		if self.query_stats is None:
+			self.query_stats = {}
+
+	def stop_profiling(self):
+		self.query_stats = None
+
+	def get_query_stats(self):
+		"""Returns the measured queries, see start_profiling
+		@return: list of tuples (command, calls, seconds), most expensive queries first"""
+		stats = [ (command, calls, seconds) for command, (calls, seconds) in \
+		          (self.query_stats or {}).iteritems() ]
+		stats.sort(key=lambda stat: stat[2], reverse=True)
+		return stats
+
+	def _add_query_time(self, command, seconds):
+		stat = self.query_stats.get(command)
+		if stat is None:
+			self.query_stats[command] = [1, seconds]
+		else:
+			stat[0] += 1
+			stat[1] += seconds
+
 	def close(self):
 		"""Closes the db"""
 		self.connection.close()
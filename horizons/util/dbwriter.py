@@ -0,0 +1,135 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import shutil
+
+from horizons.util.dbreader import DbReader
+
+class DbSnapshot(object):
+	"""Collects the rows of INSERT and UPDATE statements in memory, so that they can be
+	written to a db later, e.g. by another thread. It supports the DbReader interface
+	for these statements, so it can be passed to the save() methods instead of a db.
+	Statements are written grouped by their sql in the order they were first used,
+	so e.g. all UPDATEs of a table run after all INSERTs into it, if an INSERT came first."""
+	def __init__(self):
+		self.rows = {} # { sql : [args of each row] }
+		self.statements = [] # sql strings in order of first use
+
+	def __call__(self, command, *args):
+		"""Adds a row for an INSERT or UPDATE statement.
+		@params: same as in DbReader.__call__"""
+		rows = self.rows.get(command)
+		if rows is None:
+			rows = self._add_statement(command)
+		rows.append(args)
+
+	def executemany(self, command, rows):
+		"""Adds many rows for an INSERT or UPDATE statement at once.
+		@param command: same as in DbReader.__call__
+		@param rows: iterable of tuples of values"""
+		own_rows = self.rows.get(command)
+		if own_rows is None:
+			own_rows = self._add_statement(command)
+		own_rows.extend(rows)
+
+	def _add_statement(self, command):
+		assert command.startswith(('INSERT', 'UPDATE')), "Can't buffer sql command: %s" % command
+		rows = self.rows[command] = []
+		self.statements.append(command)
+		return rows
+
+	def write_to(self, db):
+		"""Writes all rows to db
+		@param db: DbReader or sqlite cursor"""
+		for command in self.statements:
+			db.executemany(command, self.rows[command])
+
+	def write_to_file(self, template, filename):
+		"""Writes all rows to a copy of the db template. The copy is written to a temporary
+		file first and renamed when it is complete, so that there never is a half-written
+		file, even if the game crashes meanwhile.
+		@param template: str, path of the db file to copy
+		@param filename: str, path of the file to create"""
+		tmp_filename = filename + '.tmp'
+		try:
+			shutil.copyfile(template, tmp_filename)
+			db = DbWriter(tmp_filename)
+			try:
+				db("BEGIN")
+				self.write_to(db)
+				db("COMMIT")
+			finally:
+				db.close()
+			os.rename(tmp_filename, filename)
+		except:
+			if os.path.exists(tmp_filename):
+				os.unlink(tmp_filename) # remove invalid file
+			raise
+
+	def clear(self):
+		self.rows.clear()
+		del self.statements[:]
+
+
+class DbWriter(DbReader):
+	"""DbReader that is optimised for writing lots of rows, e.g. for saving a game.
+	INSERT and UPDATE statements are not executed immediately, but their rows are
+	collected in a DbSnapshot and executed in bulk via executemany on flush().
+	Every other command (BEGIN, COMMIT, SELECT, ..) flushes the buffer before it is
+	executed, so the results are the same as if the rows had been written one by one.
+	@param file: str containing the database file."""
+	def __init__(self, dbfile):
+		super(DbWriter, self).__init__(dbfile)
+		# the db is usually a fresh copy of the savegame template, that is removed when
+		# saving fails, so we don't need sqlite to keep it consistent on crashes
+		self.cur.execute("PRAGMA synchronous = OFF")
+		self.cur.execute("PRAGMA journal_mode = MEMORY")
+		self.buffer = DbSnapshot()
+
+	def __call__(self, command, *args):
+		"""Buffers INSERT and UPDATE statements, other commands are executed directly.
+		@params: same as in DbReader.__call__
+		@return: None for buffered statements, else SqlResult"""
+		if command.startswith(('INSERT', 'UPDATE')):
+			self.buffer(command, *args)
+		else:
+			self.flush()
+			return super(DbWriter, self).__call__(command, *args)
+
+	def fetchall(self, command, *args):
+		self.flush()
+		return super(DbWriter, self).fetchall(command, *args)
+
+	def execute(self, command, *args):
+		self.flush()
+		return super(DbWriter, self).execute(command, *args)
+
+	def executemany(self, command, rows):
+		"""Buffers many rows for an INSERT or UPDATE statement at once.
+		@params: same as in DbSnapshot.executemany"""
+		self.buffer.executemany(command, rows)
+
+	def flush(self):
+		"""Executes all buffered statements"""
+		self.buffer.write_to(self.cur)
+		self.buffer.clear()
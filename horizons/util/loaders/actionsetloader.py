@@ -24,6 +24,7 @@ import logging
 
 from horizons.constants import PATHS
 from loader import GeneralLoader
+from manifest import AssetManifest
 
 class ActionSetLoader(object):
 	"""The ActionSetLoader loads action sets from a directory tree. The directories loaded
@@ -32,30 +33,47 @@ class ActionSetLoader(object):
 	for example that would be: fisher1/work/90/0.png
 	Note that all directories except for the rotation dir, all dirs have to be empty and
 	must not include additional action sets.
+	The result of the search is cached in an AssetManifest, together with the resolved frames
+	of every animation.
 	@param start_dir: directory that is used to begin search in"""
 
 	log = logging.getLogger("util.loaders.actionsetloader")
 
 	action_sets = {}
+	# { (action set, action, rotation) : list of (file, duration in ms) }, see GeneralLoader._get_frames
+	frames = {}
 	_loaded = False
 
 	@classmethod
-	def _find_action_sets(cls, dir):
+	def _find_action_sets(cls, dir, dir_mtimes):
 		"""Traverses recursively starting from dir to find action sets.
-		It is similar to os.walk, but more optimized for this use case."""
+		It is similar to os.walk, but more optimized for this use case.
+		@param dir_mtimes: list, (dir, modification time) of every directory read is appended"""
+		dir_mtimes.append((dir, os.path.getmtime(dir)))
 		for entry in os.listdir(dir):
 			full_path = os.path.join(dir, entry)
 			if entry.startswith("as_"):
-				cls.action_sets[entry] = GeneralLoader._load_action(full_path)
+				cls.action_sets[entry] = GeneralLoader._load_action(full_path, dir_mtimes)
 			else:
 				if os.path.isdir(full_path) and entry != ".svn":
-					cls._find_action_sets(full_path)
+					cls._find_action_sets(full_path, dir_mtimes)
 
 	@classmethod
 	def load(cls):
 		if not cls._loaded:
 			cls.log.debug("Loading action_sets...")
-			cls._find_action_sets(PATHS.ACTION_SETS_DIRECTORY)
+			manifest = AssetManifest('actionsets', PATHS.ACTION_SETS_DIRECTORY)
+			data = manifest.load()
+			if data is not None:
+				cls.action_sets, cls.frames = data
+			else:
+				dir_mtimes = []
+				cls._find_action_sets(PATHS.ACTION_SETS_DIRECTORY, dir_mtimes)
+				for action_set, actions in cls.action_sets.iteritems():
+					for action, rotations in actions.iteritems():
+						for rotation, files in rotations.iteritems():
+							cls.frames[(action_set, action, rotation)] = GeneralLoader._get_frames(files)
+				manifest.save(dir_mtimes, (cls.action_sets, cls.frames))
 			cls.log.debug("Done!")
 			cls._loaded = True
 
@@ -72,4 +90,12 @@ class ActionSetLoader(object):
 	def get_action_sets(cls):
 		if not cls._loaded:
 			cls.load()
-		return cls.action_sets
\ No newline at end of file
+		return cls.action_sets
+
+	@classmethod
+	def get_frames(cls, action_set, action, rotation):
+		"""Returns the frames of an animation
+		@return: list of (file, duration in milliseconds)"""
+		if not cls._loaded:
+			cls.load()
+		return cls.frames[(action_set, action, rotation)]
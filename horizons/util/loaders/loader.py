@@ -38,14 +38,26 @@ class GeneralLoader(object):
 	log = logging.getLogger("util.loaders.loader")
 
 	@classmethod
-	def _load_files(cls, dir, time):
+	def _listdir(cls, dir, dir_mtimes):
+		"""Returns the entries of dir, except for .svn
+		@param dir_mtimes: list, (dir, modification time) is appended to it (see AssetManifest)"""
+		dir_mtimes.append((dir, os.path.getmtime(dir)))
+		entries = os.listdir(dir)
+		try: entries.remove('.svn')
+		except ValueError: pass
+		return entries
+
+	@classmethod
+	def _load_files(cls, dir, time, dir_mtimes):
 		"""Loads the files for a specific rotation
 		@param dir: directory that the files are to loaded from. Example:
 		            'content/gfx/units/lumberjack/work/90/'
+		@param dir_mtimes: list, see _listdir
 		@return: dict containing 'file: anim_end' entries
 		"""
 		fl = {}
 
+		dir_mtimes.append((dir, os.path.getmtime(dir)))
 		entries = glob.glob(os.path.join(dir, "*.png"))
 		entries.sort() # Make sure entries are in the correct order
 
@@ -56,17 +68,16 @@ class GeneralLoader(object):
 		return fl
 
 	@classmethod
-	def _load_rotation(cls, dir):
+	def _load_rotation(cls, dir, dir_mtimes):
 		"""Loads the rotations + files for a specific action
 		@param dir: directory that the files are to loaded from. Example:
 		            'content/gfx/units/lumberjack/work/'
+		@param dir_mtimes: list, see _listdir
 		@return: dict containing 'rotation: filedict' entries. See _load_files for example.
 		"""
 		rotations = {}
 		time = 500
-		dirs = os.listdir(dir)
-		try: dirs.remove('.svn')
-		except ValueError: pass
+		dirs = cls._listdir(dir, dir_mtimes)
 
 		for dirname in dirs:
 			if dirname.startswith("tm_"):
@@ -75,7 +86,7 @@ class GeneralLoader(object):
 				break
 		for dirname in dirs:
 			try:
-				rotations[int(dirname)] = cls._load_files(os.path.join(dir, dirname),time)
+				rotations[int(dirname)] = cls._load_files(os.path.join(dir, dirname), time, dir_mtimes)
 			except Exception, e:
 				raise Exception("Failed to load action sets from %s with time %d: %s" % \
 				                (os.path.join(dir, dirname), time, e))
@@ -84,18 +95,31 @@ class GeneralLoader(object):
 
 
 	@classmethod
-	def _load_action(cls, dir):
+	def _load_action(cls, dir, dir_mtimes):
 		"""Loads the actions + rotations + files for a specific action
 		@param dir: directory that the files are to loaded from. Example:
 		            'content/gfx/units/lumberjack/'
+		@param dir_mtimes: list, see _listdir
 		@return: dict containing 'action: rotationdict' entries. See _load_rotation for example.
 		"""
 		actions = {}
-		dirs = os.listdir(dir)
-		try: dirs.remove('.svn')
-		except ValueError: pass
+		dirs = cls._listdir(dir, dir_mtimes)
 
 		for dirname in dirs:
-			actions[dirname] = cls._load_rotation(os.path.join(dir, dirname))
+			actions[dirname] = cls._load_rotation(os.path.join(dir, dirname), dir_mtimes)
+
+		return actions
 
-		return actions
\ No newline at end of file
+	@classmethod
+	def _get_frames(cls, files):
+		"""Resolves the frames of an animation
+		@param files: dict containing 'file: anim_end' entries, see _load_files
+		@return: list of (file, duration in milliseconds) in the order they are played
+		"""
+		frames = []
+		frame_start = 0.0
+		for file in sorted(files.iterkeys()):
+			frame_end = float(files[file])
+			frames.append( (file, max(1, int((frame_end - frame_start)*1000))) )
+			frame_start = frame_end
+		return frames
\ No newline at end of file
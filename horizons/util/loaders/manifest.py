@@ -0,0 +1,82 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import os
+import cPickle
+import logging
+
+from horizons.constants import PATHS
+
+class AssetManifest(object):
+	"""Caches the result of walking a directory tree (e.g. the action sets found by the
+	ActionSetLoader) in a file in the user's cache dir, so that it can be loaded with one read
+	on the next start.
+	The manifest stores the modification times of all directories that were read during the
+	walk. Adding, removing or renaming files or directories changes the modification time of
+	their parent directory, so the manifest is stale if any of them has changed.
+	@param name: name of the manifest file
+	@param start_dir: directory the walk starts in"""
+
+	log = logging.getLogger("util.loaders.manifest")
+
+	VERSION = 1 # increase when the format of the cached data changes
+
+	def __init__(self, name, start_dir):
+		self.filename = os.path.join(PATHS.CACHE_DIR, name + '.manifest')
+		self.start_dir = os.path.abspath(start_dir)
+
+	def load(self):
+		"""Returns the cached data, or None if there isn't any or it is stale"""
+		try:
+			with open(self.filename, 'rb') as f:
+				version, start_dir, dir_mtimes, data = cPickle.load(f)
+		except Exception, e:
+			self.log.debug("Can't read manifest %s: %s", self.filename, e)
+			return None
+		if version != self.VERSION or start_dir != self.start_dir:
+			return None
+		try:
+			for dir, mtime in dir_mtimes:
+				if os.path.getmtime(dir) != mtime:
+					self.log.debug("Manifest %s is stale, %s has changed", self.filename, dir)
+					return None
+		except OSError:
+			return None # a directory has been removed
+		return data
+
+	def save(self, dir_mtimes, data):
+		"""Writes data to the manifest
+		@param dir_mtimes: list of (directory, modification time) of all directories that have
+		                   been read to get data. The times must be taken before reading them.
+		@param data: picklable object"""
+		tmp_filename = self.filename + '.tmp'
+		try:
+			if not os.path.isdir(PATHS.CACHE_DIR):
+				os.makedirs(PATHS.CACHE_DIR)
+			with open(tmp_filename, 'wb') as f:
+				cPickle.dump((self.VERSION, self.start_dir, dir_mtimes, data), f, \
+				             cPickle.HIGHEST_PROTOCOL)
+			if os.path.exists(self.filename): # rename doesn't replace files on windows
+				os.remove(self.filename)
+			os.rename(tmp_filename, self.filename)
+		except (IOError, OSError), e:
+			self.log.warning("Can't write manifest %s: %s", self.filename, e)
@@ -24,6 +24,7 @@ import logging
 
 from horizons.constants import PATHS
 from loader import GeneralLoader
+from manifest import AssetManifest
 
 class TileSetLoader(object):
 	"""The TileSetLoader loads tile sets from a directory tree. The directories loaded
@@ -40,23 +41,32 @@ class TileSetLoader(object):
 	_loaded = False
 
 	@classmethod
-	def _find_tile_sets(cls, dir):
+	def _find_tile_sets(cls, dir, dir_mtimes):
 		"""Traverses recursively starting from dir to find action sets.
-		It is similar to os.walk, but more optimized for this use case."""
+		It is similar to os.walk, but more optimized for this use case.
+		@param dir_mtimes: list, (dir, modification time) of every directory read is appended"""
+		dir_mtimes.append((dir, os.path.getmtime(dir)))
 		for entry in os.listdir(dir):
 			full_path = os.path.join(dir, entry)
 			if entry.startswith("ts_"):
-				cls.tile_sets[entry] = GeneralLoader._load_action(full_path)
+				cls.tile_sets[entry] = GeneralLoader._load_action(full_path, dir_mtimes)
 			else:
 				if os.path.isdir(full_path) and entry != ".svn":
-					cls._find_tile_sets(full_path)
+					cls._find_tile_sets(full_path, dir_mtimes)
 
 	@classmethod
 	def load(cls):
 		#print "called"
 		if not cls._loaded:
 			cls.log.debug("Loading tile_sets...")
-			cls._find_tile_sets(PATHS.TILE_SETS_DIRECTORY)
+			manifest = AssetManifest('tilesets', PATHS.TILE_SETS_DIRECTORY)
+			data = manifest.load()
+			if data is not None:
+				cls.tile_sets = data
+			else:
+				dir_mtimes = []
+				cls._find_tile_sets(PATHS.TILE_SETS_DIRECTORY, dir_mtimes)
+				manifest.save(dir_mtimes, cls.tile_sets)
 			cls.log.debug("Done!")
 			cls._loaded = True
 
@@ -0,0 +1,168 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import re
+from operator import itemgetter
+
+from horizons.util.dbreader import DbReader, SqlResult
+
+class PrefetchDbReader(DbReader):
+	"""DbReader for loading savegames.
+	Savegames are loaded object by object, so most queries fetch the rows of one object,
+	e.g. SELECT resource, amount FROM storage WHERE object = ?. For these queries, the
+	whole table is read once and indexed by the columns of the WHERE clause, all further
+	lookups are answered from memory instead of running a query per object.
+	Handled are queries on the columns of one table, with conditions "column = ?" that are
+	joined by AND and optionally ORDER BY a column. Everything else is passed to sqlite.
+	Writing to the db drops all prefetched data.
+	@param file: str containing the database file."""
+
+	# SELECT <columns> FROM <table> WHERE <conditions> [ORDER BY <column>]
+	_query_regexp = re.compile(r'^SELECT\s+(.+?)\s+FROM\s+([\w`"]+)\s+WHERE\s+(.+?)' \
+	                           r'(?:\s+ORDER\s+BY\s+([\w`"]+)(?:\s+ASC)?)?\s*$', re.I | re.S)
+	_condition_regexp = re.compile(r'^([\w`"]+)\s*=\s*\?$')
+	_and_regexp = re.compile(r'\s+AND\s+', re.I)
+
+	def __init__(self, dbfile):
+		super(PrefetchDbReader, self).__init__(dbfile)
+		self._tables = set( name.lower() for (name,) in \
+		                    self.cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'") )
+		self._columns = {} # table : (dict { column name : index in rows }, indices of text columns)
+		self._queries = {} # sql : (index key, columns getter, order column) or None if not handled
+		self._table_rows = {} # table : list of rows (rowid first, then all columns)
+		self._indexes = {} # (table, key columns) : { key : [rows] }
+
+	def __call__(self, command, *args):
+		"""Executes a sql command, answers lookups from prefetched tables where possible.
+		@params, return: same as in DbReader.__call__"""
+		try:
+			query = self._queries[command]
+		except KeyError:
+			query = self._queries[command] = self._parse_query(command)
+		if query is None:
+			if not command.lstrip().upper().startswith('SELECT'):
+				self._drop_prefetched_data()
+			return super(PrefetchDbReader, self).__call__(command, *args)
+		index_key, get_columns, order_column = query
+		if len(args) != len(index_key[1]):
+			return super(PrefetchDbReader, self).__call__(command, *args)
+		for arg in args:
+			# only integers compare the same in python and sqlite, independent of column affinity
+			if type(arg) not in (int, long, bool):
+				return super(PrefetchDbReader, self).__call__(command, *args)
+
+		index = self._indexes.get(index_key)
+		if index is None:
+			index = self._create_index(*index_key)
+		rows = index.get(args[0] if len(args) == 1 else args, ())
+		if order_column is not None:
+			rows = sorted(rows, key=itemgetter(order_column))
+		return SqlResult([ get_columns(row) for row in rows ], None, self.cur.lastrowid)
+
+	def fetchall(self, command, *args):
+		"""Same as DbReader.fetchall, queries aren't answered from prefetched data here."""
+		if not command.lstrip().upper().startswith('SELECT'):
+			self._drop_prefetched_data()
+		return super(PrefetchDbReader, self).fetchall(command, *args)
+
+	def execute(self, command, *args):
+		"""Same as DbReader.execute, queries aren't answered from prefetched data here."""
+		if not command.lstrip().upper().startswith('SELECT'):
+			self._drop_prefetched_data()
+		return super(PrefetchDbReader, self).execute(command, *args)
+
+	def _parse_query(self, command):
+		"""Checks whether a query can be answered from an index.
+		@return: tuple (index key, columns getter, order column index) or None"""
+		match = self._query_regexp.match(command.strip())
+		if match is None:
+			return None
+		columns, table, conditions, order_column = match.groups()
+		table = table.strip('`"').lower()
+		if table not in self._tables:
+			return None
+		column_indices, text_columns = self._get_columns(table)
+
+		def get_index(column):
+			"""Returns index of column in the prefetched rows or None"""
+			return column_indices.get(column.strip().strip('`"').lower())
+
+		selected = [ get_index(column) for column in columns.split(',') ]
+		key_columns = []
+		for condition in self._and_regexp.split(conditions):
+			condition = self._condition_regexp.match(condition.strip())
+			if condition is None:
+				return None
+			key_columns.append(get_index(condition.group(1)))
+		if order_column is not None:
+			order_column = get_index(order_column)
+			if order_column is None:
+				return None
+		# values are converted to text when they are compared with a text column,
+		# this would require converting the keys of the index too
+		if None in selected or None in key_columns or text_columns.intersection(key_columns):
+			return None
+
+		if len(selected) == 1:
+			column = selected[0]
+			get_columns = lambda row: (row[column],)
+		else:
+			get_columns = itemgetter(*selected)
+		return ((table, tuple(key_columns)), get_columns, order_column)
+
+	def _get_columns(self, table):
+		"""Returns the columns of table
+		@return: tuple (dict { column name : index in prefetched rows }, set of indices of text columns)"""
+		if table not in self._columns:
+			indices = { 'rowid' : 0, 'oid' : 0, '_rowid_' : 0 }
+			text_columns = set()
+			for (cid, name, col_type, notnull, default, pk) in \
+			    self.cur.execute('PRAGMA table_info("%s")' % table).fetchall():
+				indices[name.lower()] = cid + 1
+				# see the rules for column affinity in the sqlite docs
+				if any( t in col_type.upper() for t in ('CHAR', 'CLOB', 'TEXT') ):
+					text_columns.add(cid + 1)
+			self._columns[table] = (indices, text_columns)
+		return self._columns[table]
+
+	def _create_index(self, table, key_columns):
+		"""Indexes the rows of table by the values of key_columns
+		@return: dict { key value(s) : [rows] }"""
+		rows = self._table_rows.get(table)
+		if rows is None:
+			rows = self._table_rows[table] = \
+			  self.cur.execute('SELECT rowid, * FROM "%s"' % table).fetchall()
+		index = self._indexes[(table, key_columns)] = {}
+		get_key = itemgetter(*key_columns)
+		for row in rows:
+			key = get_key(row)
+			if key is None or (len(key_columns) > 1 and None in key):
+				continue # NULL is never equal to anything
+			if key in index:
+				index[key].append(row)
+			else:
+				index[key] = [row]
+		return index
+
+	def _drop_prefetched_data(self):
+		self._table_rows.clear()
+		self._indexes.clear()
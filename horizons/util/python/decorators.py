@@ -21,49 +21,144 @@
 
 """Save general python function decorators here"""
 
+import weakref
+import functools
+
 import horizons.main
 
 from types import FunctionType, ClassType
+from collections import OrderedDict
 
-class cachedfunction(object):
-	"""Decorator that caches a function's return value each time it is called.
-	If called later with the same arguments, the cached value is returned, and
-	not re-evaluated.
-	Does not support kwargs, since dicts are not hashable
-	"""
-	def __init__(self, func):
+_caches = [] # all caches created by the decorators below, see get_cache_stats
+
+class _Cache(object):
+	"""Stores the results of a function by its arguments.
+	If maxsize is not None, at most maxsize results are kept. If it's exceeded, the least
+	recently used result is dropped."""
+	def __init__(self, func, maxsize=None):
 		self.func = func
-		self.cache = {}
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		_caches.append(self)
 
-	def __call__(self, *args):
+	def _create_dict(self):
+		return {} if self.maxsize is None else OrderedDict()
+
+	def _lookup(self, cache, args, func_args):
+		"""Returns the cached result for args or calls the function with func_args and caches it"""
 		try:
-			return self.cache[args]
+			value = cache[args]
 		except KeyError:
-			self.cache[args] = value = self.func(*args)
+			self.misses += 1
+			cache[args] = value = self.func(*func_args)
+			if self.maxsize is not None and len(cache) > self.maxsize:
+				cache.popitem(last=False) # drop least recently used
 			return value
 		except TypeError:
 			assert False, "Supplied invalid argument to cache decorator"
+		self.hits += 1
+		if self.maxsize is not None: # mark as recently used
+			del cache[args]
+			cache[args] = value
+		return value
+
+	def get_stats(self):
+		"""@return: tuple (name of function, hits, misses, number of cached results)"""
+		return (self.func.__name__, self.hits, self.misses, self._get_size())
+
+
+class _CachedFunction(_Cache):
+	def __init__(self, func, maxsize=None):
+		super(_CachedFunction, self).__init__(func, maxsize)
+		self.cache = self._create_dict()
+
+	def __call__(self, *args):
+		return self._lookup(self.cache, args, args)
 
+	def invalidate(self):
+		"""Drops all cached results"""
+		self.cache.clear()
 
-class cachedmethod(object):
-	"""Same as cachedfunction, but works also for methods. Results are saved per instance"""
-	def __init__(self, func):
-		self.cache={}
-		self.func=func
+	def _get_size(self):
+		return len(self.cache)
+
+
+class _CachedMethod(_Cache):
+	"""Results are cached per instance. The instances are weakly referenced, the cached
+	results of an instance are dropped as soon as it's deleted."""
+	def __init__(self, func, maxsize=None):
+		super(_CachedMethod, self).__init__(func, maxsize)
+		self.caches = {} # weakref to instance : cache dict
 
 	def __get__(self, instance, cls=None):
-		self.instance = instance
-		return self
+		if instance is None:
+			return self
+		return functools.partial(self._call, instance)
 
-	def __call__(self,*args):
-		instance = self.instance
+	def _call(self, instance, *args):
+		try:
+			cache = self.caches[weakref.ref(instance)]
+		except KeyError:
+			cache = self._create_dict()
+			self.caches[weakref.ref(instance, self._remove_instance)] = cache
+		if self.maxsize is not None:
+			return self._lookup(cache, args, (instance, ) + args)
+		# inlined _lookup, since this is the common case
 		try:
-			return self.cache[(instance, args)]
+			value = cache[args]
 		except KeyError:
-			self.cache[(instance,args)] = value = self.func(instance, *args)
+			self.misses += 1
+			cache[args] = value = self.func(instance, *args)
 			return value
 		except TypeError:
 			assert False, "Supplied invalid argument to cache decorator"
+		self.hits += 1
+		return value
+
+	def _remove_instance(self, instance_ref):
+		"""Called when an instance is deleted"""
+		del self.caches[instance_ref]
+
+	def invalidate(self, instance=None):
+		"""Drops the cached results of instance, or of all instances if instance is None.
+		Call this if data, that the method depends on, has changed. Usage:
+		SomeClass.some_cached_method.invalidate(some_instance)"""
+		if instance is None:
+			for cache in self.caches.itervalues():
+				cache.clear()
+		else:
+			cache = self.caches.get(weakref.ref(instance))
+			if cache is not None:
+				cache.clear()
+
+	def _get_size(self):
+		return sum(len(cache) for cache in self.caches.itervalues())
+
+
+def cachedfunction(func=None, maxsize=None):
+	"""Decorator that caches a function's return value each time it is called.
+	If called later with the same arguments, the cached value is returned, and
+	not re-evaluated.
+	Does not support kwargs, since dicts are not hashable.
+	Use as @cachedfunction or @cachedfunction(maxsize=n) to keep only the n last used results.
+	The cache can be cleared with decorated_function.invalidate()
+	"""
+	if func is None:
+		return lambda f: _CachedFunction(f, maxsize)
+	return _CachedFunction(func, maxsize)
+
+def cachedmethod(func=None, maxsize=None):
+	"""Same as cachedfunction, but works also for methods. Results are saved per instance,
+	without keeping the instance alive. maxsize limits the results per instance."""
+	if func is None:
+		return lambda f: _CachedMethod(f, maxsize)
+	return _CachedMethod(func, maxsize)
+
+def get_cache_stats():
+	"""Returns the efficiency of the caches of cachedfunction and cachedmethod.
+	@return: list of tuples (name of function, hits, misses, number of cached results)"""
+	return [ cache.get_stats() for cache in _caches ]
 
 
 # adapted from http://code.activestate.com/recipes/277940/
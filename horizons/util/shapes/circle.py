@@ -21,6 +21,7 @@
 
 
 from point import Point
+from radiusoffsets import get_circle_columns, translate_columns
 
 from horizons.util.python.decorators import make_constants
 
@@ -36,13 +37,9 @@ class Circle(object):
 		self.center = center
 		self.radius = radius
 
-	@make_constants()
 	def get_coordinates(self):
 		"""Returns all coordinates, that are in the circle"""
-		coords = []
-		for i in self.tuple_iter():
-			coords.append(i)
-		return coords
+		return translate_columns(get_circle_columns(self.radius), self.center.x, self.center.y)
 		"""
 		TODO: check this for correctness before using it
 		return midpoint_circle(self.center.x, self.center.y, self.radius)
@@ -79,7 +76,6 @@ class Circle(object):
 	def __ne__(self, other):
 		return not self.__eq__(other)
 
-	@make_constants()
 	def __iter__(self):
 		"""Iterates through all coords in circle as Point"""
 		"""
@@ -87,13 +83,9 @@ class Circle(object):
 		for coord in midpoint_circle(self.center.x, self.center.y, self.radius):
 			yield Point(*coord)
 		"""
-		for x in xrange(self.center.x-self.radius, self.center.x+self.radius+1):
-			for y in xrange(self.center.y-self.radius, self.center.y+self.radius+1):
-				if self.center.distance_to_tuple((x, y)) <= self.radius:
-					yield Point(x, y)
+		for (x, y) in self.get_coordinates():
+			yield Point(x, y)
 
-
-	@make_constants()
 	def tuple_iter(self):
 		"""Iterates through all coords in circle as tuple"""
 		"""
@@ -101,10 +93,7 @@ class Circle(object):
 		for coord in midpoint_circle(self.center.x, self.center.y, self.radius):
 			yield coord
 		"""
-		for x in xrange(self.center.x-self.radius, self.center.x+self.radius+1):
-			for y in xrange(self.center.y-self.radius, self.center.y+self.radius+1):
-				if self.center.distance_to_tuple((x, y)) <= self.radius:
-					yield (x, y)
+		return iter(self.get_coordinates())
 
 
 def midpoint_circle(x0, y0, radius):
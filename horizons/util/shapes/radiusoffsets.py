@@ -0,0 +1,97 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+"""
+Tables of the coordinates, that are within a radius around a shape.
+The tables only depend on the size of the shape and the radius, so they are calculated once
+and translated to the position of the shape on every query. This is used by the radius
+functions of Circle and Rect, which are called very often (building selection, settlement
+assignment, collectors, ...).
+The tables consist of spans (lines of coordinates), which are translated with itertools,
+so that the coordinates don't have to be calculated one by one in python code.
+"""
+
+from itertools import izip, repeat
+
+_circle_columns = {} # radius : tuple of columns
+_rect_rows = {} # (width, height, radius, include_self) : tuple of rows
+
+def get_circle_columns(radius):
+	"""Returns the columns of all coordinates, whose distance to the center of a circle
+	is at most radius, relative to the center.
+	@param radius: int
+	@return: tuple of (x offset, first y offset, last y offset + 1) tuples, ordered by x"""
+	try:
+		return _circle_columns[radius]
+	except KeyError:
+		columns = []
+		radius_squared = radius ** 2
+		for x in xrange(-radius, radius+1):
+			# highest y, so that x^2 + y^2 <= radius^2
+			y = int((radius_squared - x ** 2) ** 0.5)
+			columns.append( (x, -y, y+1) )
+		columns = tuple(columns)
+		_circle_columns[radius] = columns
+		return columns
+
+def get_rect_rows(width, height, radius, include_self):
+	"""Returns the rows of all coordinates, whose distance to a rect is at most radius,
+	relative to the top left corner of the rect.
+	@param width, height: difference of right and left, bottom and top of the rect
+	@param radius: int
+	@param include_self: whether to include the coordinates of the rect
+	@return: tuple of (y offset, first x offset, last x offset + 1) tuples, ordered by y.
+	         Rows, that contain the rect, are split if include_self is False."""
+	key = (width, height, radius, include_self)
+	try:
+		return _rect_rows[key]
+	except KeyError:
+		rows = []
+		radius_squared = radius ** 2
+		for y in xrange(-radius, height+radius+1):
+			distance_y = max(-y, 0, y - height)
+			# highest x, so that x^2 + distance_y^2 <= radius^2
+			distance_x = int((radius_squared - distance_y ** 2) ** 0.5)
+			if include_self or distance_y > 0:
+				rows.append( (y, -distance_x, width+distance_x+1) )
+			elif distance_x > 0: # leave out the rect itself
+				rows.append( (y, -distance_x, 0) )
+				rows.append( (y, width+1, width+distance_x+1) )
+		rows = tuple(rows)
+		_rect_rows[key] = rows
+		return rows
+
+def translate_columns(columns, x, y):
+	"""Returns the coordinates of columns relative to (x, y)
+	@return: list of (x, y) tuples"""
+	coords = []
+	for (offset_x, first_y, end_y) in columns:
+		coords.extend( izip(repeat(x + offset_x), xrange(y + first_y, y + end_y)) )
+	return coords
+
+def translate_rows(rows, x, y):
+	"""Returns the coordinates of rows relative to (x, y)
+	@return: list of (x, y) tuples"""
+	coords = []
+	for (offset_y, first_x, end_x) in rows:
+		coords.extend( izip(xrange(x + first_x, x + end_x), repeat(y + offset_y)) )
+	return coords
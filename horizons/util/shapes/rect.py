@@ -23,6 +23,7 @@ from point import Point, ConstPoint
 from circle import Circle
 
 from horizons.util.python.decorators import make_constants
+from radiusoffsets import get_rect_rows, translate_rows
 from horizons.util.python import Const
 
 class Rect(object):
@@ -142,13 +143,13 @@ class Rect(object):
 		"""Returns list of all coordinates, that are in the Rect """
 		return [ (x, y) for x in xrange(self.left, self.right+1) for y in xrange(self.top, self.bottom+1) ]
 
-	@make_constants()
 	def get_radius_coordinates(self, radius, include_self = False):
-		"""Returns list of all coordinates (as tuples), that are in the radius
-		This is a generator.
+		"""Returns list of all coordinates (as tuples), that are in the radius.
+		They are ordered by y, then by x.
 		@param include_self: whether to include coords in self"""
 		# NOTE: this function has to be very fast, since it's blocking on building select
-		#       therefore, the distance_to_tuple function is inlined manually.
+		#       therefore, the coordinates relative to the rect are only calculated once for
+		#       every size and radius (see radiusoffsets)
 		"""
 		OLD HORRIBLY SLOW, BUT CORRECT ALGO:
 
@@ -168,63 +169,8 @@ class Rect(object):
 			          for y in xrange(top-radius, bottom+radius+1) if \
 			          (((max(left - x, 0, x - right) ** 2) + (max(top - y, 0, y - bottom) ** 2)) ** 0.5 ) <= radius ]
 		"""
-
-		"""
-		ALGORITHM:
-		Idea:
-		calculate the borders of the shape for every line (y-axis) to the left and the right
-	  and fill it up later.
-		The borders are calculated this way:
-		Take a corner (here we use top right) and calculate a quarter of a circle (top right quarter).
-		This can be mirrored to every other corner.
-		Then there is only the space exactly above, below and left and right to the rect left.
-		Here, since we only got along one axis, we know that the border coords are right + radius, etc.
-		q.e.d. ;)
-		"""
-
-
-		borders = {}
-
-		# start with special case
-
-		# above, below
-		borders[self.top - radius] = ( self.left, self.right )
-		borders[self.bottom + radius] = ( self.left, self.right )
-
-		# left, right
-		for y in xrange( self.top, self.bottom+1 ):
-			borders[y] = ( self.left - radius, self.right + radius)
-
-		x = radius
-		radius_squared = radius ** 2
-		# calculate border for line y (y = 0 and y = radius are special cases handled above)
-		for y in xrange( 1, radius ):
-			test_val = radius_squared - y ** 2
-			# TODO: check if it's possible if x is decreased more than once here.
-			#       if not, change the while to an if
-			while (x ** 2) > test_val: # this is equivalent to  x^2 + y^2 > radius^2
-				x -= 1
-
-			# both sides are symmetrical, since it's a rect
-			borders[self.top - y] = (self.left - x, self.right + x)
-			borders[self.bottom + y] = (self.left - x, self.right + x)
-
-		if not include_self:
-			self_coords = frozenset(self.get_coordinates())
-			for y, x_range in borders.iteritems():
-				if y >= self.top and y <= self.bottom: # we have to sort out the self_coords here
-					for x in xrange(x_range[0], x_range[1]+1):
-						t = (x, y)
-						if t not in self_coords:
-							yield t
-				else: # coords of this rect cannot appear here
-					for x in xrange(x_range[0], x_range[1]+1):
-						yield (x, y)
-		else:
-			for y, x_range in borders.iteritems():
-				for x in xrange(x_range[0], x_range[1]+1):
-					yield (x, y)
-
+		rows = get_rect_rows(self.right - self.left, self.bottom - self.top, radius, include_self)
+		return translate_rows(rows, self.left, self.top)
 
 	def center(self):
 		""" Returns the center point of the rect. Implemented with integer division, which means the upper left is preferred """
@@ -50,9 +50,7 @@ class SQLiteAnimationLoader(fife.ResourceLoader):
 		commands = zip(commands[0::2], commands[1::2])
 
 		ani = fife.Animation()
-		frame_start, frame_end = 0.0, 0.0
-		for file in sorted(ActionSetLoader.get_action_sets()[actionset][action][int(rotation)].iterkeys()):
-			frame_end = ActionSetLoader.get_action_sets()[actionset][action][int(rotation)][file]
+		for file, duration in ActionSetLoader.get_frames(actionset, action, int(rotation)):
 			idx = horizons.main.fife.imagepool.addResourceFromFile(file)
 			img = horizons.main.fife.imagepool.getImage(idx)
 			for command, arg in commands:
@@ -126,8 +124,7 @@ class SQLiteAnimationLoader(fife.ResourceLoader):
 
 					idx = horizons.main.fife.imagepool.addResourceFromLocation(loc)
 					#img = horizons.main.fife.imagepool.getImage(idx)
-			ani.addFrame(fife.ResourcePtr(horizons.main.fife.imagepool, idx), max(1, int((float(frame_end) - frame_start)*1000)))
-			frame_start = float(frame_end)
+			ani.addFrame(fife.ResourcePtr(horizons.main.fife.imagepool, idx), duration)
 		ani.setActionFrame(0)
 		ani.thisown = 0
 		return ani
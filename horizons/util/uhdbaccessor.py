@@ -111,7 +111,7 @@ class UhDbAccessor(DbReader):
 		      WHERE object_id = ? and level = ?"
 
 		if exact_level:
-			db_data = self(sql, object_id, level)
+			db_data = self.fetchall(sql, object_id, level)
 			if db_data:
 				return db_data[ randint(0, len(db_data)-1) ]
 			else:
@@ -119,7 +119,7 @@ class UhDbAccessor(DbReader):
 
 		else: # search all levels for an action set, starting with highest one
 			for possible_level in reversed(xrange(level+1)):
-				db_data = self(sql, object_id, possible_level)
+				db_data = self.fetchall(sql, object_id, possible_level)
 				if db_data: # break if we found sth in this lvl
 					return db_data[ randint(0, len(db_data)-1) ]
 			assert False, "Couldn't find action set for obj %s in lvl %s" % (object_id, level)
@@ -182,7 +182,7 @@ class UhDbAccessor(DbReader):
 	@decorators.cachedmethod
 	def get_provided_resources(self, object_class):
 		"""Returns resources that are provided by a building- or unitclass as set"""
-		db_data = self("SELECT resource FROM balance.production WHERE amount > 0 AND \
+		db_data = self.fetchall("SELECT resource FROM balance.production WHERE amount > 0 AND \
 		production_line IN (SELECT id FROM production_line WHERE object_id = ? )", object_class)
 		return set(map(lambda x: x[0], db_data))
 
@@ -199,4 +199,4 @@ class UhDbAccessor(DbReader):
 	@decorators.cachedmethod
 	def get_storage_building_capacity(self, storage_type):
 		"""Returns the amount that a storage building can store of every resource."""
-		return self("SELECT size FROM storage_building_capacity WHERE type = ?", storage_type)[0][0]
+		return self.fetchall("SELECT size FROM storage_building_capacity WHERE type = ?", storage_type)[0][0]
@@ -0,0 +1,87 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+import zlib
+import random
+
+from horizons.util.python import ManualConstructionSingleton
+
+class WorldDigest(object):
+	"""Rolling checksum over the changes of the game state, used to detect desyncs
+	in multiplayer games.
+	Every change (resources stored, buildings added or removed, random numbers drawn, ..) is
+	mixed into the checksum of its subsystem when it happens, so getting the checksum doesn't
+	depend on the size of the world. Since all players execute the same changes in the same
+	order, their checksums are equal as long as the games are in sync. Once a game got out of
+	sync, the checksums stay different, so the subsystem values (see get_values) point to
+	where the desync occurred first.
+
+	The instance only exists in multiplayer sessions, WorldDigest() returns None otherwise.
+	"""
+	__metaclass__ = ManualConstructionSingleton
+
+	SUBSYSTEMS = ('rng', 'storage', 'buildings', 'settlements')
+
+	def __init__(self):
+		self.values = dict.fromkeys(self.SUBSYSTEMS, 0)
+
+	def add(self, subsystem, *data):
+		"""Mixes a change into the checksum of a subsystem
+		@param subsystem: one of SUBSYSTEMS
+		@param data: ints, floats or strings describing the change"""
+		self.values[subsystem] = zlib.crc32(repr(data), self.values[subsystem]) & 0xffffffff
+
+	def get_value(self):
+		"""Returns the checksum of the whole game state
+		@return: int, 32 bit"""
+		return self.combine(self.get_values())
+
+	def get_values(self):
+		"""Returns the checksums of the subsystems
+		@return: tuple of ints in the order of SUBSYSTEMS"""
+		return tuple(self.values[subsystem] for subsystem in self.SUBSYSTEMS)
+
+	@classmethod
+	def combine(cls, values):
+		"""Reduces the checksums of the subsystems to the checksum of the whole game state
+		@param values: tuple, as returned by get_values
+		@return: int, 32 bit"""
+		return zlib.crc32(repr(values)) & 0xffffffff
+
+
+class DigestRandom(random.Random):
+	"""Random number generator that adds every number it draws to a WorldDigest.
+	All random functions (randint, choice, ..) are based on random(), so it catches every draw.
+	@param digest: WorldDigest instance
+	@param seed: seed for the rng"""
+	def __new__(cls, digest, seed=None):
+		# the base class' constructor only accepts the seed
+		return random.Random.__new__(cls, seed)
+
+	def __init__(self, digest, seed=None):
+		self.digest = digest
+		random.Random.__init__(self, seed)
+
+	def random(self):
+		value = random.Random.random(self)
+		self.digest.add('rng', value)
+		return value
@@ -37,6 +37,8 @@ from horizons.ai.pirate import Pirate
 from horizons.entities import Entities
 from horizons.util import decorators
 from horizons.world.buildingowner import BuildingOwner
+from horizons.world.pathfinding.pathnodes import WorldPathNodes
+from horizons.world.tilestore import TileStore
 
 class World(BuildingOwner, LivingObject, WorldObject):
 	"""The World class represents an Unknown Horizons map with all its units, grounds, buildings, etc.
@@ -44,13 +46,14 @@ class World(BuildingOwner, LivingObject, WorldObject):
 	   * players - a list of all the session's players - Player instances
 	   * islands - a list of all the map's islands - Island instances
 	   * grounds - a list of all the map's groundtiles
-	   * ground_map - a dictionary that binds tuples of coordinates with a reference to the tile:
+	   * ground_map - TileStore of the water, that maps tuples of coordinates to tiles like a dict:
 	                  { (x, y): tileref, ...}
 					  This is important for pathfinding and quick tile fetching.
 	   * ships 		- a list of all the ships ingame - horizons.world.units.ship.Ship instances
 	   * ship_map 	- same as ground_map, but for ships
 	   * session 	- reference to horizons.session.Session instance of the current game
-	   * water 		- List of coordinates that are water
+	   * water 		- Dictionary of coordinates that are water: { (x, y): speed, ...}
+	   * path_nodes - WorldPathNodes instance, that holds water and water_and_coastline
 	   * trader 	- The worlds ingame free trader player instance
 	   TUTORIAL: You should now check out the _init() function.
 	"""
@@ -70,11 +73,14 @@ class World(BuildingOwner, LivingObject, WorldObject):
 		self.player = None
 		self.ground_map = None
 		self.water = None
+		self.water_and_coastline = None
+		self.path_nodes = None
 		self.ship_map = None
 		self.ships = None
 		self.trader = None
 		self.pirate = None
 		self.islands = None
+		self._island_grid = None
 		super(World, self).end()
 
 	@decorators.make_constants()
@@ -153,45 +159,46 @@ class World(BuildingOwner, LivingObject, WorldObject):
 
 		self.map_dimensions = Rect.init_from_borders(self.min_x, self.min_y, self.max_x, self.max_y)
 
+		# grid that maps coordinates to islands, see get_island
+		self._island_grid_width = self.max_x - self.min_x + 1
+		self._island_grid_height = self.max_y - self.min_y + 1
+		self._island_grid = [None] * (self._island_grid_width * self._island_grid_height)
+		for island in self.islands:
+			self._add_island_to_grid(island)
+
 		#add water
 		self.log.debug("Filling world with water...")
-		self.ground_map = {}
 		default_grounds = Entities.grounds[int(self.properties.get('default_ground', GROUND.WATER))]
 
 		# extra world size that is added so that he player can't see the "black void"
 		border = 30
+		# one instance of the ground covers 10x10 tiles
 		for x in xrange(self.min_x-border, self.max_x+border, 10):
 			for y in xrange(self.min_y-border, self.max_y+border, 10):
-				ground = default_grounds(self.session, x, y)
-				for x_offset in xrange(0,10):
-					if x+x_offset < self.max_x and x+x_offset>= self.min_x:
-						for y_offset in xrange(0,10):
-							if y+y_offset < self.max_y and y+y_offset >= self.min_y:
-								self.ground_map[(x+x_offset, y+y_offset)] = ground
-
-		# "unfill" parts that are occupied by island
-		# TODO: check if constructing a list of water coords is faster than calling the Ground() so many times
-		for island in self.islands:
-			for coord in island.ground_map:
-				if coord in self.ground_map:
-					del self.ground_map[coord]
+				default_grounds.create_instance(self.session, x, y)
+		self.ground_map = TileStore(self.session, self.min_x, self.min_y, \
+		                            self.max_x - self.min_x, self.max_y - self.min_y, \
+		                            instance_grid=(self.min_x-border, self.min_y-border, 10))
+
+		# add tiles for all coordinates, that aren't occupied by an island
+		island_grid = self._island_grid
+		for x in xrange(self.min_x, self.max_x):
+			column = (x - self.min_x) * self._island_grid_height - self.min_y
+			for y in xrange(self.min_y, self.max_y):
+				if island_grid[column + y] is None:
+					self.ground_map.add(x, y, default_grounds)
 
 		# load world buildings (e.g. fish)
 		for (building_worldid, building_typeid) in \
 		    savegame_db("SELECT rowid, type FROM building WHERE location = ?", self.worldid):
 			load_building(self.session, savegame_db, building_typeid, building_worldid)
 
-		self.water = list(self.ground_map)
-
-		# assemble list of water and coastline for ship, that can drive through shallow water
-		# NOTE: this is rather a temporary fix to make the fisher be able to move
-		# since there are tile between coastline and deep sea, all non-constructible tiles
-		# are added to this list as well, which will contain a few too many
-		self.water_and_coastline = self.water[:]
-		for island in self.islands:
-			for coord, tile in island.ground_map.iteritems():
-				if 'coastline' in tile.classes or 'constructible' not in tile.classes:
-					self.water_and_coastline.append(coord)
+		# assemble water nodes for ships. they are built once, so that
+		# the pathfinding can use them directly.
+		self.path_nodes = WorldPathNodes(self)
+		self.water = self.path_nodes.water
+		# water and coastline for ships, that can drive through shallow water
+		self.water_and_coastline = self.path_nodes.water_and_coastline
 
 		# create ship position list. entries: ship_map[(x, y)] = ship
 		self.ship_map = {}
@@ -259,8 +266,8 @@ class World(BuildingOwner, LivingObject, WorldObject):
 				max_mountains = self.session.random.randint(1, 3)
 				num_clay_deposits = 0
 				num_mountains = 0
-				# TODO: fix this sorted()-call. its slow but orderness of dict-loop isn't guaranteed
-				for coords, tile in sorted(island.ground_map.iteritems()):
+				# the tile store yields the tiles sorted by coordinates
+				for coords, tile in island.ground_map.iteritems():
 					# add tree to every nth tile
 					if self.session.random.randint(0, 2) == 0 and Tree.check_build(self.session, tile, \
 										                                           check_settlement=False):
@@ -278,7 +285,7 @@ class World(BuildingOwner, LivingObject, WorldObject):
 					     Mountain.check_build(self.session, tile, check_settlement=False):
 						num_mountains += 1
 						Build(Mountain, coords[0], coords[1], ownerless=True, island=island)(issuer=None)
-					if 'coastline' in tile.classes and self.session.random.randint(0, 4) == 0:
+					if tile.class_mask & GROUND.COASTLINE and self.session.random.randint(0, 4) == 0:
 						# try to place fish
 						# from the current position, go to random directions 2 times
 						directions = [ (i, j) for i in xrange(-1, 2) for j in xrange(-1, 2) ]
@@ -444,26 +451,41 @@ class World(BuildingOwner, LivingObject, WorldObject):
 		i = self.get_island(point)
 		return None if i is None else i.get_building(point)
 
+	def _add_island_to_grid(self, island):
+		"""Registers the coordinates of island in the island grid.
+		Has to be called for every island, that is added to the world."""
+		grid = self._island_grid
+		height = self._island_grid_height
+		min_x, min_y = self.min_x, self.min_y
+		for (x, y) in island.ground_map:
+			grid[(x - min_x) * height + (y - min_y)] = island
+
 	def get_island(self, point):
 		"""Returns the island for that coordinate, if none is found, returns None.
+		Very fast (O(1)).
 		@param point: instance of Point"""
-		tup = point.to_tuple()
-		if tup in self.ground_map:
-			# this optimisation pays of if water tiles are frequently queried
-			return None
-		for island in self.islands:
-			if tup in island.ground_map:
-				return island
+		x = point.x - self.min_x
+		y = point.y - self.min_y
+		if 0 <= x < self._island_grid_width and 0 <= y < self._island_grid_height:
+			return self._island_grid[x * self._island_grid_height + y]
 		return None
 
 	def get_islands_in_radius(self, point, radius):
 		"""Returns all islands in a certain radius around a point.
 		@return set of islands in radius"""
 		islands = set()
-		for island in self.islands:
-			for tile in island.get_surrounding_tiles(point, radius):
-				islands.add(island)
-				break
+		grid = self._island_grid
+		height = self._island_grid_height
+		center_x = point.x - self.min_x
+		center_y = point.y - self.min_y
+		# check the column of the circle for every x of it
+		for x in xrange(max(center_x - radius, 0), min(center_x + radius + 1, self._island_grid_width)):
+			dy = int((radius ** 2 - (x - center_x) ** 2) ** 0.5)
+			top = max(center_y - dy, 0)
+			bottom = min(center_y + dy + 1, height)
+			if top < bottom:
+				islands.update(grid[x * height + top : x * height + bottom])
+		islands.discard(None)
 		return islands
 
 	@decorators.make_constants()
@@ -528,24 +550,6 @@ class World(BuildingOwner, LivingObject, WorldObject):
 		for ship in self.ships:
 			ship.save(db)
 
-	def get_checkup_hash(self):
-		dict = {
-			'rngvalue': self.session.random.random(),
-			'settlements': [],
-		}
-		for island in self.islands:
-			for settlement in island.settlements:
-				entry = {
-					'owner': str(settlement.owner.worldid),
-					'tax_settings': str(settlement.tax_setting),
-					'inhabitants': str(settlement.inhabitants),
-					'cumulative_running_costs': str(settlement.cumulative_running_costs),
-					'cumulative_taxes': str(settlement.cumulative_taxes),
-					'inventory' : str(settlement.inventory._storage),
-				}
-				dict['settlements'].append(entry)
-		return dict
-
 	def notify_new_settlement(self):
 		"""Called when a new settlement is created"""
 		# make sure there's a trader ship for 2 settlements
@@ -44,8 +44,8 @@ class BuildingClass(type):
 	"""
 	log = logging.getLogger('world.building')
 
-	def __new__(self, db, id):
-		class_package, class_name = db.get_building_class_data(id)
+	def __new__(self, db, id, data):
+		class_package, class_name = data['building'][:2]
 		__import__('horizons.world.building.'+class_package)
 
 		@classmethod
@@ -59,31 +59,31 @@ class BuildingClass(type):
 			(getattr(globals()[class_package], class_name),),
 			{'load': load})
 
-	def __init__(self, db, id):
+	def __init__(self, db, id, data):
 		"""
 		Final loading for the building class. Load a lot of attributes for the building classes
 		@param id: building id.
 		@param db: DbReader
+		@param data: dict containing the rows of the building in the db tables, see Entities.load_buildings
 		"""
 		super(BuildingClass, self).__init__(self)
 		self.id = id
-		self._object = None
+		self._object = None # created by _loadObject when it's needed
 
-		self.class_package, size_x, size_y, name, self.radius, health, inhabitants, inhabitants_max = \
-		    db("SELECT class_package, size_x, size_y, name, radius, health, \
-		    inhabitants_start, inhabitants_max FROM data.building WHERE id = ?", id)[0]
+		self.class_package, class_name, size_x, size_y, name, self.radius, health, inhabitants, \
+		    inhabitants_max = data['building']
 		self._name = name
 		self.size = (int(size_x), int(size_y))
 		self.health = int(health)
 		self.inhabitants = int(inhabitants)
 		self.inhabitants_max = int(inhabitants_max)
-		for (name,  value) in db("SELECT name, value FROM data.building_property WHERE building = ?", str(id)):
+		for (name,  value) in data['properties']:
 			setattr(self, name, value)
 		self.costs = {}
-		for (name, value) in db("SELECT resource, amount FROM balance.building_costs WHERE building = ?", str(id)):
+		for (name, value) in data['costs']:
 			self.costs[name]=value
-		self._loadObject(db)
-		running_costs = db("SELECT cost_active, cost_inactive FROM balance.building_running_costs WHERE building=?", self.id)
+		self._action_set_ids = [ action_set_id for (action_set_id,) in data['action_sets'] ]
+		running_costs = data['running_costs']
 		if len(running_costs) > 0:
 			self.running_costs = running_costs[0][0]
 			self.running_costs_inactive = running_costs[0][1]
@@ -91,12 +91,10 @@ class BuildingClass(type):
 			self.running_costs = 0
 			self.running_costs_inactive = 0
 		self.has_running_costs = (self.running_costs != 0)
-		soundfiles = db("SELECT file FROM sounds INNER JOIN object_sounds ON \
-			sounds.rowid = object_sounds.sound AND object_sounds.object = ?", self.id)
-		self.soundfiles = [ i[0] for i in soundfiles ]
+		self.soundfiles = [ i[0] for i in data['sounds'] ]
 
 		# for mines: on which deposit is it buildable
-		buildable_on_deposit_type = db("SELECT deposit FROM mine WHERE mine = ?", self.id)
+		buildable_on_deposit_type = data['deposits']
 		if buildable_on_deposit_type:
 			self.buildable_on_deposit_type = buildable_on_deposit_type[0][0]
 
@@ -109,8 +107,10 @@ class BuildingClass(type):
 					 horizons/world/storageholder.py is the next place to go.
 					 """
 
-	def _loadObject(cls, db):
-		"""Loads building from the db.
+	def _loadObject(cls):
+		"""Creates the fife object of the building with all its actions and animations.
+		This loads all images of the building, so it's only done when the first instance
+		is created (see Building.getInstance).
 		"""
 		cls.log.debug("Loading building %s", cls.id)
 		try:
@@ -119,9 +119,8 @@ class BuildingClass(type):
 			cls.log.debug("Already loaded building %s", cls.id)
 			cls._object = horizons.main.fife.engine.getModel().getObject(str(cls.id), 'building')
 			return
-		action_sets = db("SELECT action_set_id FROM data.action_set WHERE object_id=?",cls.id)
 		all_action_sets = ActionSetLoader.get_action_sets()
-		for (action_set_id,) in action_sets:
+		for action_set_id in cls._action_set_ids:
 			for action_id in all_action_sets[action_set_id].iterkeys():
 				action = cls._object.createAction(action_id+"_"+str(action_set_id))
 				fife.ActionVisual.create(action)
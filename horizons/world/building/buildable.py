@@ -22,8 +22,7 @@ import math
 
 from horizons.util import Point, Rect, decorators
 from horizons.world.pathfinding.pather import StaticPather
-from horizons.constants import BUILDINGS
-from horizons.entities import Entities
+from horizons.constants import BUILDINGS, GROUND
 
 class _BuildPosition(object):
 	"""A possible build position in form of a data structure.
@@ -57,6 +56,54 @@ class _BuildPosition(object):
 	def __ne__(self, other):
 		return not self.__eq__(other)
 
+	def copy(self):
+		return _BuildPosition(self.position, self.rotation, self.tearset, self.buildable, self.action)
+
+class BuildPositionCache(object):
+	"""Caches the results of check_build for one building class, so that the building tool
+	doesn't have to check the whole area again on every mouse move while dragging.
+	The results only depend on the buildings on the map (settlements only change with them)
+	and in multiplayer games on the builds in construction, the cache is cleared if they change.
+	Builds from ships are not cached, since the ship moves."""
+	def __init__(self, session, building_class):
+		self.session = session
+		self.building_class = building_class
+		self._build_positions = {} # (x, y, rotation) : _BuildPosition
+		self._state = None
+
+	def _get_state(self):
+		world = self.session.world
+		changes = world.building_changes
+		for island in world.islands:
+			changes += island.building_changes
+		in_construction = None
+		if hasattr(self.session.manager, 'get_coords_in_construction'):
+			in_construction = self.session.manager.get_coords_in_construction()
+		return (changes, in_construction)
+
+	def check_state(self):
+		"""Clears the cache if the world changed since the last call"""
+		state = self._get_state()
+		if state != self._state:
+			self._build_positions.clear()
+			self._state = state
+
+	def check_build(self, point, rotation=45, ship=None):
+		"""Same as check_build of the building class. Call check_state before.
+		@return: a copy of the cached _BuildPosition, so it can be modified"""
+		if ship is not None:
+			return self.building_class.check_build(self.session, point, rotation=rotation, ship=ship)
+		key = (point.x, point.y, rotation)
+		build = self._build_positions.get(key)
+		if build is None:
+			build = self.building_class.check_build(self.session, point, rotation=rotation)
+			self._build_positions[key] = build
+		return build.copy()
+
+	def clear(self):
+		self._build_positions.clear()
+		self._state = None
+
 class _NotBuildableError(Exception):
 	"""Internal exception."""
 
@@ -96,12 +143,13 @@ class Buildable(object):
 		return _BuildPosition(position, rotation, tearset, buildable)
 
 	@classmethod
-	def check_build_line(cls, session, point1, point2, rotation=45, ship=None):
+	def check_build_line(cls, session, point1, point2, rotation=45, ship=None, cache=None):
 		"""Checks out a line on the map for build possibilities.
 		The line usually is a draw of the mouse.
 		@param point1, point2: Point instance, start and end of the line
 		@param rotation: prefered rotation
 		@param ship: ship instance if building from ship
+		@param cache: BuildPositionCache of cls, optional. Results of previous checks are reused.
 		@return list of _BuildPositions
 		"""
 		raise NotImplementedError
@@ -136,10 +184,10 @@ class Buildable(object):
 			island = session.world.get_island(position.center())
 			if island is None:
 				raise _NotBuildableError()
+		get_class_mask = island.ground_map.get_class_mask
 		for tup in position.tuple_iter():
-			# can't use get_tile_tuples since it discards None's
-			tile = island.get_tile_tuple(tup)
-			if tile is None or 'constructible' not in tile.classes:
+			# coordinates without tile have no classes
+			if not get_class_mask(tup) & GROUND.CONSTRUCTIBLE:
 				raise _NotBuildableError()
 
 	@classmethod
@@ -178,12 +226,11 @@ class Buildable(object):
 				else:
 					# building is blocking the build
 					raise _NotBuildableError()
-		if hasattr(session.manager, 'get_builds_in_construction'):
-			builds_in_constructin = session.manager.get_builds_in_construction()
-			for build in builds_in_constructin:
-				(sizex, sizey) = Entities.buildings[build.building_class].size
-				for (neededx,neededy) in position.tuple_iter():
-					if neededx in range(build.x, build.x+sizex) and neededy in range(build.y, build.y+sizey):
+		if hasattr(session.manager, 'get_coords_in_construction'):
+			coords_in_construction = session.manager.get_coords_in_construction()
+			if coords_in_construction:
+				for coord in position.tuple_iter():
+					if coord in coords_in_construction:
 						raise _NotBuildableError()
 		return tearset
 
@@ -191,7 +238,7 @@ class Buildable(object):
 class BuildableSingle(Buildable):
 	"""Buildings one can build single. """
 	@classmethod
-	def check_build_line(cls, session, point1, point2, rotation=45, ship=None):
+	def check_build_line(cls, session, point1, point2, rotation=45, ship=None, cache=None):
 		# only build 1 building at endpoint
 		# correct placement for large buildings (mouse should be at center of building)
 		point2 = point2.copy() # only change copy
@@ -217,7 +264,9 @@ class BuildableSingleEverywhere(BuildableSingle):
 class BuildableRect(Buildable):
 	"""Buildings one can build as a Rectangle, such as Trees"""
 	@classmethod
-	def check_build_line(cls, session, point1, point2, rotation=45, ship=None):
+	def check_build_line(cls, session, point1, point2, rotation=45, ship=None, cache=None):
+		if cache is not None:
+			cache.check_state()
 		possible_builds = []
 		area = Rect.init_from_corners(point1, point2)
 		# correct placement for large buildings (mouse should be at center of building)
@@ -228,16 +277,18 @@ class BuildableRect(Buildable):
 
 		for x in xrange(area.left, area.right+1, cls.size[0]):
 			for y in xrange(area.top, area.bottom+1, cls.size[1]):
-				possible_builds.append( \
-				  cls.check_build(session, Point(x, y), rotation=rotation, ship=ship) \
-				)
+				if cache is not None:
+					build = cache.check_build(Point(x, y), rotation=rotation, ship=ship)
+				else:
+					build = cls.check_build(session, Point(x, y), rotation=rotation, ship=ship)
+				possible_builds.append(build)
 		return possible_builds
 
 
 class BuildableLine(Buildable):
 	"""Buildings one can build in a line, such as paths"""
 	@classmethod
-	def check_build_line(cls, session, point1, point2, rotation=45, ship=None):
+	def check_build_line(cls, session, point1, point2, rotation=45, ship=None, cache=None):
 
 		# Pathfinding currently only supports buildingsize 1x1, so don't use it in this case
 		if cls.size != (1, 1):
@@ -252,18 +303,25 @@ class BuildableLine(Buildable):
 		if path is None: # can't find a path between these points
 			return [] # TODO: maybe implement alternative strategy
 
+		if cache is not None:
+			cache.check_state()
+
 		possible_builds = []
+		path_coords = set(path)
+		action_offsets = sorted(BUILDINGS.ACTION.action_offset_dict.iteritems()) # order is important here
 
 		for i in path:
 			action = ''
-			for action_char, offset in \
-			    sorted(BUILDINGS.ACTION.action_offset_dict.iteritems()): # order is important here
-				if (offset[0]+i[0], offset[1]+i[1]) in path:
+			for action_char, offset in action_offsets:
+				if (offset[0]+i[0], offset[1]+i[1]) in path_coords:
 					action += action_char
 			if action == '':
 				action = 'ac' # default
 
-			build = cls.check_build(session, Point(*i))
+			if cache is not None:
+				build = cache.check_build(Point(*i))
+			else:
+				build = cls.check_build(session, Point(*i))
 			build.action = action
 			possible_builds.append(build)
 
@@ -283,14 +341,13 @@ class BuildableSingleOnCoast(BuildableSingle):
 				raise _NotBuildableError()
 
 		coastline_found = False
+		get_class_mask = island.ground_map.get_class_mask
 		for tup in position.tuple_iter():
-			# can't use get_tile_tuples since it discards None's
-			tile = island.get_tile_tuple(tup)
-			if tile is None:
-				raise _NotBuildableError()
-			if 'coastline' in tile.classes:
+			# coordinates without tile have no classes
+			class_mask = get_class_mask(tup)
+			if class_mask & GROUND.COASTLINE:
 				coastline_found = True
-			elif 'constructible' not in tile.classes: # neither coastline, nor constructible
+			elif not class_mask & GROUND.CONSTRUCTIBLE: # neither coastline, nor constructible
 				raise _NotBuildableError()
 		if not coastline_found:
 			raise _NotBuildableError()
@@ -303,7 +360,7 @@ class BuildableSingleOnCoast(BuildableSingle):
 		x, y = position.origin.to_tuple()
 		for point in position:
 			if session.world.map_dimensions.contains_without_border(point):
-				is_coastline = ('coastline' in session.world.get_tile(point).classes)
+				is_coastline = bool(session.world.get_tile(point).class_mask & GROUND.COASTLINE)
 			else:
 				is_coastline = False
 			coastline[point.x-x, point.y-y] = is_coastline
@@ -31,7 +31,7 @@ from horizons.world.concreteobject import ConcretObject
 from horizons.world.settlement import Settlement
 from horizons.ambientsound import AmbientSound
 from horizons.util import ConstRect, Point, WorldObject, ActionSetLoader, decorators
-from horizons.constants import RES, LAYERS, GAME
+from horizons.constants import RES, LAYERS, GAME, GROUND
 from horizons.world.building.buildable import BuildableSingle
 from horizons.gui.tabs import EnemyBuildingOverviewTab
 
@@ -117,6 +117,9 @@ class BasicBuilding(AmbientSound, ConcretObject):
 		"""Removes the building"""
 		self.log.debug("building: remove %s", self.worldid)
 		self.island.remove_building(self)
+		# collectors cache whether buildings are possible job targets, drop references to self
+		from horizons.world.units.collectors import Collector
+		Collector.check_possible_job_target.invalidate()
 		#instance is owned by layer...
 		#self._instance.thisown = 1
 		super(BasicBuilding, self).remove()
@@ -264,6 +267,8 @@ class BasicBuilding(AmbientSound, ConcretObject):
 
 		else:
 			return None
+		if cls._object is None:
+			cls._loadObject()
 		instance = session.view.layers[cls.layer].createInstance(cls._object, \
 											                                       fife.ModelCoordinate(*instance_coords))
 		facing_loc.setLayerCoordinates(fife.ModelCoordinate(*layer_coords))
@@ -376,7 +381,7 @@ class SelectableBuilding(object):
 
 			for tile in ground_holder.get_tiles_in_radius(position, cls.radius, include_self=False):
 				try:
-					if ( 'constructible' in tile.classes or 'coastline' in tile.classes ):
+					if tile.class_mask & (GROUND.CONSTRUCTIBLE | GROUND.COASTLINE):
 						cls._add_selected_tile(tile, position, renderer)
 				except AttributeError:
 					pass # no tile or no object on tile
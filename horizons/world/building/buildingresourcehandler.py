@@ -34,6 +34,9 @@ class BuildingResourceHandler(ResourceHandler):
 		@param island: the island where the building is located
 		"""
 		island.provider_buildings.append(self)
+		# collectors that wait for changes here, see BuildingCollector.wait_for_job
+		self.__waiting_collectors = []
+		self.inventory.add_change_listener(self.wake_waiting_collectors)
 
 	def load(self, db, worldid):
 		super(BuildingResourceHandler, self).load(db, worldid)
@@ -45,6 +48,24 @@ class BuildingResourceHandler(ResourceHandler):
 	def remove(self):
 		super(BuildingResourceHandler, self).remove()
 		self.island.provider_buildings.remove(self)
+		self.__waiting_collectors = []
+
+	def add_waiting_collector(self, collector):
+		self.__waiting_collectors.append(collector)
+
+	def remove_waiting_collector(self, collector):
+		if collector in self.__waiting_collectors:
+			self.__waiting_collectors.remove(collector)
+
+	def wake_waiting_collectors(self):
+		"""Notifies the collectors, that wait for changes here, that there might be a job now"""
+		for collector in self.__waiting_collectors[:]:
+			collector.wake_up()
+
+	def remove_incoming_collector(self, collector):
+		super(BuildingResourceHandler, self).remove_incoming_collector(collector)
+		# the resources the collector would have picked up are available again
+		self.wake_waiting_collectors()
 
 	def set_active(self, production=None, active=True):
 		super(BuildingResourceHandler, self).set_active(production, active)
@@ -48,7 +48,7 @@ class AnimalField(CollectingBuilding, Field):
 	walkable = False
 	def create_collector(self):
 		self.animals = []
-		for (animal, number) in self.session.db("SELECT unit_id, count FROM balance.animals \
+		for (animal, number) in self.session.db.fetchall("SELECT unit_id, count FROM balance.animals \
 		                                    WHERE building_id = ?", self.id):
 			for i in xrange(0, number):
 				Entities.units[animal](self, session=self.session)
@@ -86,8 +86,8 @@ class ResourceDeposit(SelectableBuilding, StorageHolder, NatureBuilding):
 		super(ResourceDeposit, self).__init__(*args, **kwargs)
 		if inventory is None: # a new deposit
 			for resource, min_amount, max_amount in \
-			    self.session.db("SELECT resource, min_amount, max_amount FROM deposit_resources WHERE id = ?", \
-			                    self.id):
+			    self.session.db.fetchall("SELECT resource, min_amount, max_amount FROM deposit_resources WHERE id = ?", \
+			                             self.id):
 				self.inventory.alter(resource, self.session.random.randint(min_amount, max_amount))
 		else: # deposit was removed for mine, now build back
 			for res, amount in inventory.iteritems():
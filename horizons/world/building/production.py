@@ -200,7 +200,7 @@ class AnimalFarm(SelectableBuilding, CollectingProducerBuilding, BuildableSingle
 		self.animals = []
 
 		# NOTE: animals have to be created before the AnimalCollector
-		for (animal, number) in horizons.main.db("SELECT unit_id, count FROM data.animals \
+		for (animal, number) in horizons.main.db.fetchall("SELECT unit_id, count FROM data.animals \
 		                                    WHERE building_id = ?", self.id):
 			for i in xrange(0, number):
 				Entities.units[animal](self)
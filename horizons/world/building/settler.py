@@ -249,5 +249,5 @@ class Settler(SelectableBuilding, BuildableSingle, CollectingProducerBuilding, B
 		"""Returns constant settler-related data from the db.
 		The values are cached by python, so the underlying data must not change."""
 		return int(
-		  self.session.db("SELECT value from settler.balance_values WHERE name = ?", key)[0][0]
+		  self.session.db.fetchall("SELECT value from settler.balance_values WHERE name = ?", key)[0][0]
 		  )
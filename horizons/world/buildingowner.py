@@ -21,8 +21,8 @@
 
 
 from horizons.world.providerhandler import ProviderHandler
-from horizons.util import decorators
 from horizons.util.shapes.radiusshape import RadiusShape
+from horizons.util import WorldDigest
 
 """
 Simple building management functionality.
@@ -37,6 +37,7 @@ class BuildingOwner(object):
 		super(BuildingOwner, self).__init__(*args, **kwargs)
 		self.provider_buildings = ProviderHandler()
 		self.buildings = []
+		self.building_changes = 0 # incremented on every addition or removal of a building
 
 	def add_building(self, building, player):
 		"""Adds a building to the island at the position x, y with player as the owner.
@@ -48,6 +49,11 @@ class BuildingOwner(object):
 			tile.blocked = True # Set tile blocked
 			tile.object = building # Set tile's object to the building
 		self.buildings.append(building)
+		self.building_changes += 1
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('buildings', 'add', building.worldid, building.id, \
+			           building.position.origin.x, building.position.origin.y)
 		building.init()
 		return building
 
@@ -63,9 +69,12 @@ class BuildingOwner(object):
 		# Remove this building from the buildings list
 		self.buildings.remove(building)
 		assert building not in self.buildings
+		self.building_changes += 1
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('buildings', 'remove', building.worldid)
 
 
-	@decorators.make_constants()
 	def get_providers_in_range(self, radiusshape, res=None, reslist=None, player=None):
 		"""Returns all instances of provider within the specified shape.
 		NOTE: Specifing the res parameter is usually a huge speed gain.
@@ -76,22 +85,16 @@ class BuildingOwner(object):
 		@return: list of providers"""
 		assert not (bool(res) and bool(reslist))
 		assert isinstance(radiusshape, RadiusShape)
-		# find out relevant providers
-		if res is not None:
-			provider_list = self.provider_buildings.provider_by_resources[res]
-		elif reslist:
-			provider_list = set()
-			for _res in reslist:
-				provider_list = provider_list.union(self.provider_buildings.provider_by_resources[_res])
-		else:
-			# worst case: search all provider buildings
-			provider_list = self.provider_buildings
-		# filter out those that aren't in range
+		if not reslist:
+			return self.provider_buildings.get_providers_in_range(radiusshape, res, player)
+		# providers can provide more than one of the resources, only return them once
 		possible_providers = []
-		for provider in provider_list:
-			if (player is None or player == provider.owner) and \
-				 provider.position.distance(radiusshape.center) <= radiusshape.radius:
-				possible_providers.append(provider)
+		found = set()
+		for _res in reslist:
+			for provider in self.provider_buildings.get_providers_in_range(radiusshape, _res, player):
+				if provider not in found:
+					found.add(provider)
+					possible_providers.append(provider)
 		return possible_providers
 
 	def save(self, db):
@@ -29,24 +29,75 @@ import horizons.main
 from horizons.constants import LAYERS, GROUND
 
 class SurfaceTile(object):
+	"""A tile of the map.
+	The data of the tiles is kept in a TileStore, instances of this class are views on it,
+	that are created on demand (see TileStore.__getitem__). Views of the same tile compare equal.
+	The class of a view is the ground class of the tile, so ground data like classes and
+	velocity are class attributes.
+	"""
+	__slots__ = ('_store', '_index', 'x', 'y')
+
 	is_water = False
 	layer = LAYERS.GROUND
-	def __init__(self, session, x, y):
+	class_mask = 0 # GROUND.CONSTRUCTIBLE, GROUND.COASTLINE, ..
+
+	def __init__(self, store, index, x, y):
 		"""
-		@param session: Session instance
-		@param x: int x position the ground is created.
-		@param y: int y position the ground is created.
+		@param store: TileStore, that contains the tile
+		@param index: position of the tile in the store
+		@param x: int x position of the tile
+		@param y: int y position of the tile
 		"""
+		self._store = store
+		self._index = index
 		self.x = x
 		self.y = y
 
-		self.settlement = None
-		self.blocked = False
-		self.object = None
-
-		self._instance = session.view.layers[self.layer].createInstance(self._object, \
+	@classmethod
+	def create_instance(cls, session, x, y):
+		"""Creates the fife instance of the ground at x, y. The instance is owned by the layer,
+		views look it up when they need it (see _instance)."""
+		instance = session.view.layers[cls.layer].createInstance(cls._object, \
 		                    fife.ModelCoordinate(int(x), int(y), 0), "")
-		fife.InstanceVisual.create(self._instance)
+		fife.InstanceVisual.create(instance)
+
+	def _get_settlement(self):
+		return self._store.get_settlement(self._index)
+
+	def _set_settlement(self, settlement):
+		self._store.set_settlement(self._index, settlement)
+
+	settlement = property(_get_settlement, _set_settlement)
+
+	def _get_object(self):
+		return self._store.get_object(self._index)
+
+	def _set_object(self, obj):
+		self._store.set_object(self._index, obj)
+
+	object = property(_get_object, _set_object)
+
+	def _get_blocked(self):
+		return self._store.is_blocked(self._index)
+
+	def _set_blocked(self, blocked):
+		self._store.set_blocked(self._index, blocked)
+
+	blocked = property(_get_blocked, _set_blocked)
+
+	@property
+	def _instance(self):
+		return self._store.get_instance(self)
+
+	def __eq__(self, other):
+		return isinstance(other, SurfaceTile) and self._index == other._index and \
+		       self._store is other._store
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	def __hash__(self):
+		return self._index
 
 	def __str__(self):
 		return "SurfaceTile(x=%s, y=%s, water=%s, obj=%s)" % \
@@ -54,10 +105,11 @@ class SurfaceTile(object):
 
 class Ground(SurfaceTile):
 	"""Default land surface"""
-	pass
+	__slots__ = ()
 
 class Water(SurfaceTile):
 	"""Default water surface"""
+	__slots__ = ()
 	is_water = True
 	layer = LAYERS.WATER
 
@@ -68,32 +120,36 @@ class GroundClass(type):
 	"""
 	log = logging.getLogger('world')
 
-	def __init__(self, db, id):
+	def __init__(self, db, id, data):
 		"""
 		@param id: id in db for this specific ground class
 		@param db: DbReader instance to get data from
+		@param data: dict containing the rows of the ground in the db tables, see Entities.load_grounds
 		"""
 		self.id = id
 		self._object = None
 		self.velocity = {}
-		for unit, straight, diagonal in db("SELECT unit, time_move_straight, time_move_diagonal FROM data.unit_velocity WHERE ground = ?", self.id):
+		for unit, straight, diagonal in data['velocities']:
 			self.velocity[unit] = (straight, diagonal)
 		self.classes = ['ground[' + str(id) + ']']
-		for (name,) in db("SELECT class FROM data.ground_class WHERE ground = ?", id):
+		self.class_mask = 0
+		for (name,) in data['classes']:
 			self.classes.append(name)
-		self._loadObject(db)
+			self.class_mask |= GROUND.CLASS_BITS.get(name, 0)
+		self._loadObject(data['animations'])
 
-	def __new__(self, db, id):
+	def __new__(self, db, id, data):
 		"""
 		@param id: ground id.
 		"""
 		if id == GROUND.WATER:
-			return type.__new__(self, 'Ground[' + str(id) + ']', (Water,), {})
+			return type.__new__(self, 'Ground[' + str(id) + ']', (Water,), {'__slots__' : ()})
 		else:
-			return type.__new__(self, 'Ground[' + str(id) + ']', (Ground,), {})
+			return type.__new__(self, 'Ground[' + str(id) + ']', (Ground,), {'__slots__' : ()})
 
-	def _loadObject(self, db):
-		""" Loads the ground object from the db (animations, etc)
+	def _loadObject(self, animations):
+		""" Loads the ground object (animations, etc)
+		@param animations: tuple of the files for the rotations 45, 135, 225 and 315
 		"""
 		self.log.debug('Loading ground %s', self.id)
 		try:
@@ -117,13 +173,7 @@ class GroundClass(type):
 		#			action.get2dGfxVisual().addAnimation(int(rotation), anim_id)
 		#			action.setDuration(horizons.main.fife.animationpool.getAnimation(anim_id).getDuration())
 
-		animation_45, animation_135, animation_225, animation_315 = \
-		     db("SELECT \
-		     (SELECT file FROM data.animation WHERE animation_id = animation_45 LIMIT 1), \
-		     (SELECT file FROM data.animation WHERE animation_id = animation_135 LIMIT 1), \
-		     (SELECT file FROM data.animation WHERE animation_id = animation_225 LIMIT 1), \
-		     (SELECT file FROM data.animation WHERE animation_id = animation_315 LIMIT 1) \
-		     FROM data.ground WHERE id = ?", self.id)[0]
+		animation_45, animation_135, animation_225, animation_315 = animations
 		for rotation, file in [(45, animation_45), (135, animation_135), (225, animation_225), (315, animation_315)]:
 			img = horizons.main.fife.imagepool.addResourceFromFile(file)
 			visual.addStaticImage(int(rotation), img)
@@ -32,6 +32,7 @@ from horizons.world.pathfinding.pathnodes import IslandPathNodes
 from horizons.constants import BUILDINGS, UNITS
 from horizons.scenario import CONDITIONS
 from horizons.world.buildingowner import BuildingOwner
+from horizons.world.tilestore import TileStore
 
 class Island(BuildingOwner, WorldObject):
 	"""The Island class represents an Island by keeping a list of all instances on the map,
@@ -44,7 +45,7 @@ class Island(BuildingOwner, WorldObject):
 
 	Each island holds some important attributes:
 	* grounds - All grounds that belong to the island are referenced here.
-	* grounds_map -  a dictionary that binds tuples of coordinates with a reference to the tile:
+	* ground_map -  TileStore, that maps tuples of coordinates to the tiles like a dictionary:
 	                  { (x, y): tileref, ...}
 					  This is important for pathfinding and quick tile fetching.
 	* buildings - a list of all Building instances that are present on the island.
@@ -106,12 +107,14 @@ class Island(BuildingOwner, WorldObject):
 		# NOTE: it contains tiles, that are not on the island!
 		self.rect = Rect(Point(p_x, p_y), width, height)
 
-		self.ground_map = {}
-		for (rel_x, rel_y, ground_id) in db("SELECT x, y, ground_id FROM ground"): # Load grounds
-			ground = Entities.grounds[ground_id](self.session, self.origin.x + rel_x, self.origin.y + rel_y)
+		self.ground_map = TileStore(self.session, p_x, p_y, width, height)
+		for (rel_x, rel_y, ground_id) in db.execute("SELECT x, y, ground_id FROM ground"): # Load grounds
+			x, y = self.origin.x + rel_x, self.origin.y + rel_y
+			ground_class = Entities.grounds[ground_id]
+			ground_class.create_instance(self.session, x, y)
 			# These are important for pathfinding and building to check if the ground tile
 			# is blocked in any way.
-			self.ground_map[(ground.x, ground.y)] = ground
+			self.ground_map.add(x, y, ground_class)
 
 		self.settlements = []
 		self.wild_animals = []
@@ -158,19 +161,19 @@ class Island(BuildingOwner, WorldObject):
 		"""Same as get_tile, but takes a list of tuples.
 		@param tuples: iterable of tuples
 		@return: list of tiles"""
+		ground_map_get = self.ground_map.get
 		for tup in tuples:
-			if tup in self.ground_map:
-				yield self.ground_map[tup]
+			tile = ground_map_get(tup)
+			if tile is not None:
+				yield tile
 
 	def get_building(self, point):
 		"""Returns the building at the point
 		@param point: position of the tile to look on
 		@return: Building class instance or None if none is found.
 		"""
-		try:
-			return self.ground_map[point.to_tuple()].object
-		except KeyError:
-			return None
+		tile = self.ground_map.get((point.x, point.y))
+		return None if tile is None else tile.object
 
 	def get_settlement(self, point):
 		"""Look for a settlement on a specific tile
@@ -295,15 +298,13 @@ class Island(BuildingOwner, WorldObject):
 
 	def get_tiles_in_radius(self, location, radius, include_self):
 		"""Returns tiles in radius of location.
-		This is a generator.
 		@param location: anything that supports get_radius_coordinates (usually Rect).
 		@param include_self: bool, whether to include the coordinates in location
+		@return: list of tiles
 		"""
-		for coord in location.get_radius_coordinates(radius, include_self):
-			try:
-				yield self.ground_map[coord]
-			except KeyError:
-				pass
+		ground_map_get = self.ground_map.get
+		tiles = [ ground_map_get(coord) for coord in location.get_radius_coordinates(radius, include_self) ]
+		return [ tile for tile in tiles if tile is not None ]
 
 	def __iter__(self):
 		for i in self.get_coordinates():
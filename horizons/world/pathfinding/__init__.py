@@ -19,7 +19,7 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-__all__ = ['pathnodes', 'pather', 'pathfinding']
+__all__ = ['pathnodes', 'pather', 'pathfinding', 'seagraph']
 
 class PathBlockedError(Exception):
 	"""Exception to be thrown when a path is unexpectedly blocked"""
@@ -27,6 +27,7 @@ from horizons.util import Rect, Point
 
 from horizons.world.pathfinding import PathBlockedError
 from horizons.world.pathfinding.pathfinding import FindPath
+from horizons.world.pathfinding.seagraph import HierarchicalFindPath
 
 """
 In this file, you will find an interface to the pathfinding algorithm.
@@ -66,6 +67,15 @@ class AbstractPather(object):
 		Return value type must be supported by FindPath"""
 		raise NotImplementedError
 
+	def _get_find_path(self):
+		"""Returns the pathfinding algorithm to use, an instance of FindPath or a subclass"""
+		return FindPath()
+
+	def _get_path_nodes_rect(self):
+		"""Returns a Rect that contains all path nodes, or None if it isn't known.
+		FindPath uses it to index its closed set"""
+		return None
+
 	def _get_blocked_coords(self):
 		"""Returns blocked coordinates
 		Return value type must be supported by FindPath"""
@@ -99,10 +109,10 @@ class AbstractPather(object):
 					source = building
 
 		# call algorithm
-		# to use a different pathfinding code, just change the following line
-		path = FindPath()(source, destination, self._get_path_nodes(),
+		# to use a different pathfinding code, override _get_find_path
+		path = self._get_find_path()(source, destination, self._get_path_nodes(),
 											self._get_blocked_coords(), self.move_diagonal, \
-											self.make_target_walkable)
+											self.make_target_walkable, self._get_path_nodes_rect())
 
 		if path is None:
 			return False
@@ -180,9 +190,8 @@ class AbstractPather(object):
 		# just save each step of the path
 		# current position is calculated on loading through unit position
 		if self.path:
-			for step in xrange(len(self.path)):
-				db("INSERT INTO unit_path(`unit`, `index`, `x`, `y`) VALUES(?, ?, ?, ?)", \
-					 unitid, step, self.path[step][0], self.path[step][1])
+			db.executemany("INSERT INTO unit_path(`unit`, `index`, `x`, `y`) VALUES(?, ?, ?, ?)", \
+			               [ (unitid, step, x, y) for step, (x, y) in enumerate(self.path) ])
 
 	def load(self, db, worldid):
 		"""
@@ -209,9 +218,16 @@ class ShipPather(AbstractPather):
 		super(ShipPather, self).__init__(unit, move_diagonal=True,make_target_walkable = False, \
 		                                 *args, **kwargs)
 
+	def _get_find_path(self):
+		# long routes at sea are searched on the abstract sea graph first
+		return HierarchicalFindPath(self.session.world.path_nodes.sea_graph)
+
 	def _get_path_nodes(self):
 		return self.session.world.water
 
+	def _get_path_nodes_rect(self):
+		return self.session.world.map_dimensions
+
 	def _get_blocked_coords(self):
 		return self.session.world.ship_map
 
@@ -231,6 +247,10 @@ class ShipPather(AbstractPather):
 
 class FisherShipPather(ShipPather):
 	"""Can also drive through shallow water"""
+	def _get_find_path(self):
+		# the sea graph only knows about deep water
+		return FindPath()
+
 	def _get_path_nodes(self):
 		return self.session.world.water_and_coastline
 
@@ -243,6 +263,9 @@ class BuildingCollectorPather(AbstractPather):
 	def _get_path_nodes(self):
 			return self.unit.home_building.path_nodes.nodes
 
+	def _get_path_nodes_rect(self):
+		return self.unit.home_building.island.rect
+
 class RoadPather(AbstractPather):
 	"""Pather for collectors, that depend on roads (e.g. the one used for the branch office)"""
 	def __init__(self, unit, *args, **kwargs):
@@ -252,6 +275,9 @@ class RoadPather(AbstractPather):
 	def _get_path_nodes(self):
 		return self.island.path_nodes.road_nodes
 
+	def _get_path_nodes_rect(self):
+		return self.island.rect
+
 class SoldierPather(AbstractPather):
 	"""Pather for units, that move absolutely freely (such as soldiers)
 	Their path list is maintained by IslandPathNodes"""
@@ -264,6 +290,9 @@ class SoldierPather(AbstractPather):
 		island = self.session.world.get_island(self.unit.position)
 		return island.path_nodes.nodes
 
+	def _get_path_nodes_rect(self):
+		return self.session.world.get_island(self.unit.position).rect
+
 	def _get_blocked_coords(self):
 		# TODO: think of concept for blocking land units
 		return []
@@ -292,7 +321,7 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.nodes)
+		return FindPath()(source, destination, island.path_nodes.nodes, rect=island.rect)
 
 	@classmethod
 	def get_path_on_roads(cls, island, source, destination):
@@ -300,5 +329,5 @@ class StaticPather(object):
 		@param island: island to search path on
 		@param source, destination: Point or anything supported by FindPath
 		@return: list of tuples or None in case no path is found"""
-		return FindPath()(source, destination, island.path_nodes.road_nodes)
+		return FindPath()(source, destination, island.path_nodes.road_nodes, rect=island.rect)
 
@@ -20,6 +20,7 @@
 # ###################################################
 
 import sys
+import heapq
 import logging
 
 from horizons.util import Rect, Point, decorators
@@ -39,9 +40,13 @@ class FindPath(object):
 	"""
 	log = logging.getLogger("world.pathfinding")
 
+	# offsets of the neighbors of a node
+	STRAIGHT_NEIGHBORS = ( (-1, 0), (1, 0), (0, -1), (0, 1) )
+	DIAGONAL_NEIGHBORS = ( (-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1) )
+
 	@decorators.make_constants()
 	def __call__(self, source, destination, path_nodes, blocked_coords = list(), \
-							 diagonal = False, make_target_walkable = True):
+							 diagonal = False, make_target_walkable = True, rect = None):
 		"""
 		@param source: Rect, Point or BasicBuilding
 		@param destination: Rect, Point or BasicBuilding
@@ -50,6 +55,8 @@ class FindPath(object):
 		@param diagonal: whether the unit is able to move diagonally
 		@param make_target_walkable: whether we force the tiles of the target to be walkable,
 		       even if they actually aren't (used e.g. when walking to a building)
+		@param rect: Rect that contains all path_nodes (e.g. the island or world rect). It is
+		       used to index the closed set. If None, it is calculated from the path_nodes.
 		@return: list of coords as tuples that are part of the best path
 		         (from first coord after source to first coord in destination)
 						 or None if no path is found
@@ -68,6 +75,7 @@ class FindPath(object):
 		self.blocked_coords = blocked_coords
 		self.diagonal = diagonal
 		self.make_target_walkable = make_target_walkable
+		self.rect = rect
 
 		#self.log.debug('searching path from %s to %s. blocked: %s', \
 		#							 source, destination, blocked_coords)
@@ -116,6 +124,139 @@ class FindPath(object):
 
 		return True
 
+	def _get_search_rect(self, extra_coords):
+		"""Returns borders of a rect containing the path nodes and extra_coords.
+		@param extra_coords: iterable of coord tuples that may not be path nodes (source, destination)
+		@return: tuple (left, top, right, bottom)"""
+		if self.rect is not None:
+			left, top, right, bottom = self.rect.left, self.rect.top, self.rect.right, self.rect.bottom
+		else:
+			# slow fallback, pass a rect if you can
+			left = top = sys.maxint
+			right = bottom = -sys.maxint
+			for x, y in self.path_nodes:
+				if x < left: left = x
+				if x > right: right = x
+				if y < top: top = y
+				if y > bottom: bottom = y
+		for x, y in extra_coords:
+			if x < left: left = x
+			if x > right: right = x
+			if y < top: top = y
+			if y > bottom: bottom = y
+		return left, top, right, bottom
+
+	@decorators.make_constants()
+	def execute(self):
+		"""Executes algorithm"""
+		# the open set is a binary heap of (estimated total distance, estimated distance to
+		# destination, insertion counter, node) tuples. the counter makes the order of equally
+		# rated nodes deterministic, which is necessary for multiplayer games.
+		# when a better path to a node is found, it is just pushed again (lazy deletion),
+		# outdated entries are skipped when they are popped, since the node is closed by then.
+
+		# values of distance is usually measured in speed
+		# since you can't calculate the speed to the destination,
+		# these distances are measured in space
+		# this might become a problem, but this can just be fixed when
+		# the values of speed or slowness and such are defined
+		path_nodes = self.path_nodes
+		blocked_coords = self.blocked_coords
+		destination = self.destination
+		heappush = heapq.heappush
+		heappop = heapq.heappop
+
+		# estimate of the distance to the destination
+		try:
+			heuristic = destination.distance_to_tuple
+		except AttributeError:
+			heuristic = destination.distance
+
+		source_coords = self.source.get_coordinates()
+		# if one of the dest_coords has been processed, a good path is found
+		dest_coords = frozenset(self.destination.get_coordinates())
+		# source and destination coords are walkable even if they aren't path nodes
+		extra_coords = dest_coords.union(source_coords)
+
+		# closed set: one byte per coordinate of the search rect
+		left, top, right, bottom = self._get_search_rect(extra_coords)
+		height = bottom - top + 1
+		checked = bytearray((right - left + 1) * height)
+
+		# node (x, y) -> [previous node, distance to this node from source]
+		nodes = {}
+		to_check = []
+		counter = 0
+		for c in source_coords:
+			nodes[c] = [None, 0]
+			source_to_dest_dist = heuristic(c)
+			to_check.append( (source_to_dest_dist, source_to_dest_dist, counter, c) )
+			counter += 1
+		heapq.heapify(to_check)
+
+		neighbor_offsets = self.DIAGONAL_NEIGHBORS if self.diagonal else self.STRAIGHT_NEIGHBORS
+
+		# loop until we have no more nodes to check
+		while to_check:
+			cur_node_coords = heappop(to_check)[3]
+			x, y = cur_node_coords
+
+			index = (x - left) * height + (y - top)
+			if checked[index]:
+				# outdated entry of a node that has already been processed
+				continue
+			checked[index] = 1
+
+			cur_node_data = nodes[cur_node_coords]
+
+			# check if cur_node is at the destination
+			if cur_node_coords in dest_coords:
+				# we're done.
+				# insert steps of path to a list and return it
+				path = [ cur_node_coords ]
+				previous_node = cur_node_data[0]
+				while previous_node is not None:
+					path.append(previous_node)
+					previous_node = nodes[previous_node][0]
+				path.reverse()
+				return path
+
+			distance_to_neighbor = cur_node_data[1] + path_nodes.get(cur_node_coords, 0)
+
+			for x_offset, y_offset in neighbor_offsets:
+				neighbor_node = (x + x_offset, y + y_offset)
+
+				if not (neighbor_node in path_nodes or neighbor_node in extra_coords) or \
+				   neighbor_node in blocked_coords:
+					continue
+
+				if checked[(neighbor_node[0] - left) * height + (neighbor_node[1] - top)]:
+					continue
+
+				neighbor = nodes.get(neighbor_node)
+				if neighbor is None:
+					# add neighbor to list of reachable nodes to check
+					nodes[neighbor_node] = [cur_node_coords, distance_to_neighbor]
+				elif neighbor[1] > distance_to_neighbor:
+					# found better path to neighbor, update values
+					neighbor[0] = cur_node_coords
+					neighbor[1] = distance_to_neighbor
+				else:
+					continue
+
+				neighbor_to_dest_dist = heuristic(neighbor_node)
+				heappush(to_check, (distance_to_neighbor + neighbor_to_dest_dist, \
+				                    neighbor_to_dest_dist, counter, neighbor_node))
+				counter += 1
+
+		return None
+
+
+class LegacyFindPath(FindPath):
+	"""The previous implementation of the algorithm, which searches the whole open set for
+	the best node in every step. It is kept as a reference for testing and benchmarking
+	(see development/benchmark_pathfinding.py), don't use it in the game."""
+
 	@decorators.make_constants()
 	def execute(self):
 		"""Executes algorithm"""
@@ -22,6 +22,8 @@
 import logging
 
 from horizons.util import Point
+from horizons.constants import GROUND
+from horizons.world.pathfinding.seagraph import SeaGraph
 
 class PathNodes(object):
 	"""
@@ -37,21 +39,23 @@ class PathNodes(object):
 class ConsumerBuildingPathNodes(PathNodes):
 	"""List of path nodes for a consumer, that is a building
 	Interface:
-	self.nodes: list of coordinates of the home_building, where collector can walk
+	self.nodes: dictionary of coordinates of the home_building, where collector can walk
 	"""
 	def __init__(self, consumerbuilding):
 		super(ConsumerBuildingPathNodes, self).__init__()
-		self.nodes = []
+		# TODO: currently all paths have speed 1, since we don't have a real velocity-system yet.
+		self.nodes = {}
 		for coordinate in consumerbuilding.position.get_radius_coordinates(consumerbuilding.radius, include_self=False):
 			tile = consumerbuilding.island.get_tile(Point(coordinate[0], coordinate[1]))
-			if tile is not None and not 'coastline' in tile.classes:
-				self.nodes.append(coordinate)
+			if tile is not None and not tile.class_mask & GROUND.COASTLINE:
+				self.nodes[coordinate] = 1.0
 
 
 class IslandPathNodes(PathNodes):
 	"""List of path nodes for island
 	Interface:
-	self.nodes: List of nodes on island, where the terrain allows to be walked on
+	self.nodes: dictionary of nodes on island, where the terrain allows to be walked on.
+	            It is kept up to date, so that the pather can use it directly.
 	self.road_nodes: dictionary of nodes, where a road is built on
 
 	(un)register_road has to be called for each coord, where a road is built on (destroyed)
@@ -64,13 +68,14 @@ class IslandPathNodes(PathNodes):
 
 		self.island = island
 
-		# generate list of walkable tiles
+		# generate dict of walkable tiles
 		# we keep this up to date, so that path finding can use it and we don't have
 		# to calculate it every time (rather expensive!).
-		self.nodes = []
+		# TODO: currently all paths have speed 1, since we don't have a real velocity-system yet.
+		self.nodes = {}
 		for coord in self.island:
 			if self.is_walkable(coord):
-				self.nodes.append(coord)
+				self.nodes[coord] = 1.0
 
 		# nodes where a real road is built on.
 		self.road_nodes = {}
@@ -103,7 +108,7 @@ class IslandPathNodes(PathNodes):
 		# if it's not constructable, it is usually also not walkable
 		# NOTE: this isn't really a clean implementation, but it works for now
 		# it eliminates e.g. water and beaches, that shouldn't be walked on
-		if not "constructible" in tile_object.classes:
+		if not tile_object.class_mask & GROUND.CONSTRUCTIBLE:
 			return False
 		if tile_object.blocked and not tile_object.object.walkable:
 			return False
@@ -111,15 +116,42 @@ class IslandPathNodes(PathNodes):
 		return True
 
 	def reset_tile_walkability(self, coord):
-		"""Reset the status of the walkability of a coordinate in the list of walkable tiles
+		"""Reset the status of the walkability of a coordinate in the dict of walkable tiles
 		of the island. Does not change the tile itself.
 		You need to call this when a tile changes, e.g. when a building is built on it. this
 		is currently done in add/remove_building
 		@param coord: tuple: (x, y)"""
-		actually_walkable = self.is_walkable(coord)
-		# TODO: this lookup on a list is O(n), use different data structure here
-		in_list = (coord in self.nodes)
-		if not in_list and actually_walkable:
-			self.nodes.append(coord)
-		if in_list and not actually_walkable:
-			self.nodes.remove(coord)
+		if self.is_walkable(coord):
+			self.nodes[coord] = 1.0
+		else:
+			self.nodes.pop(coord, None)
+
+
+class WorldPathNodes(PathNodes):
+	"""Path nodes of the sea, used by ships
+	Interface:
+	self.water: dictionary of water nodes, where ships can drive
+	self.water_and_coastline: dictionary of water nodes and island nodes, that aren't
+	                          constructible (e.g. coastline). Used by ships that can drive
+	                          through shallow water, such as the fisher ship.
+	self.sea_graph: SeaGraph of the water nodes for hierarchical pathfinding
+
+	They are built once, since the water of a map doesn't change, so that the pather can use
+	them directly.
+	"""
+	def __init__(self, world):
+		super(WorldPathNodes, self).__init__()
+
+		# TODO: currently all paths have speed 1, since we don't have a real velocity-system yet.
+		self.water = dict.fromkeys(world.ground_map, 1.0)
+
+		# NOTE: this is rather a temporary fix to make the fisher be able to move
+		# since there are tile between coastline and deep sea, all non-constructible tiles
+		# are added to this list as well, which will contain a few too many
+		self.water_and_coastline = self.water.copy()
+		for island in world.islands:
+			for coord, class_mask in island.ground_map.iter_class_masks():
+				if class_mask & GROUND.COASTLINE or not class_mask & GROUND.CONSTRUCTIBLE:
+					self.water_and_coastline[coord] = 1.0
+
+		self.sea_graph = SeaGraph(self.water, world.map_dimensions)
@@ -0,0 +1,301 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+import heapq
+import logging
+import collections
+
+from horizons.util import Point
+from horizons.world.pathfinding.pathfinding import FindPath
+
+"""
+Hierarchical pathfinding for ships (HPA*).
+The sea is divided into square clusters. Where two neighboring clusters share water at
+their border, portal nodes are placed. The portals of a cluster are connected by edges,
+whose costs are the distances inside the cluster. Long routes are first searched on this
+small abstract graph, then only the segments between consecutive portals are searched
+on the real tiles.
+"""
+
+class SeaGraph(object):
+	"""Abstract graph of the sea, which is built from a dict of water nodes.
+	The portals are built once, so the nodes must not change afterwards (the water of a
+	map doesn't change during a game)."""
+	log = logging.getLogger("world.pathfinding")
+
+	# width and height of a cluster
+	CLUSTER_SIZE = 16
+	# entrances that are at least this wide get a portal at both ends instead of the middle
+	MAX_ENTRANCE_WIDTH = 6
+
+	def __init__(self, nodes, rect):
+		"""
+		@param nodes: dict of water nodes { (x, y): speed }. Is kept by reference.
+		@param rect: Rect that contains all nodes
+		"""
+		self.nodes = nodes
+		self.left = rect.left
+		self.top = rect.top
+		self.columns = (rect.right - rect.left) // self.CLUSTER_SIZE + 1
+		self.rows = (rect.bottom - rect.top) // self.CLUSTER_SIZE + 1
+
+		# (cluster, right or lower neighbor cluster) -> list of portal pairs [(node, node), ..]
+		self._borders = {}
+		# portal node -> list of portal nodes of neighboring clusters
+		self._inter_edges = collections.defaultdict(list)
+		# cluster -> { portal node: [(other portal node, distance), ..] }, built on demand
+		self._intra_edges = {}
+		# cluster -> bool, whether the cluster consists only of water. built on demand
+		self._open_sea = {}
+
+		for cx in xrange(self.columns):
+			for cy in xrange(self.rows):
+				self._build_borders((cx, cy))
+
+	def get_cluster(self, coord):
+		return ( (coord[0] - self.left) // self.CLUSTER_SIZE, (coord[1] - self.top) // self.CLUSTER_SIZE )
+
+	def _get_cluster_bounds(self, cluster):
+		"""@return: tuple (left, top, right, bottom) of the cluster"""
+		left = self.left + cluster[0] * self.CLUSTER_SIZE
+		top = self.top + cluster[1] * self.CLUSTER_SIZE
+		return left, top, left + self.CLUSTER_SIZE - 1, top + self.CLUSTER_SIZE - 1
+
+	def _build_borders(self, cluster):
+		"""Builds the portals between cluster and its right and lower neighbor"""
+		cx, cy = cluster
+		left, top, right, bottom = self._get_cluster_bounds(cluster)
+		if cx + 1 < self.columns:
+			border = [ ((right, y), (right + 1, y)) for y in xrange(top, bottom + 1) ]
+			self._set_portals((cluster, (cx + 1, cy)), border)
+		if cy + 1 < self.rows:
+			border = [ ((x, bottom), (x, bottom + 1)) for x in xrange(left, right + 1) ]
+			self._set_portals((cluster, (cx, cy + 1)), border)
+
+	def _set_portals(self, key, border):
+		"""Places portals on the entrances of a border
+		@param key: tuple of the two clusters
+		@param border: list of pairs of adjacent coords, one in each cluster"""
+		# find entrances, which are runs of pairs where both sides are water
+		entrances = []
+		entrance = []
+		for pair in border:
+			if pair[0] in self.nodes and pair[1] in self.nodes:
+				entrance.append(pair)
+			elif entrance:
+				entrances.append(entrance)
+				entrance = []
+		if entrance:
+			entrances.append(entrance)
+
+		portals = []
+		for entrance in entrances:
+			if len(entrance) < self.MAX_ENTRANCE_WIDTH:
+				portals.append(entrance[len(entrance) // 2])
+			else:
+				portals.append(entrance[0])
+				portals.append(entrance[-1])
+		for node, other in portals:
+			self._inter_edges[node].append(other)
+			self._inter_edges[other].append(node)
+		self._borders[key] = portals
+
+	def _get_portals(self, cluster):
+		"""Returns list of portal nodes inside of cluster"""
+		cx, cy = cluster
+		portals = []
+		portals.extend( pair[0] for pair in self._borders.get((cluster, (cx + 1, cy)), []) )
+		portals.extend( pair[0] for pair in self._borders.get((cluster, (cx, cy + 1)), []) )
+		portals.extend( pair[1] for pair in self._borders.get(((cx - 1, cy), cluster), []) )
+		portals.extend( pair[1] for pair in self._borders.get(((cx, cy - 1), cluster), []) )
+		return portals
+
+	def _get_intra_edges(self, cluster):
+		"""Returns the edges between the portals of a cluster, builds them if necessary"""
+		try:
+			return self._intra_edges[cluster]
+		except KeyError:
+			pass
+		portals = self._get_portals(cluster)
+		open_sea = self.is_open_sea(cluster)
+		edges = {}
+		for portal in portals:
+			if open_sea:
+				# the distance on open sea is just the number of (diagonal) steps
+				edges[portal] = [ (other, max(abs(portal[0] - other[0]), abs(portal[1] - other[1]))) \
+				                  for other in portals if other != portal ]
+			else:
+				distances = self._get_distances(portal, cluster)
+				edges[portal] = [ (other, distances[other]) for other in portals \
+				                  if other != portal and other in distances ]
+		self._intra_edges[cluster] = edges
+		return edges
+
+	def is_open_sea(self, cluster):
+		"""Returns whether all coords of the cluster are water nodes"""
+		try:
+			return self._open_sea[cluster]
+		except KeyError:
+			pass
+		left, top, right, bottom = self._get_cluster_bounds(cluster)
+		open_sea = all( (x, y) in self.nodes for x in xrange(left, right + 1) \
+		                for y in xrange(top, bottom + 1) )
+		self._open_sea[cluster] = open_sea
+		return open_sea
+
+	def _get_distances(self, start, cluster):
+		"""Returns the number of steps from start to all water nodes in the cluster that
+		can be reached without leaving it.
+		@return: dict { (x, y): distance }"""
+		left, top, right, bottom = self._get_cluster_bounds(cluster)
+		nodes = self.nodes
+		distances = { start: 0 }
+		queue = collections.deque([start])
+		while queue:
+			node = queue.popleft()
+			distance = distances[node] + 1
+			x, y = node
+			for neighbor in ( (x-1, y-1), (x-1, y), (x-1, y+1), (x, y-1), \
+			                  (x, y+1), (x+1, y-1), (x+1, y), (x+1, y+1) ):
+				if neighbor not in distances and neighbor in nodes and \
+				   left <= neighbor[0] <= right and top <= neighbor[1] <= bottom:
+					distances[neighbor] = distance
+					queue.append(neighbor)
+		return distances
+
+	def find_waypoints(self, source, destination):
+		"""Searches a route on the abstract graph.
+		@param source, destination: tuple: (x, y)
+		@return: list of coords, that starts with source and ends with destination, or None.
+		         Consecutive coords are either adjacent or in the same cluster."""
+		source_cluster = self.get_cluster(source)
+		dest_cluster = self.get_cluster(destination)
+
+		# temporarily connect source and destination to the portals of their clusters
+		source_distances = self._get_distances(source, source_cluster)
+		dest_distances = self._get_distances(destination, dest_cluster)
+		dest_edges = dict( (portal, dest_distances[portal]) for portal in \
+		                   self._get_portals(dest_cluster) if portal in dest_distances )
+
+		def heuristic(node):
+			return max(abs(node[0] - destination[0]), abs(node[1] - destination[1]))
+
+		source_edges = [ (portal, source_distances[portal]) for portal in \
+		                 self._get_portals(source_cluster) if portal in source_distances ]
+		if source_cluster == dest_cluster and destination in source_distances:
+			source_edges.append( (destination, source_distances[destination]) )
+
+		previous = { source: None }
+		distances = { source: 0 }
+		checked = set()
+		to_check = [ (heuristic(source), heuristic(source), 0, source) ]
+		counter = 1
+
+		while to_check:
+			node = heapq.heappop(to_check)[3]
+			if node in checked:
+				continue
+			checked.add(node)
+
+			if node == destination:
+				waypoints = []
+				while node is not None:
+					waypoints.append(node)
+					node = previous[node]
+				waypoints.reverse()
+				return waypoints
+
+			edges = [ (other, 1) for other in self._inter_edges.get(node, []) ]
+			edges.extend( self._get_intra_edges(self.get_cluster(node)).get(node, []) )
+			if node == source:
+				edges.extend(source_edges)
+			if node in dest_edges:
+				edges.append( (destination, dest_edges[node]) )
+
+			distance = distances[node]
+			for other, cost in edges:
+				if other in checked:
+					continue
+				if other not in distances or distances[other] > distance + cost:
+					distances[other] = distance + cost
+					previous[other] = node
+					h = heuristic(other)
+					heapq.heappush(to_check, (distance + cost + h, h, counter, other))
+					counter += 1
+
+		return None
+
+
+class HierarchicalFindPath(FindPath):
+	"""FindPath for ships, that searches long routes on a SeaGraph first.
+	Short routes and all cases the SeaGraph can't handle are passed to FindPath."""
+
+	def __init__(self, sea_graph):
+		super(HierarchicalFindPath, self).__init__()
+		self.sea_graph = sea_graph
+
+	def execute(self):
+		source = self.source
+		destination = self.destination
+		# routes inside of neighboring clusters aren't worth the overhead
+		if not isinstance(source, Point) or not isinstance(destination, Point) or \
+		   max(abs(source.x - destination.x), abs(source.y - destination.y)) < \
+		   2 * self.sea_graph.CLUSTER_SIZE:
+			return super(HierarchicalFindPath, self).execute()
+
+		waypoints = self.sea_graph.find_waypoints(source.to_tuple(), destination.to_tuple())
+		if waypoints is None:
+			# the abstract graph doesn't know about diagonal moves between clusters,
+			# make sure there really is no path
+			return super(HierarchicalFindPath, self).execute()
+
+		# refine the route by searching the segments between the waypoints
+		path = [ waypoints[0] ]
+		for waypoint in waypoints[1:]:
+			prev = path[-1]
+			if max(abs(prev[0] - waypoint[0]), abs(prev[1] - waypoint[1])) <= 1:
+				if waypoint in self.blocked_coords:
+					return super(HierarchicalFindPath, self).execute()
+				path.append(waypoint)
+				continue
+			if self.sea_graph.is_open_sea(self.sea_graph.get_cluster(waypoint)):
+				segment = self._get_straight_path(prev, waypoint)
+			else:
+				segment = FindPath()(Point(*prev), Point(*waypoint), self.path_nodes, \
+				                     self.blocked_coords, self.diagonal, True, self.rect)
+			if segment is None:
+				# blocked by a unit, search the whole route
+				return super(HierarchicalFindPath, self).execute()
+			path.extend(segment[1:])
+		return path
+
+	def _get_straight_path(self, source, destination):
+		"""Returns the direct path between two coords of the same open sea cluster,
+		or None if it is blocked."""
+		x, y = source
+		path = [ source ]
+		while (x, y) != destination:
+			x += cmp(destination[0], x)
+			y += cmp(destination[1], y)
+			if (x, y) in self.blocked_coords:
+				return None
+			path.append( (x, y) )
+		return path
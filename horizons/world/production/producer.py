@@ -51,7 +51,7 @@ class Producer(ResourceHandler):
 		self.__init()
 		# add production lines as specified in db.
 		if auto_init:
-			for prod_line in self.session.db("SELECT id FROM production_line WHERE object_id = ? \
+			for prod_line in self.session.db.fetchall("SELECT id FROM production_line WHERE object_id = ? \
 			    AND enabled_by_default = 1", self.id):
 				self.add_production_by_id(prod_line[0], self.production_class)
 
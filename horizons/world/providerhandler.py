@@ -22,20 +22,36 @@
 
 import horizons.main
 
+from horizons.util import decorators
+
 class ProviderHandler(list):
 	"""Class to keep track of providers of an area, especially an island.
 	It acts as a data structure for quick retrieval of special properties, that only resource
 	providers have.
 
-	Precondition: Provider never change their provided resources."""
+	Providers are additionally kept in a uniform grid per resource, so that providers in range
+	can be found without looking at all providers (see get_providers_in_range).
+	A provider is stored in the cell of the top left corner of its position.
+
+	Precondition: Provider never change their provided resources or their position."""
+
+	# width and height of a cell of the spatial index
+	CELL_SIZE = 16
 
 	def __init__(self):
 		super(ProviderHandler, self).__init__()
 		self.provider_by_resources = {}
+		# { res: { (cell_x, cell_y): [provider, ..] } }, res None contains all providers
+		self._cells_by_resources = { None : {} }
 		# we can't use dict.fromkeys here, because if you specify a list as value parameter,
 		# the same list will be shared among all entries
 		for res in horizons.main.db.get_res():
 			self.provider_by_resources[res] = []
+			self._cells_by_resources[res] = {}
+		# maximum extent of a provider beyond its top left corner, for searching adjacent cells
+		self._max_provider_extent = 0
+		# collectors that wait for new providers, see BuildingCollector.wait_for_job
+		self.waiting_collectors = []
 
 	def append(self, provider):
 		# NOTE: appended elements need to be removed, else there will be a memory leak
@@ -44,11 +60,72 @@ class ProviderHandler(list):
 			self.provider_by_resources[res].append(provider)
 		super(ProviderHandler, self).append(provider)
 
+		position = provider.position
+		self._max_provider_extent = max(self._max_provider_extent, \
+		                                position.right - position.left, position.bottom - position.top)
+		cell = self._get_cell(provider)
+		self._cells_by_resources[None].setdefault(cell, []).append(provider)
+		for res in provider.provided_resources:
+			self._cells_by_resources[res].setdefault(cell, []).append(provider)
+
+		for collector in self.waiting_collectors[:]:
+			collector.provider_added(provider)
+
 	def remove(self, provider):
 		for res in provider.provided_resources:
 			self.provider_by_resources[res].remove(provider)
 		super(ProviderHandler, self).remove(provider)
 
+		cell = self._get_cell(provider)
+		for res in [None] + list(provider.provided_resources):
+			cells = self._cells_by_resources[res]
+			cells[cell].remove(provider)
+			if not cells[cell]:
+				del cells[cell]
+
+	def _get_cell(self, provider):
+		return (provider.position.left // self.CELL_SIZE, provider.position.top // self.CELL_SIZE)
 
+	@decorators.make_constants()
+	def get_providers_in_range(self, radiusshape, res=None, player=None):
+		"""Returns all providers within the specified shape.
+		Only the cells of the spatial index that can contain such providers are checked.
+		The providers are returned in a deterministic order.
+		@param radiusshape: instance of RadiusShape
+		@param res: optional; only return providers that provide res
+		@param player: Player instance, only buildings belonging to this player
+		@return: list of providers"""
+		center = radiusshape.center
+		radius = radiusshape.radius
+		if hasattr(center, 'left'):
+			left, top, right, bottom = center.left, center.top, center.right, center.bottom
+		else:
+			left = right = center.x
+			top = bottom = center.y
+		# coordinates of providers in range can't differ more than radius from the center
+		margin = int(radius) + 1
+		extent = self._max_provider_extent
+		cell_size = self.CELL_SIZE
+		min_x = int(left - margin - extent) // cell_size
+		min_y = int(top - margin - extent) // cell_size
+		max_x = int(right + margin) // cell_size
+		max_y = int(bottom + margin) // cell_size
 
+		cells = self._cells_by_resources[res]
+		if (max_x - min_x + 1) * (max_y - min_y + 1) <= len(cells):
+			candidate_cells = []
+			for x in xrange(min_x, max_x + 1):
+				for y in xrange(min_y, max_y + 1):
+					if (x, y) in cells:
+						candidate_cells.append(cells[(x, y)])
+		else:
+			# more cells in range than cells with providers, check all of them
+			candidate_cells = [ cells[key] for key in sorted(cells) ]
 
+		providers = []
+		for cell in candidate_cells:
+			for provider in cell:
+				if (player is None or player == provider.owner) and \
+				   provider.position.distance(center) <= radius:
+					providers.append(provider)
+		return providers
@@ -22,7 +22,7 @@
 import horizons.main
 
 from storage import PositiveSizedSlotStorage
-from horizons.util import WorldObject, WeakList, NamedObject
+from horizons.util import WorldObject, WeakList, NamedObject, WorldDigest
 from tradepost import TradePost
 
 class Settlement(TradePost, NamedObject):
@@ -47,6 +47,9 @@ class Settlement(TradePost, NamedObject):
 
 	def set_tax_setting(self, tax):
 		self.tax_setting = tax
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('settlements', 'tax', self.worldid, tax)
 
 	def _possible_names(self):
 		names = horizons.main.db("SELECT name FROM data.citynames WHERE for_player = 1")
@@ -82,6 +85,7 @@ class Settlement(TradePost, NamedObject):
 
 	def setup_storage(self):
 		self.inventory = PositiveSizedSlotStorage(0)
+		self.inventory.set_holder(self)
 		self.inventory.add_change_listener(self._changed)
 
 	def save(self, db, islandid):
@@ -123,15 +127,13 @@ class Settlement(TradePost, NamedObject):
 
 	def get_tiles_in_radius(self, location, radius, include_self):
 		"""Returns tiles in radius of location.
-		This is a generator.
 		@param location: anything that supports get_radius_coordinates (usually Rect).
 		@param include_self: bool, whether to include the coordinates in location
+		@return: list of tiles
 		"""
-		for coord in location.get_radius_coordinates(radius, include_self):
-			try:
-				yield self.ground_map[coord]
-			except KeyError:
-				pass
+		ground_map = self.ground_map
+		return [ ground_map[coord] for coord in location.get_radius_coordinates(radius, include_self) \
+		         if coord in ground_map ]
 
 	def add_building(self, building):
 		"""Adds a building to the settlement.
@@ -139,6 +141,9 @@ class Settlement(TradePost, NamedObject):
 		@see Island.add_building
 		"""
 		self.buildings.append(building)
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('settlements', 'add', self.worldid, building.worldid)
 		if building.id in self.buildings_by_id.keys():
 			self.buildings_by_id[building.id].append(building)
 		else:
@@ -151,6 +156,9 @@ class Settlement(TradePost, NamedObject):
 		"""Properly removes a building from the settlement"""
 		self.buildings.remove(building)
 		self.buildings_by_id[building.id].remove(building)
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('settlements', 'remove', self.worldid, building.worldid)
 
 
 	def get_buildings_by_id(self, id):
@@ -41,8 +41,9 @@ Combinations:
 
 import sys
 import copy
+import weakref
 
-from horizons.util import ChangeListener
+from horizons.util import ChangeListener, WorldDigest
 
 class GenericStorage(ChangeListener):
 	"""The GenericStorage represents a storage for buildings/units/players/etc. for storing
@@ -53,6 +54,18 @@ class GenericStorage(ChangeListener):
 	def __init__(self):
 		super(GenericStorage, self).__init__()
 		self._storage = {}
+		self._holder = None # weakref to the object that owns this storage
+
+	def set_holder(self, holder):
+		"""Sets the object that owns this storage. Only a weak reference is kept, since the
+		holder references the storage.
+		@param holder: WorldObject"""
+		self._holder = weakref.ref(holder)
+
+	def _get_digest_id(self):
+		"""Returns the worldid of the holder, which identifies this storage in the world digest"""
+		holder = self._holder() if self._holder is not None else None
+		return holder.worldid if holder is not None else None
 
 	def save(self, db, ownerid):
 		for slot in self._storage.iteritems():
@@ -79,6 +92,9 @@ class GenericStorage(ChangeListener):
 			self._storage[res] += amount
 		else:
 			self._storage[res] = amount
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('storage', self._get_digest_id(), res, amount, self._storage[res])
 		self._changed()
 		return 0
 
@@ -86,12 +102,18 @@ class GenericStorage(ChangeListener):
 		"""Resets a resource slot to zero, removing all it's contents."""
 		if res in self._storage:
 			self._storage[res] = 0
+			digest = WorldDigest()
+			if digest is not None:
+				digest.add('storage', self._get_digest_id(), res, 0)
 			self._changed()
 
 	def reset_all(self):
 		"""Removes every resource from this inventory"""
 		for res in self._storage:
 			self._storage[res] = 0
+		digest = WorldDigest()
+		if digest is not None:
+			digest.add('storage', self._get_digest_id(), 'reset_all')
 		self._changed()
 
 	def get_limit(self, res=None):
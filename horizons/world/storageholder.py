@@ -45,6 +45,7 @@ class StorageHolder(object):
 	def __init(self):
 		self.create_inventory()
 		if self.has_own_inventory:
+			self.inventory.set_holder(self)
 			self.inventory.add_change_listener(self._changed)
 
 	def remove(self):
@@ -58,8 +59,8 @@ class StorageHolder(object):
 	def create_inventory(self):
 		"""Some buildings don't have an own inventory (e.g. storage building). Those can just
 		overwrite this function to do nothing. see also: save_inventory() and load_inventory()"""
-		db_data = horizons.main.db("SELECT resource, size FROM balance.storage WHERE object_id = ?", \
-		                           self.id)
+		db_data = horizons.main.db.fetchall("SELECT resource, size FROM balance.storage WHERE object_id = ?", \
+		                                    self.id)
 
 		if len(db_data) == 0:
 			# no db data about inventory. Create default inventory.
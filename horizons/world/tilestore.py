@@ -0,0 +1,203 @@
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+from array import array
+
+from fife import fife
+
+from horizons.entities import Entities
+from horizons.util import WorldObject
+from horizons.util.worldobject import WorldObjectNotFound
+
+class TileStore(object):
+	"""Keeps the tiles of an island or of the world.
+	The data of the tiles is stored in arrays, that are indexed by the position of the tile in
+	a rectangular area: ground id (0 for coordinates without tile), class mask, settlement,
+	object (by worldid) and blocked status. Tile objects are views on the store, that are only
+	created when they are requested.
+
+	The store can be used like the dict { (x, y) : tile } it replaces: it supports `in`, [],
+	get(), len() and iteration. Iteration yields the coordinates in sorted order.
+	"""
+	def __init__(self, session, left, top, width, height, instance_grid=None):
+		"""
+		@param session: Session instance
+		@param left, top, width, height: area, in which tiles can be added
+		@param instance_grid: tuple (left, top, step), if the fife instances of the grounds
+		                      cover step x step tiles, starting at (left, top). By default,
+		                      every tile has its own instance.
+		"""
+		self.session = session
+		self._left = left
+		self._top = top
+		self._width = width
+		self._height = height
+		self._instance_grid = instance_grid
+		self._count = 0
+
+		size = width * height
+		self._grounds = array('H', [0]) * size
+		self._class_masks = array('B', [0]) * size
+		self._settlements = array('H', [0]) * size # index in _settlement_list
+		self._objects = array('I', [0]) * size # worldid of the object or 0
+		self._blocked = array('B', [0]) * size
+
+		self._settlement_list = [None]
+		self._settlement_ids = {} # settlement : index in _settlement_list
+
+		# index : fife instance, for tiles whose instance has been needed (e.g. for coloring)
+		self._instances = {}
+
+	def add(self, x, y, ground_class):
+		"""Adds the tile at x, y or replaces its ground.
+		@param ground_class: ground class from Entities.grounds"""
+		index = (x - self._left) * self._height + (y - self._top)
+		assert 0 <= x - self._left < self._width and 0 <= y - self._top < self._height
+		if not self._grounds[index]:
+			self._count += 1
+		self._grounds[index] = ground_class.id
+		self._class_masks[index] = ground_class.class_mask
+
+	def _get_index(self, coord):
+		"""Returns the index of the tile at coord, or -1 if there is no tile.
+		@param coord: tuple (x, y)"""
+		x = coord[0] - self._left
+		y = coord[1] - self._top
+		if 0 <= x < self._width and 0 <= y < self._height:
+			index = x * self._height + y
+			if self._grounds[index]:
+				return index
+		return -1
+
+	def __contains__(self, coord):
+		return self._get_index(coord) != -1
+
+	def __getitem__(self, coord):
+		index = self._get_index(coord)
+		if index == -1:
+			raise KeyError(coord)
+		return Entities.grounds[self._grounds[index]](self, index, coord[0], coord[1])
+
+	def get(self, coord, default=None):
+		index = self._get_index(coord)
+		if index == -1:
+			return default
+		return Entities.grounds[self._grounds[index]](self, index, coord[0], coord[1])
+
+	def get_class_mask(self, coord):
+		"""Returns the class mask of the tile at coord (see GROUND.CONSTRUCTIBLE etc.),
+		without creating the tile. Coordinates without tile have no classes (0)."""
+		index = self._get_index(coord)
+		return 0 if index == -1 else self._class_masks[index]
+
+	def __len__(self):
+		return self._count
+
+	def _iterindices(self):
+		"""Yields (index, x, y) of all tiles"""
+		left, top, height = self._left, self._top, self._height
+		for index, ground_id in enumerate(self._grounds):
+			if ground_id:
+				x, y = divmod(index, height)
+				yield index, left + x, top + y
+
+	def iterkeys(self):
+		for index, x, y in self._iterindices():
+			yield (x, y)
+
+	__iter__ = iterkeys
+
+	def keys(self):
+		return list(self.iterkeys())
+
+	def itervalues(self):
+		grounds = Entities.grounds
+		for index, x, y in self._iterindices():
+			yield grounds[self._grounds[index]](self, index, x, y)
+
+	def iteritems(self):
+		grounds = Entities.grounds
+		for index, x, y in self._iterindices():
+			yield (x, y), grounds[self._grounds[index]](self, index, x, y)
+
+	def iter_class_masks(self):
+		"""Same as iteritems, but yields the class masks instead of the tiles"""
+		class_masks = self._class_masks
+		for index, x, y in self._iterindices():
+			yield (x, y), class_masks[index]
+
+	# Accessors used by the tiles
+
+	def get_settlement(self, index):
+		return self._settlement_list[self._settlements[index]]
+
+	def set_settlement(self, index, settlement):
+		if settlement is None:
+			settlement_id = 0
+		else:
+			settlement_id = self._settlement_ids.get(settlement)
+			if settlement_id is None:
+				settlement_id = self._settlement_ids[settlement] = len(self._settlement_list)
+				self._settlement_list.append(settlement)
+		self._settlements[index] = settlement_id
+
+	def get_object(self, index):
+		worldid = self._objects[index]
+		if not worldid:
+			return None
+		try:
+			return WorldObject.get_object_by_id(worldid)
+		except WorldObjectNotFound:
+			return None # object has been deleted
+
+	def set_object(self, index, obj):
+		self._objects[index] = 0 if obj is None else obj.worldid
+
+	def is_blocked(self, index):
+		return bool(self._blocked[index])
+
+	def set_blocked(self, index, blocked):
+		self._blocked[index] = 1 if blocked else 0
+
+	def get_instance(self, tile):
+		"""Returns the fife instance of the ground of a tile.
+		The instances are owned by the layer. They are looked up there when they are needed for
+		the first time, and kept afterwards, since they are usually needed again (e.g. when
+		coloring the range of a building)."""
+		try:
+			return self._instances[tile._index]
+		except KeyError:
+			pass
+		x, y = tile.x, tile.y
+		if self._instance_grid is not None:
+			left, top, step = self._instance_grid
+			x -= (x - left) % step
+			y -= (y - top) % step
+		layer = self.session.view.layers[tile.layer]
+		location = fife.Location(layer)
+		location.setLayerCoordinates(fife.ModelCoordinate(x, y, 0))
+		object_id = tile._object.getId()
+		for instance in layer.getInstancesAt(location):
+			if instance.getObject().getId() == object_id:
+				self._instances[tile._index] = instance
+				return instance
+		return None
@@ -29,9 +29,10 @@ import horizons.main
 from horizons.util import ActionSetLoader
 
 class UnitClass(type):
-	def __new__(self, db, id):
+	def __new__(self, db, id, data):
 		"""
 		@param id: unit id
+		@param data: dict containing the rows of the unit in the db tables, see Entities.load_units
 		"""
 		log = logging.getLogger('world.units')
 
@@ -43,30 +44,28 @@ class UnitClass(type):
 			return self
 
 		attributes = {'load': load}
-		attributes.update(db("SELECT name, value FROM data.unit_property WHERE unit = ?", str(id)))
+		attributes.update(data['properties'])
 
-		self.class_package,  self.class_name = db("SELECT class_package, class_type FROM data.unit WHERE id = ?", id)[0]
+		self.class_package,  self.class_name = data['unit'][:2]
 		__import__('horizons.world.units.'+self.class_package)
 
 		return type.__new__(self, 'Unit[' + str(id) + ']',
 			(getattr(globals()[self.class_package], self.class_name),),
 			attributes)
 
-	def __init__(self, db, id, **kwargs):
+	def __init__(self, db, id, data, **kwargs):
 		"""
 		@param id: unit id.
 		"""
 		super(UnitClass, self).__init__(self, **kwargs)
 		self.id = id
-		self._object = None
-		self._loadObject(db)
-		self.radius = int(db("SELECT radius FROM data.unit WHERE id=?", id)[0][0])
-		soundfiles = db("SELECT file FROM sounds INNER JOIN object_sounds ON \
-			sounds.rowid = object_sounds.sound AND object_sounds.object = ?", self.id)
-		self.soundfiles = [ i[0] for i in soundfiles ]
+		self._object = None # created by _loadObject when it's needed
+		self._action_set_ids = [ action_set_id for (action_set_id,) in data['action_sets'] ]
+		self.radius = int(data['unit'][2])
+		self.soundfiles = [ i[0] for i in data['sounds'] ]
 
-	def _loadObject(cls, db):
-		"""Loads the object with all animations.
+	def _loadObject(cls):
+		"""Loads the object with all animations. This is done when the first instance is created.
 		"""
 		cls.log.debug('Loading unit %s', cls.id)
 		try:
@@ -79,7 +78,7 @@ class UnitClass(type):
 		cls._object.setBlocking(False)
 		cls._object.setStatic(False)
 		action_sets = ActionSetLoader.get_action_sets()
-		for (action_set_id,) in db("SELECT action_set_id FROM data.action_set WHERE object_id=?", cls.id):
+		for action_set_id in cls._action_set_ids:
 			for action_id in action_sets[action_set_id].iterkeys():
 				action = cls._object.createAction(action_id+"_"+str(action_set_id))
 				fife.ActionVisual.create(action)
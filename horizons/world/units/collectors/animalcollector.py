@@ -41,6 +41,7 @@ class AnimalCollector(BuildingCollector):
 	 - release animal
 	 """
 	kill_animal = False # whether we kill the animals
+	wait_for_changes = False # changes at animals aren't noticed, so poll for jobs
 
 	def __init__(self, *args, **kwargs):
 		super(AnimalCollector, self).__init__(*args, **kwargs)
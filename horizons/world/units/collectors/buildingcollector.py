@@ -19,8 +19,10 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
+from horizons.scheduler import Scheduler
 from horizons.util import WorldObject, RadiusRect, Callback, decorators
 from horizons.world.pathfinding.pather import RoadPather, BuildingCollectorPather
+from horizons.constants import COLLECTORS
 
 from collector import Collector, JobList
 
@@ -33,9 +35,14 @@ class BuildingCollector(Collector):
 	Only fisher ships violate this rule in case their home building get's demolished.
 	Therefore, this class is not functional with home_building == None,
 	but basic facilities (esp. save/load) have to work.
+
+	When no job is found, the collector doesn't poll for jobs, but waits until something
+	changes in range that could make a job possible (see wait_for_job).
 	"""
 	job_ordering = JobList.order_by.fewest_available_and_distance
 	pather_class = BuildingCollectorPather
+	# whether to wait for changes instead of polling when there is no job, see wait_for_job
+	wait_for_changes = True
 
 	def __init__(self, home_building, **kwargs):
 		kwargs['x'] = home_building.position.origin.x
@@ -45,6 +52,10 @@ class BuildingCollector(Collector):
 
 	def __init(self, home_building):
 		self.home_building = home_building
+		self._job_unreachable = False # whether the last search found jobs, but no path to them
+		self._waiting_at_providers = None # providers we wait for while waiting for a job
+		self._wait_start = None # tick when waiting for a job started
+		self._woken_up = False # whether a search has been scheduled because of a change
 		if home_building is not None:
 			self.register_at_home_building()
 
@@ -75,6 +86,12 @@ class BuildingCollector(Collector):
 			self.home_building.add_local_collector(self)
 
 	def apply_state(self, state, remaining_ticks = None):
+		if state == self.states.idle and self.wait_for_changes and self.home_building is not None and \
+		   remaining_ticks > COLLECTORS.DEFAULT_WAIT_TICKS:
+			# the collector was waiting for changes, which isn't saved. wait again for the rest
+			# of the time, else changes in range would be ignored until the search.
+			self.wait_for_job(remaining_ticks)
+			return
 		super(BuildingCollector, self).apply_state(state, remaining_ticks)
 		if state == self.states.moving_home:
 			# collector is on his way home
@@ -82,6 +99,7 @@ class BuildingCollector(Collector):
 			self.show()
 
 	def remove(self):
+		self._stop_waiting_for_job()
 		self.register_at_home_building(unregister=True)
 		self.home_building = None
 		super(BuildingCollector, self).remove()
@@ -92,6 +110,8 @@ class BuildingCollector(Collector):
 		self.stop()
 		self.register_at_home_building(unregister=True)
 		self.home_building = None
+		# possible job targets depend on the home building
+		Collector.check_possible_job_target.invalidate(self)
 		self.state = self.states.decommissioned
 		self.show() # make sure collector is not pretending to be inside somewhere
 
@@ -101,6 +121,10 @@ class BuildingCollector(Collector):
 	def get_colleague_collectors(self):
 		return self.home_building.get_local_collectors()
 
+	def get_provider_owner(self):
+		"""Returns the BuildingOwner, whose providers are searched for jobs"""
+		return self.home_building.island
+
 	@decorators.make_constants()
 	def get_job(self):
 		"""Returns the next job or None"""
@@ -128,7 +152,70 @@ class BuildingCollector(Collector):
 		# for MP-Games the jobs must have the same ordering to ensure get_best_possible_job(..) returns the same result
 		jobs.sort(key=lambda job: job.object.worldid)
 
-		return self.get_best_possible_job(jobs)
+		job = self.get_best_possible_job(jobs)
+		self._job_unreachable = (job is None and len(jobs) > 0)
+		return job
+
+	def search_job(self):
+		self._stop_waiting_for_job()
+		super(BuildingCollector, self).search_job()
+
+	def handle_no_possible_job(self):
+		if not self.wait_for_changes or self.home_building is None or self._job_unreachable:
+			# changes of paths aren't noticed, so try again in a few secs
+			super(BuildingCollector, self).handle_no_possible_job()
+		else:
+			self.wait_for_job()
+
+	def wait_for_job(self, max_ticks=COLLECTORS.MAX_WAIT_FOR_CHANGES_TICKS):
+		"""Waits until something changes, that could make a job possible, and searches again then.
+		Changes that are noticed are: inventory changes of the providers in range and of the home
+		building, changes of the home building (e.g. its productions), collectors that cancel
+		their job at a provider in range and new providers in range.
+		Other changes (e.g. of the owner of buildings) are covered by searching again after
+		COLLECTORS.MAX_WAIT_FOR_CHANGES_TICKS.
+		@param max_ticks: ticks after which to search again, if nothing changes"""
+		self.log.debug("%s: found no possible job, waiting for changes", self)
+		# tick when the wait started, if it has been resumed after loading
+		self._wait_start = Scheduler().cur_tick - (COLLECTORS.MAX_WAIT_FOR_CHANGES_TICKS - max_ticks)
+		self._woken_up = False
+		collectable_res = self.get_collectable_res()
+		if collectable_res:
+			self._waiting_at_providers = self.get_buildings_in_range(reslist=collectable_res)
+		else:
+			self._waiting_at_providers = []
+		for provider in self._waiting_at_providers:
+			provider.add_waiting_collector(self)
+		self.home_building.inventory.add_change_listener(self.wake_up)
+		self.home_building.add_change_listener(self.wake_up)
+		self.get_provider_owner().provider_buildings.waiting_collectors.append(self)
+		Scheduler().add_new_object(self.search_job, self, max_ticks)
+
+	def wake_up(self):
+		"""Called when something changed, that could make a job possible.
+		The search is scheduled at the earliest when it would have happened without waiting
+		for changes, so that collectors don't run for every single ton."""
+		if self._waiting_at_providers is None or self._woken_up:
+			return
+		self._woken_up = True
+		run_in = max(1, self._wait_start + COLLECTORS.DEFAULT_WAIT_TICKS - Scheduler().cur_tick)
+		Scheduler().rem_call(self, self.search_job)
+		Scheduler().add_new_object(self.search_job, self, run_in)
+
+	def provider_added(self, provider):
+		"""Called by the ProviderHandler for new providers while we wait for a job"""
+		if provider.position.distance(self.home_building.position) <= self.home_building.radius:
+			self.wake_up()
+
+	def _stop_waiting_for_job(self):
+		if self._waiting_at_providers is None:
+			return
+		for provider in self._waiting_at_providers:
+			provider.remove_waiting_collector(self)
+		self.home_building.inventory.discard_change_listener(self.wake_up)
+		self.home_building.discard_change_listener(self.wake_up)
+		self.get_provider_owner().provider_buildings.waiting_collectors.remove(self)
+		self._waiting_at_providers = None
 
 	def finish_working(self, collector_already_home=False):
 		"""Called when collector has stayed at the target for a while.
@@ -184,6 +271,7 @@ class BuildingCollector(Collector):
 	def cancel(self, continue_action = None):
 		"""Cancels current job and moves back home"""
 		self.log.debug("%s cancel", self)
+		self._stop_waiting_for_job()
 		if continue_action is None:
 			continue_action = Callback(self.move_home, callback=self.search_job, action='move')
 		super(BuildingCollector, self).cancel(continue_action=continue_action)
@@ -235,3 +323,6 @@ class FisherShipCollector(BuildingCollector):
 		@param res: optional, only search for buildings that provide res"""
 		reach = RadiusRect(self.home_building.position, self.home_building.radius)
 		return self.session.world.get_providers_in_range(reach, reslist=reslist)
+
+	def get_provider_owner(self):
+		return self.session.world
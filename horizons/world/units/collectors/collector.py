@@ -99,7 +99,7 @@ class Collector(StorageHolder, Unit):
 		# empty means pick up from everywhere
 		# NOTE: this is not allowed to change at runtime.
 		self.possible_target_classes = []
-		for (object_class,) in self.session.db("SELECT object FROM collector_restrictions WHERE \
+		for (object_class,) in self.session.db.fetchall("SELECT object FROM collector_restrictions WHERE \
 		                                        collector = ?", self.id):
 			self.possible_target_classes.append(object_class)
 		self.is_restricted = (len(self.possible_target_classes) != 0)
@@ -48,13 +48,30 @@ if __name__ == '__main__':
 
 	# add tests here:
 
-	# this test isn't maintained any more:
-	# suite.addTest(loader.loadTestsFromModule(pathfinding))
+	suite.addTest(loader.loadTestsFromModule(pathfinding))
 
 	suite.addTest(loader.loadTestsFromModule(shapes))
 
+	suite.addTest(loader.loadTestsFromModule(scheduler))
+
 	suite.addTest(loader.loadTestsFromModule(storage))
 
+	suite.addTest(loader.loadTestsFromModule(dbwriter))
+
+	suite.addTest(loader.loadTestsFromModule(wireformat))
+
+	suite.addTest(loader.loadTestsFromModule(worlddigest))
+
+	suite.addTest(loader.loadTestsFromModule(decorators))
+
+	suite.addTest(loader.loadTestsFromModule(buildingcollector))
+
+	suite.addTest(loader.loadTestsFromModule(tilestore))
+
+	suite.addTest(loader.loadTestsFromModule(prefetchdbreader))
+
+	suite.addTest(loader.loadTestsFromModule(mppacketmanager))
+
 	suite.run(result)
 
 
@@ -114,6 +114,10 @@ def get_option_parser():
 											 action="store_true", default=False, help=_("For internal use only."))
 	dev_group.add_option("--profile", dest="profile", action="store_true", default=False, \
 											 help=_("Enable profiling (for developing only)."))
+	dev_group.add_option("--headless", dest="headless_ticks", metavar="<ticks>", type="int", \
+	                     help=_("Simulate <ticks> ticks of the map or savegame specified by --start-map, --start-scenario or --load-map without graphical output as fast as possible and print the ticks per second. Starts the development map if none is specified."))
+	dev_group.add_option("--headless-profile", dest="headless_profile", metavar="<file>", \
+	                     help=_("Measure the scheduler calls in headless mode and write the results to <file>. It is written as csv if it ends with .csv, else as json."))
 	p.add_option_group(dev_group)
 
 	return p
@@ -121,7 +125,7 @@ def get_option_parser():
 def create_user_dirs():
 	"""Creates the userdir and subdirs. Includes from horizons."""
 	from horizons.constants import PATHS
-	for directory in (PATHS.USER_DIR, PATHS.LOG_DIR, PATHS.SCREENSHOT_DIR):
+	for directory in (PATHS.USER_DIR, PATHS.LOG_DIR, PATHS.SCREENSHOT_DIR, PATHS.CACHE_DIR):
 		if not os.path.isdir(directory):
 			os.makedirs(directory)
 
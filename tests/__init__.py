@@ -19,4 +19,4 @@
 # 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 # ###################################################
 
-__all__ = ['pathfinding', 'shapes', 'storage']
+__all__ = ['buildingcollector', 'dbwriter', 'decorators', 'mppacketmanager', 'pathfinding', 'prefetchdbreader', 'scheduler', 'shapes', 'storage', 'tilestore', 'wireformat', 'worlddigest']
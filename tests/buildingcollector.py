@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+import unittest
+
+from horizons.scheduler import Scheduler
+from horizons.util import ChangeListener
+from horizons.constants import COLLECTORS
+from horizons.world.units.collectors.buildingcollector import BuildingCollector
+
+from tests.scheduler import DummyTimer
+
+class Dummy(object):
+	pass
+
+class DummyProvider(object):
+	def __init__(self):
+		self.waiting_collectors = []
+
+	def add_waiting_collector(self, collector):
+		self.waiting_collectors.append(collector)
+
+	def remove_waiting_collector(self, collector):
+		self.waiting_collectors.remove(collector)
+
+	def changed(self):
+		for collector in self.waiting_collectors[:]:
+			collector.wake_up()
+
+class DummyHomeBuilding(ChangeListener):
+	def __init__(self):
+		super(DummyHomeBuilding, self).__init__()
+		self.inventory = ChangeListener()
+		self.island = Dummy()
+		self.island.provider_buildings = Dummy()
+		self.island.provider_buildings.waiting_collectors = []
+
+	def add_local_collector(self, collector):
+		pass
+
+	def remove_local_collector(self, collector):
+		pass
+
+class WaitingCollector(BuildingCollector):
+	"""BuildingCollector without a unit, that can only wait for jobs"""
+	def __init__(self, home_building, providers):
+		self._BuildingCollector__init(home_building)
+		self.providers = providers
+		self.searches = 0
+
+	def get_collectable_res(self):
+		return [1]
+
+	def get_buildings_in_range(self, reslist=None):
+		return self.providers
+
+	def get_job(self):
+		self.searches += 1
+		return None
+
+class TestBuildingCollector(unittest.TestCase):
+
+	def setUp(self):
+		self.timer = DummyTimer()
+		Scheduler.create_instance(self.timer)
+		self.home_building = DummyHomeBuilding()
+		self.provider = DummyProvider()
+
+	def tearDown(self):
+		Scheduler().end()
+		Scheduler.destroy_instance()
+
+	def run_ticks(self, ticks):
+		for i in xrange(ticks):
+			tick_id = Scheduler().cur_tick + 1
+			for call in self.timer.tick_func_call:
+				call(tick_id)
+
+	def testWaitingAfterLoad(self):
+		collector = WaitingCollector(self.home_building, [self.provider])
+		collector.search_job()
+		self.run_ticks(100)
+		self.assertEqual(collector.searches, 1)
+
+		# save the remaining ticks like Collector.save and remove the collector
+		remaining_ticks = Scheduler().get_remaining_ticks(collector, collector.search_job)
+		self.assertEqual(remaining_ticks, COLLECTORS.MAX_WAIT_FOR_CHANGES_TICKS - 100)
+		collector._stop_waiting_for_job()
+		Scheduler().rem_all_classinst_calls(collector)
+
+		# the loaded collector has to wait for changes again
+		loaded = WaitingCollector(self.home_building, [self.provider])
+		loaded.apply_state(loaded.states.idle, remaining_ticks)
+		self.assertEqual(self.provider.waiting_collectors, [loaded])
+		self.assertEqual(self.home_building.island.provider_buildings.waiting_collectors, [loaded])
+		self.assertEqual(Scheduler().get_remaining_ticks(loaded, loaded.search_job), remaining_ticks)
+
+		# the wait started before saving, so a change is handled right away
+		self.provider.changed()
+		self.run_ticks(1)
+		self.assertEqual(loaded.searches, 1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from horizons.util import DbReader, DbWriter, DbSnapshot
+
+class TestDbWriter(unittest.TestCase):
+
+	def setUp(self):
+		self.db = DbWriter(':memory:')
+		self.db("CREATE TABLE unit (type INTEGER, owner INTEGER)")
+
+	def tearDown(self):
+		self.db.close()
+
+	def testBuffered(self):
+		self.db("INSERT INTO unit (rowid, type, owner) VALUES(?, ?, ?)", 1, 10, 0)
+		self.db("UPDATE unit SET owner = ? WHERE rowid = ?", 5, 1)
+		self.db("INSERT INTO unit (rowid, type, owner) VALUES(?, ?, ?)", 2, 11, 0)
+		self.db.executemany("INSERT INTO unit (type, owner) VALUES(?, ?)", [(12, 0), (13, 0)])
+		self.db("UPDATE unit SET owner = ? WHERE rowid = ?", 6, 2)
+		# selects see all rows that were written before
+		self.assertEqual(self.db("SELECT rowid, type, owner FROM unit ORDER BY rowid").rows, \
+		                 [(1, 10, 5), (2, 11, 6), (3, 12, 0), (4, 13, 0)])
+
+	def testFetchall(self):
+		self.db("INSERT INTO unit (rowid, type, owner) VALUES(?, ?, ?)", 1, 10, 0)
+		# both query paths see buffered writes and return the plain rows
+		self.assertEqual(self.db.fetchall("SELECT type, owner FROM unit"), [(10, 0)])
+		self.db("UPDATE unit SET owner = ? WHERE rowid = ?", 3, 1)
+		self.assertEqual(list(self.db.execute("SELECT type, owner FROM unit")), [(10, 3)])
+
+
+class TestDbSnapshot(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+		self.template = os.path.join(self.dir, 'template.sqlite')
+		db = DbWriter(self.template)
+		db("CREATE TABLE unit (type INTEGER, owner INTEGER)")
+		db.close()
+		self.filename = os.path.join(self.dir, 'savegame.sqlite')
+
+	def tearDown(self):
+		shutil.rmtree(self.dir)
+
+	def testWriteToFile(self):
+		snapshot = DbSnapshot()
+		snapshot("INSERT INTO unit (rowid, type, owner) VALUES(?, ?, ?)", 1, 10, 0)
+		snapshot.executemany("INSERT INTO unit (type, owner) VALUES(?, ?)", [(11, 0), (12, 1)])
+		snapshot("UPDATE unit SET owner = ? WHERE rowid = ?", 5, 1)
+		snapshot.write_to_file(self.template, self.filename)
+
+		self.assertFalse(os.path.exists(self.filename + '.tmp'))
+		db = DbReader(self.filename)
+		self.assertEqual(db("SELECT rowid, type, owner FROM unit ORDER BY rowid").rows, \
+		                 [(1, 10, 5), (2, 11, 0), (3, 12, 1)])
+		db.close()
+		# the template is left unchanged
+		db = DbReader(self.template)
+		self.assertEqual(db("SELECT * FROM unit").rows, [])
+		db.close()
+
+	def testWriteToFileFails(self):
+		snapshot = DbSnapshot()
+		snapshot("INSERT INTO missing_table (type) VALUES(?)", 1)
+		self.assertRaises(Exception, snapshot.write_to_file, self.template, self.filename)
+		self.assertEqual(os.listdir(self.dir), ['template.sqlite'])
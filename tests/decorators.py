@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+
+import gc
+import unittest
+
+from horizons.util.python.decorators import cachedmethod, cachedfunction
+
+class Counter(object):
+	def __init__(self):
+		self.calls = 0
+
+	@cachedmethod
+	def double(self, value):
+		self.calls += 1
+		return value * 2
+
+	@cachedmethod(maxsize=2)
+	def triple(self, value):
+		self.calls += 1
+		return value * 3
+
+class TestCachedMethod(unittest.TestCase):
+
+	def testCache(self):
+		counter = Counter()
+		self.assertEqual(counter.double(2), 4)
+		self.assertEqual(counter.double(2), 4)
+		self.assertEqual(counter.calls, 1)
+		Counter.double.invalidate(counter)
+		self.assertEqual(counter.double(2), 4)
+		self.assertEqual(counter.calls, 2)
+		# results are cached per instance
+		other = Counter()
+		other.double(2)
+		self.assertEqual(other.calls, 1)
+
+	def testWeakInstances(self):
+		caches = len(Counter.double.caches)
+		counter = Counter()
+		counter.double(1)
+		self.assertEqual(len(Counter.double.caches), caches + 1)
+		del counter
+		gc.collect()
+		self.assertEqual(len(Counter.double.caches), caches)
+
+	def testMaxsize(self):
+		counter = Counter()
+		counter.triple(1)
+		counter.triple(2)
+		counter.triple(1) # 2 is least recently used now
+		counter.triple(3)
+		self.assertEqual(counter.calls, 3)
+		counter.triple(1)
+		self.assertEqual(counter.calls, 3)
+		counter.triple(2)
+		self.assertEqual(counter.calls, 4)
+
+	def testFunction(self):
+		calls = []
+		@cachedfunction
+		def square(value):
+			calls.append(value)
+			return value ** 2
+		self.assertEqual(square(3), 9)
+		self.assertEqual(square(3), 9)
+		self.assertEqual(calls, [3])
+		name, hits, misses, size = square.get_stats()
+		self.assertEqual((name, hits, misses, size), ('square', 1, 1, 1))
+		square.invalidate()
+		square(3)
+		self.assertEqual(calls, [3, 3])
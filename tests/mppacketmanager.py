@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+import unittest
+
+import horizons.world # the commands that the manager imports need the world to be imported first
+from horizons.manager import MPManager, MPPacketmanager, MPCheckupHashManager, CommandPacket, \
+     CheckupHashPacket
+
+class Dummy(object):
+	pass
+
+class DummyMPManager(object):
+	"""Provides what the packet managers need of an MPManager"""
+	HASH_EVAL_DISTANCE = 8
+
+	def __init__(self, player_ids):
+		self.session = Dummy()
+		self.session.world = Dummy()
+		self.session.world.players = []
+		for player_id in player_ids:
+			player = Dummy()
+			player.worldid = player_id
+			self.session.world.players.append(player)
+
+	def get_player_count(self):
+		return len(self.session.world.players)
+
+class TestMPPacketmanager(unittest.TestCase):
+
+	def setUp(self):
+		self.manager = MPPacketmanager(DummyMPManager([1, 2]))
+
+	def testTickReady(self):
+		self.assertFalse(self.manager.is_tick_ready(5))
+		self.assertEqual(self.manager.get_missing_players(5), [1, 2])
+
+		self.manager.add_packet(CommandPacket(5, 2, []))
+		self.assertFalse(self.manager.is_tick_ready(5))
+		self.assertEqual(self.manager.get_missing_players(5), [1])
+
+		self.manager.add_packet(CommandPacket(5, 1, []))
+		self.assertTrue(self.manager.is_tick_ready(5))
+		self.assertEqual(self.manager.get_missing_players(5), [])
+
+		# other ticks aren't affected
+		self.assertFalse(self.manager.is_tick_ready(6))
+		self.assertEqual(self.manager.get_missing_players(6), [1, 2])
+
+	def testGetPackets(self):
+		packet1 = CommandPacket(5, 2, [])
+		packet2 = CommandPacket(5, 1, [])
+		packet3 = CommandPacket(6, 1, [])
+		for packet in (packet1, packet2, packet3):
+			self.manager.add_packet(packet)
+
+		# the packets are kept unless they are to be removed
+		self.assertEqual(self.manager.get_packets_for_tick(5, remove_returned_commands=False), \
+		                 [packet1, packet2])
+		self.assertTrue(self.manager.is_tick_ready(5))
+
+		self.assertEqual(self.manager.get_packets_for_tick(5), [packet1, packet2])
+		self.assertEqual(self.manager.get_packets_for_tick(5), [])
+		self.assertFalse(self.manager.is_tick_ready(5))
+		self.assertEqual(self.manager.get_missing_players(5), [1, 2])
+
+		self.assertEqual(self.manager.get_packets_for_tick(6), [packet3])
+		self.assertEqual(self.manager.get_packets_for_tick(7), [])
+
+	def testReturnedListIsCopy(self):
+		packet = CommandPacket(5, 1, [])
+		self.manager.add_packet(packet)
+		self.manager.get_packets_for_tick(5, remove_returned_commands=False).append(None)
+		self.assertEqual(self.manager.get_packets_for_tick(5), [packet])
+
+	def testPacketsFromPlayer(self):
+		packet1 = CommandPacket(5, 1, [])
+		packet2 = CommandPacket(6, 1, [])
+		for packet in (packet1, CommandPacket(5, 2, []), packet2):
+			self.manager.add_packet(packet)
+		self.assertEqual(sorted(self.manager.get_packets_from_player(1)), sorted([packet1, packet2]))
+
+	def testArrivalDelays(self):
+		self.manager.add_packet(CommandPacket(5, 1, []))
+		self.assertEqual(self.manager.arrival_delays[1], 0.0)
+		self.manager.add_packet(CommandPacket(5, 2, []))
+		self.assertTrue(self.manager.arrival_delays[2] >= 0.0)
+
+class TestMPCheckupHashManager(unittest.TestCase):
+
+	def setUp(self):
+		self.manager = MPCheckupHashManager(DummyMPManager([1, 2]))
+
+	def testTickReady(self):
+		# only every HASH_EVAL_DISTANCE tick is checked
+		self.assertTrue(self.manager.is_tick_ready(7))
+		self.assertFalse(self.manager.is_tick_ready(8))
+		self.manager.add_packet(CheckupHashPacket(8, 1, 42))
+		self.manager.add_packet(CheckupHashPacket(8, 2, 42))
+		self.assertTrue(self.manager.is_tick_ready(8))
+
+class DummyTimer(object):
+	def add_test(self, test):
+		pass
+
+	def add_call(self, call):
+		pass
+
+class TestMPManagerStalls(unittest.TestCase):
+
+	def setUp(self):
+		session = DummyMPManager([1, 2]).session
+		session.timer = DummyTimer()
+		self.manager = MPManager(session, None)
+
+	def testStallCountedOnce(self):
+		# player 2 misses the commands, player 1 the checkup hash
+		self.manager.commandsmanager.add_packet(CommandPacket(16, 1, []))
+		self.manager.checkuphashmanager.add_packet(CheckupHashPacket(16, 2, 42))
+		for i in xrange(3):
+			self.manager._register_stall(16, self.manager.commandsmanager)
+			self.manager._register_stall(16, self.manager.checkuphashmanager)
+		self.assertEqual(self.manager.stall_ticks, 1)
+		self.assertEqual(self.manager.stall_ticks_by_player, {1: 1, 2: 1})
+
+		self.manager._register_stall(17, self.manager.commandsmanager)
+		self.assertEqual(self.manager.stall_ticks, 2)
+		self.assertEqual(self.manager.stall_ticks_by_player, {1: 2, 2: 2})
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import unittest
+
+from horizons.util import Point, Rect
+from horizons.world.pathfinding.pathfinding import FindPath, LegacyFindPath
+from horizons.world.pathfinding.seagraph import SeaGraph, HierarchicalFindPath
+
+class TestPathfinding(unittest.TestCase):
+
+	def setUp(self):
+		# 10x10 field with a wall at x = 5, that has a gap at y = 9
+		self.nodes = dict( ((x, y), 1.0) for x in xrange(10) for y in xrange(10) \
+		                   if x != 5 or y == 9 )
+		self.rect = Rect.init_from_borders(0, 0, 9, 9)
+
+	def check_path(self, path, source, destination, diagonal):
+		self.assertEqual(path[0], source.to_tuple())
+		self.assertTrue(path[-1] in destination.get_coordinates())
+		for prev, cur in zip(path, path[1:]):
+			self.assertTrue(cur in self.nodes)
+			distance = abs(prev[0] - cur[0]) + abs(prev[1] - cur[1])
+			self.assertTrue(distance == 1 or (diagonal and distance == 2 and prev[0] != cur[0]))
+
+	def testPath(self):
+		for diagonal in (True, False):
+			for rect in (self.rect, None):
+				path = FindPath()(Point(0, 0), Point(9, 0), self.nodes, [], diagonal, rect=rect)
+				self.check_path(path, Point(0, 0), Point(9, 0), diagonal)
+				legacy_path = LegacyFindPath()(Point(0, 0), Point(9, 0), self.nodes, [], diagonal)
+				self.assertEqual(len(path), len(legacy_path))
+
+	def testRectDestination(self):
+		destination = Rect(Point(8, 0), 1, 1)
+		path = FindPath()(Point(0, 0), destination, self.nodes, [], True, rect=self.rect)
+		self.check_path(path, Point(0, 0), destination, True)
+
+	def testBlocked(self):
+		self.assertEqual(FindPath()(Point(0, 0), Point(9, 0), self.nodes, [(5, 9)], True, \
+		                            rect=self.rect), None)
+		self.assertEqual(FindPath()(Point(0, 0), Point(9, 0), self.nodes, [(9, 0)], True, \
+		                            rect=self.rect), None)
+		self.assertEqual(FindPath()(Point(0, 0), Point(5, 0), self.nodes, [], True, \
+		                            make_target_walkable=False, rect=self.rect), None)
+
+	def testSeaGraph(self):
+		# 80x80 sea with a wall at x = 40, that has a gap at y = 79
+		nodes = dict( ((x, y), 1.0) for x in xrange(80) for y in xrange(80) if x != 40 or y == 79 )
+		rect = Rect.init_from_borders(0, 0, 79, 79)
+		graph = SeaGraph(nodes, rect)
+		path = HierarchicalFindPath(graph)(Point(0, 0), Point(79, 0), nodes, {}, True, False, rect)
+		self.nodes = nodes
+		self.check_path(path, Point(0, 0), Point(79, 0), True)
+		self.assertTrue((40, 79) in path)
+
+		# without the gap
+		del nodes[(40, 79)]
+		graph = SeaGraph(nodes, rect)
+		self.assertEqual(graph.find_waypoints((0, 0), (79, 0)), None)
+		self.assertEqual(HierarchicalFindPath(graph)(Point(0, 0), Point(79, 0), nodes, {}, True, \
+		                                             False, rect), None)
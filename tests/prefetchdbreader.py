@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+import os
+import tempfile
+import unittest
+
+from horizons.util import DbReader
+from horizons.util.prefetchdbreader import PrefetchDbReader
+
+class TestPrefetchDbReader(unittest.TestCase):
+
+	def setUp(self):
+		handle, self.filename = tempfile.mkstemp(suffix='.sqlite')
+		os.close(handle)
+		db = DbReader(self.filename)
+		db.execute_script("""
+		  CREATE TABLE storage (object INTEGER, resource INTEGER, amount INTEGER);
+		  CREATE TABLE path (unit INTEGER, pos INTEGER, x INTEGER, y INTEGER);
+		  CREATE TABLE name (object TEXT, name TEXT);
+		  INSERT INTO storage VALUES(1, 4, 10);
+		  INSERT INTO storage VALUES(1, 5, 20);
+		  INSERT INTO storage VALUES(2, 4, 30);
+		  INSERT INTO storage VALUES(NULL, 4, 40);
+		  INSERT INTO storage VALUES(2, 6, 50);
+		  INSERT INTO path VALUES(7, 2, 1, 1);
+		  INSERT INTO path VALUES(7, 0, 0, 0);
+		  INSERT INTO path VALUES(8, 0, 5, 5);
+		  INSERT INTO path VALUES(7, 1, 0, 1);
+		  INSERT INTO name VALUES('1', 'a');
+		  INSERT INTO name VALUES(2, 'b');
+		  """)
+		db.close()
+		self.db = DbReader(self.filename)
+		self.prefetch = PrefetchDbReader(self.filename)
+
+	def tearDown(self):
+		self.db.close()
+		self.prefetch.close()
+		os.remove(self.filename)
+
+	def assertSameResult(self, command, *args):
+		self.assertEqual(self.prefetch(command, *args).rows, self.db(command, *args).rows)
+
+	def testLookups(self):
+		command = "SELECT resource, amount FROM storage WHERE object = ?"
+		self.assertTrue(self.prefetch._parse_query(command) is not None)
+		for obj in (1, 2, 3, 0):
+			self.assertSameResult(command, obj)
+		self.assertSameResult("SELECT amount FROM storage WHERE object = ?", 2)
+		self.assertSameResult("SELECT rowid, amount FROM storage WHERE resource = ?", 4)
+		self.assertEqual(self.prefetch("SELECT amount FROM storage WHERE object = ?", 1).rows, \
+		                 [(10,), (20,)])
+
+	def testOrderBy(self):
+		command = "SELECT x, y FROM path WHERE unit = ? ORDER BY pos"
+		self.assertTrue(self.prefetch._parse_query(command) is not None)
+		self.assertSameResult(command, 7)
+		self.assertSameResult(command, 8)
+		self.assertEqual(self.prefetch(command, 7).rows, [(0, 0), (0, 1), (1, 1)])
+
+	def testMultiColumnKey(self):
+		command = "SELECT amount FROM storage WHERE object = ? AND resource = ?"
+		self.assertTrue(self.prefetch._parse_query(command) is not None)
+		for obj, res in ((1, 4), (1, 5), (2, 4), (2, 5), (None, 4)):
+			self.assertSameResult(command, obj, res)
+
+	def testTextKeyColumn(self):
+		# keys would have to be converted like sqlite does it for text columns
+		command = "SELECT name FROM name WHERE object = ?"
+		self.assertEqual(self.prefetch._parse_query(command), None)
+		self.assertSameResult(command, 1)
+		self.assertSameResult(command, '2')
+
+	def testNonIntegerArgs(self):
+		# sqlite converts these for integer columns, the prefetched index doesn't
+		command = "SELECT amount FROM storage WHERE object = ?"
+		for arg in ('1', 1.0, None):
+			self.assertSameResult(command, arg)
+
+	def testUnhandledQueries(self):
+		for command in ("SELECT amount FROM storage WHERE object > ?", \
+		                "SELECT amount FROM storage WHERE object = ? OR resource = ?", \
+		                "SELECT count(*) FROM storage WHERE object = ?", \
+		                "SELECT amount FROM storage WHERE object = ? ORDER BY amount DESC"):
+			self.assertEqual(self.prefetch._parse_query(command), None)
+		self.assertSameResult("SELECT amount FROM storage WHERE object = ? ORDER BY amount DESC", 1)
+
+	def testWritesDropPrefetchedData(self):
+		command = "SELECT resource, amount FROM storage WHERE object = ?"
+		self.assertSameResult(command, 1)
+		self.prefetch("INSERT INTO storage VALUES(1, 6, 60)")
+		self.assertSameResult(command, 1)
+		self.assertEqual(len(self.prefetch(command, 1)), 3)
+		self.prefetch("UPDATE storage SET amount = 0 WHERE object = ?", 1)
+		self.assertSameResult(command, 1)
+		self.prefetch("DELETE FROM storage WHERE resource = ?", 4)
+		self.assertSameResult(command, 1)
+		# the other query paths drop the data too
+		self.prefetch.execute("DELETE FROM storage WHERE resource = ?", 5)
+		self.assertSameResult(command, 1)
+		self.prefetch.fetchall("INSERT INTO storage VALUES(1, 7, 70)")
+		self.assertSameResult(command, 1)
+		self.assertEqual(self.prefetch(command, 1).rows, [(6, 0), (7, 70)])
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# ###################################################
+
+
+
+import unittest
+import weakref
+
+from horizons.scheduler import Scheduler
+
+class DummyTimer(object):
+	def __init__(self):
+		self.tick_func_call = []
+
+	def add_call(self, call):
+		self.tick_func_call.append(call)
+
+	def remove_call(self, call):
+		self.tick_func_call.remove(call)
+
+class TestScheduler(unittest.TestCase):
+
+	def setUp(self):
+		self.timer = DummyTimer()
+		Scheduler.create_instance(self.timer)
+		self.calls = []
+
+	def tearDown(self):
+		Scheduler().end()
+		Scheduler.destroy_instance()
+
+	def call(self, name):
+		return lambda : self.calls.append( (Scheduler().cur_tick, name) )
+
+	def run_ticks(self, ticks):
+		for i in xrange(ticks):
+			tick_id = Scheduler().cur_tick + 1
+			for call in self.timer.tick_func_call:
+				call(tick_id)
+
+	def testOrder(self):
+		Scheduler().add_new_object(self.call('a'), self, run_in=2)
+		Scheduler().add_new_object(self.call('b'), self, run_in=1, loops=3)
+		Scheduler().add_new_object(self.call('c'), self, run_in=2)
+		self.run_ticks(5)
+		self.assertEqual(self.calls, [(1, 'b'), (2, 'a'), (2, 'c'), (2, 'b'), (3, 'b')])
+
+	def testRemove(self):
+		a = self.call('a')
+		Scheduler().add_new_object(a, self, run_in=2, loops=-1)
+		Scheduler().add_new_object(self.call('b'), self, run_in=3)
+		self.assertEqual(Scheduler().get_remaining_ticks(self, a), 2)
+		self.assertEqual(len(Scheduler().get_classinst_calls(self)), 2)
+		self.run_ticks(2)
+		self.assertEqual(Scheduler().get_remaining_ticks(self, a), 2)
+		self.assertEqual(Scheduler().rem_call(self, a), 1)
+		self.assertEqual(Scheduler().get_classinst_calls(self, a), {})
+		self.run_ticks(5)
+		self.assertEqual(self.calls, [(2, 'a'), (3, 'b')])
+
+		Scheduler().add_new_object(self.call('c'), self, run_in=1)
+		Scheduler().add_new_object(self.call('d'), self, run_in=1)
+		Scheduler().rem_all_classinst_calls(self)
+		self.assertEqual(Scheduler().get_classinst_calls(self), {})
+		self.run_ticks(2)
+		self.assertEqual(len(self.calls), 2)
+
+	def testRemoveInSameTick(self):
+		# calls of the current tick are still executed, even if they are removed meanwhile
+		b = self.call('b')
+		Scheduler().add_new_object(lambda : Scheduler().rem_call(self, b), self)
+		Scheduler().add_new_object(b, self)
+		self.run_ticks(1)
+		self.assertEqual(self.calls, [(1, 'b')])
+
+	def testRemovedInstanceReleased(self):
+		# removed calls don't keep their instance alive until their tick is reached
+		class Instance(object):
+			def call(self):
+				pass
+
+		for remove in (lambda inst: Scheduler().rem_call(inst, inst.call), \
+		               Scheduler().rem_all_classinst_calls):
+			instance = Instance()
+			Scheduler().add_new_object(instance.call, instance, run_in=1000, loops=-1)
+			remove(instance)
+			ref = weakref.ref(instance)
+			del instance
+			self.assertTrue(ref() is None)
+		self.run_ticks(1001)
+
+	def testProfiling(self):
+		profiler = Scheduler().start_profiling()
+		Scheduler().add_new_object(self.call('a'), self, run_in=2)
+		Scheduler().add_new_object(self.call('b'), self, run_in=1, loops=3)
+		self.run_ticks(3)
+		self.assertEqual(Scheduler().stop_profiling(), profiler)
+		self.run_ticks(1)
+		self.assertEqual(self.calls, [(1, 'b'), (2, 'a'), (2, 'b'), (3, 'b')])
+		self.assertEqual(profiler.num_ticks, 3)
+		self.assertEqual(profiler.calls.keys(), [('TestScheduler', '<lambda>')])
+		self.assertEqual(profiler.get_stats()[0]['calls'], 4)
+		self.assertEqual(len(profiler.get_slowest_ticks()), 3)
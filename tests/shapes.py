@@ -58,3 +58,21 @@ class TestPathfinding(unittest.TestCase):
 		self.assertNotEqual(c1, c2)
 		self.assertEqual(c1.get_coordinates(), [(-1, 0), (0, -1), (0, 0), (0, 1), (1, 0)])
 		self.assertEqual(c3.get_coordinates(), [(0,0)])
+
+	def testRadiusCoordinates(self):
+		for (width, height) in ((0, 0), (1, 1), (2, 3)):
+			rect = Rect.init_from_topleft_and_size(3, -2, width, height)
+			for radius in (0, 1, 4, 7):
+				for include_self in (True, False):
+					expected = [ (x, y) for y in xrange(rect.top-radius, rect.bottom+radius+1) \
+					                    for x in xrange(rect.left-radius, rect.right+radius+1) \
+					                    if rect.distance_to_tuple((x, y)) <= radius and \
+					                    (include_self or not rect.contains_tuple((x, y))) ]
+					self.assertEqual(rect.get_radius_coordinates(radius, include_self), expected)
+		for radius in (0, 1, 5):
+			center = Point(-4, 9)
+			expected = [ (x, y) for x in xrange(center.x-radius, center.x+radius+1) \
+			                    for y in xrange(center.y-radius, center.y+radius+1) \
+			                    if center.distance_to_tuple((x, y)) <= radius ]
+			self.assertEqual(Circle(center, radius).get_coordinates(), expected)
+			self.assertEqual(list(Circle(center, radius).tuple_iter()), expected)
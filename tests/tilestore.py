@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+import gc
+import unittest
+
+from horizons.entities import Entities
+from horizons.constants import GROUND
+from horizons.util import WorldObject
+from horizons.world.ground import Ground
+from horizons.world.tilestore import TileStore
+
+class Land(Ground):
+	__slots__ = ()
+	id = 1
+	class_mask = GROUND.CONSTRUCTIBLE
+
+class Coast(Ground):
+	__slots__ = ()
+	id = 2
+	class_mask = GROUND.COASTLINE
+
+class Dummy(object):
+	pass
+
+class TestTileStore(unittest.TestCase):
+
+	def setUp(self):
+		self.grounds = Entities.__dict__.get('grounds')
+		Entities.grounds = { Land.id : Land, Coast.id : Coast }
+		self.store = TileStore(None, 10, 20, 5, 4)
+		# add in unsorted order
+		for coord in ((14, 23), (10, 20), (12, 21), (10, 23), (11, 20)):
+			self.store.add(coord[0], coord[1], Land)
+		self.store.add(12, 22, Coast)
+
+	def tearDown(self):
+		if self.grounds is None:
+			del Entities.grounds
+		else:
+			Entities.grounds = self.grounds
+
+	def testMapping(self):
+		self.assertEqual(len(self.store), 6)
+		self.assertTrue((12, 21) in self.store)
+		self.assertFalse((13, 21) in self.store) # in the area, but no tile
+		self.assertFalse((9, 21) in self.store) # outside of the area
+		self.assertFalse((12, 24) in self.store)
+		tile = self.store[(12, 22)]
+		self.assertEqual((tile.x, tile.y), (12, 22))
+		self.assertTrue(isinstance(tile, Coast))
+		self.assertRaises(KeyError, self.store.__getitem__, (13, 21))
+		self.assertRaises(KeyError, self.store.__getitem__, (20, 20))
+		self.assertEqual(self.store.get((13, 21)), None)
+		self.assertEqual(self.store.get((12, 22)), tile)
+		# replacing the ground of a tile doesn't add a tile
+		self.store.add(12, 22, Land)
+		self.assertEqual(len(self.store), 6)
+		self.assertTrue(isinstance(self.store[(12, 22)], Land))
+
+	def testSortedIteration(self):
+		coords = [(10, 20), (10, 23), (11, 20), (12, 21), (12, 22), (14, 23)]
+		self.assertEqual(list(self.store), coords)
+		self.assertEqual(self.store.keys(), coords)
+		self.assertEqual([ coord for coord, tile in self.store.iteritems() ], coords)
+		self.assertEqual([ (tile.x, tile.y) for tile in self.store.itervalues() ], coords)
+		self.assertEqual([ coord for coord, class_mask in self.store.iter_class_masks() ], coords)
+
+	def testClassMask(self):
+		self.assertEqual(self.store.get_class_mask((12, 21)), GROUND.CONSTRUCTIBLE)
+		self.assertEqual(self.store.get_class_mask((12, 22)), GROUND.COASTLINE)
+		self.assertEqual(self.store.get_class_mask((13, 21)), 0)
+		self.assertEqual(self.store.get_class_mask((0, 0)), 0)
+		self.assertEqual(self.store[(12, 22)].class_mask, GROUND.COASTLINE)
+		self.assertEqual(dict(self.store.iter_class_masks())[(12, 22)], GROUND.COASTLINE)
+
+	def testTileData(self):
+		tile = self.store[(12, 21)]
+		self.assertEqual((tile.settlement, tile.object, tile.blocked), (None, None, False))
+		settlement = Dummy()
+		obj = WorldObject()
+		tile.settlement = settlement
+		tile.object = obj
+		tile.blocked = True
+		# the data is in the store, not in the view
+		tile = self.store[(12, 21)]
+		self.assertTrue(tile.settlement is settlement)
+		self.assertTrue(tile.object is obj)
+		self.assertTrue(tile.blocked)
+		self.assertEqual(self.store[(11, 20)].settlement, None)
+		tile.settlement = None
+		tile.object = None
+		tile.blocked = False
+		tile = self.store[(12, 21)]
+		self.assertEqual((tile.settlement, tile.object, tile.blocked), (None, None, False))
+
+	def testRemovedObject(self):
+		obj = WorldObject()
+		self.store[(12, 21)].object = obj
+		del obj
+		gc.collect()
+		self.assertEqual(self.store[(12, 21)].object, None)
+
+	def testEquality(self):
+		tile = self.store[(12, 21)]
+		same = self.store.get((12, 21))
+		self.assertTrue(tile is not same)
+		self.assertEqual(tile, same)
+		self.assertFalse(tile != same)
+		self.assertEqual(hash(tile), hash(same))
+		self.assertTrue(same in set([tile]))
+		self.assertNotEqual(tile, self.store[(11, 20)])
+
+		other_store = TileStore(None, 10, 20, 5, 4)
+		other_store.add(12, 21, Land)
+		self.assertNotEqual(tile, other_store[(12, 21)])
+		self.assertFalse(other_store[(12, 21)] in set([tile]))
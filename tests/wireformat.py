@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+import unittest
+
+from horizons.network import wireformat
+
+class TestWireFormat(unittest.TestCase):
+
+	def roundtrip(self, value):
+		encoder = wireformat.Encoder()
+		encoder.write_value(value)
+		encoder.write_value(value)
+		decoder = wireformat.Decoder(encoder.getvalue())
+		for i in xrange(2):
+			decoded = decoder.read_value()
+			self.assertEqual(decoded, value)
+			self.assertEqual(type(decoded), type(value))
+		self.assertEqual(decoder.pos, len(encoder.getvalue()))
+
+	def testValues(self):
+		for value in (None, True, False, 0, 1, -1, 127, 128, -300, 2**70, -2**70, 0.25, \
+		              'abc', u'\xe4\u20ac', (1, 'a'), [1, [2.5, None]], set([3, 4]), \
+		              {'owner': 1, 2: {'owner': u'x'}}):
+			self.roundtrip(value)
+
+	def testUnknownType(self):
+		self.assertRaises(wireformat.WireFormatError, wireformat.Encoder().write_value, object())
+		self.assertRaises(wireformat.WireFormatError, wireformat.Decoder('\xff', 0).read_value)
+
+	def testTruncated(self):
+		encoder = wireformat.Encoder()
+		encoder.write_uint(300)
+		encoder.write_value([1, 'abc', {2: u'\xe4'}, 0.5, 2**70])
+		data = encoder.getvalue()
+		for end in xrange(len(wireformat.HEADER), len(data)):
+			decoder = wireformat.Decoder(data[:end])
+			self.assertRaises(wireformat.WireFormatError, lambda: (decoder.read_uint(), decoder.read_value()))
+
+	def testInvalid(self):
+		# reference to a string that hasn't been read
+		self.assertRaises(wireformat.WireFormatError, wireformat.Decoder(wireformat._STR_REF + '\x00', 0).read_value)
+		# list as dict key
+		data = wireformat._DICT + '\x01' + wireformat._LIST + '\x00' + wireformat._NONE
+		self.assertRaises(wireformat.WireFormatError, wireformat.Decoder(data, 0).read_value)
+		# invalid utf-8
+		self.assertRaises(wireformat.WireFormatError, wireformat.Decoder(wireformat._UNICODE + '\x01\xff', 0).read_value)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+# ###################################################
+# Copyright (C) 2011 The Unknown Horizons Team
+# team@unknown-horizons.org
+# This file is part of Unknown Horizons.
+#
+# Unknown Horizons is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the
+# Free Software Foundation, Inc.,
+# 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+
+
+import random
+import weakref
+import unittest
+
+from horizons.util import WorldDigest, DigestRandom
+from horizons.world.storage import PositiveTotalStorage
+
+class TestWorldDigest(unittest.TestCase):
+
+	def setUp(self):
+		WorldDigest.create_instance()
+		self.digest = WorldDigest()
+
+	def tearDown(self):
+		WorldDigest.destroy_instance()
+
+	def testRandom(self):
+		rng = DigestRandom(self.digest, 42)
+		reference = random.Random(42)
+		# the numbers don't change, but every draw is recorded
+		values = self.digest.get_values()
+		self.assertEqual(rng.randint(0, 1000), reference.randint(0, 1000))
+		self.assertEqual(rng.choice(range(10)), reference.choice(range(10)))
+		self.assertNotEqual(self.digest.get_values()[0], values[0])
+		self.assertEqual(self.digest.get_values()[1:], values[1:])
+
+	def testStorage(self):
+		inventory = PositiveTotalStorage(10)
+		inventory.alter(1, 5)
+		inventory.alter(1, -3)
+		value = self.digest.get_value()
+
+		# same changes in the same order lead to the same checksum
+		WorldDigest.destroy_instance()
+		WorldDigest.create_instance()
+		inventory = PositiveTotalStorage(10)
+		inventory.alter(1, 5)
+		inventory.alter(1, -3)
+		self.assertEqual(WorldDigest().get_value(), value)
+
+		# any other change leads to a different one
+		inventory.alter(1, 1)
+		self.assertNotEqual(WorldDigest().get_value(), value)
+		self.assertEqual(WorldDigest.combine(WorldDigest().get_values()), WorldDigest().get_value())
+
+	def testStorageHolder(self):
+		class Holder(object):
+			def __init__(self, worldid):
+				self.worldid = worldid
+
+		inventory = PositiveTotalStorage(10)
+		holder1 = Holder(1)
+		inventory.set_holder(holder1)
+		inventory.alter(1, 5)
+		value = self.digest.get_value()
+
+		# the same change in the storage of another holder leads to a different checksum
+		WorldDigest.destroy_instance()
+		WorldDigest.create_instance()
+		inventory = PositiveTotalStorage(10)
+		holder2 = Holder(2)
+		inventory.set_holder(holder2)
+		inventory.alter(1, 5)
+		self.assertNotEqual(WorldDigest().get_value(), value)
+
+	def testStorageHolderNotKeptAlive(self):
+		class Holder(object):
+			worldid = 1
+
+		holder = Holder()
+		holder.inventory = PositiveTotalStorage(10)
+		holder.inventory.set_holder(holder)
+		inventory = holder.inventory
+		ref = weakref.ref(holder)
+		del holder
+		self.assertTrue(ref() is None)
+		inventory.alter(1, 5) # the digest entry doesn't need the holder anymore